@@ -1,32 +1,149 @@
 """Attachment handling API endpoints - real pykeepass implementation"""
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response
+from urllib.parse import quote
 
-from backend.core.kdbx.parser import db
+import anyio.to_thread
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from backend.core.attachments import file_handler
+from backend.api.dependencies import current_db, if_none_match, not_modified, revision_etag
+from backend.core.attachments.spool import SPOOL_CHUNK_SIZE, EncryptedSpool, UploadTooLarge
+from backend.core.attachments.upload import MultipartFileReader
+from backend.core.kdbx.parser import KdbxDatabase
 
 router = APIRouter(prefix="/api/attachments", tags=["attachments"])
 
 
 @router.get("/{entry_id}")
-async def list_attachments(entry_id: str):
+def list_attachments(
+    entry_id: str,
+    request: Request,
+    response: Response,
+    db: KdbxDatabase = Depends(current_db),
+):
     """List attachments for an entry"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    cached = not_modified(request, response, revision_etag(db, entry_id))
+    if cached:
+        return cached
     return db.list_attachments(entry_id)
 
 
 @router.get("/{entry_id}/{attachment_id}")
-async def get_attachment(entry_id: str, attachment_id: str):
-    """Download an attachment"""
+def get_attachment(
+    entry_id: str,
+    attachment_id: str,
+    request: Request,
+    db: KdbxDatabase = Depends(current_db),
+):
+    """Download an attachment, streamed in chunks with Range/ETag support"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
-    result = db.get_attachment_data(entry_id, attachment_id)
-    if not result:
+    attachment = db.open_attachment(entry_id, attachment_id)
+    if not attachment:
         raise HTTPException(status_code=404, detail="Anhang nicht gefunden")
-    filename, data = result
-    return Response(
-        content=data,
-        media_type="application/octet-stream",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+
+    size = attachment["size"]
+    etag = f'"{attachment["etag"]}"'
+    headers = {
+        "Content-Disposition": _content_disposition(attachment["filename"]),
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "X-Content-Type-Options": "nosniff",
+    }
+
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range == etag:
+        try:
+            byte_range = file_handler.parse_range(request.headers.get("range"), size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        start, end, status = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    # A sync iterator: Starlette pulls chunks in its threadpool, so large
+    # downloads do not block the event loop.
+    return StreamingResponse(
+        file_handler.iter_chunks(attachment["view"], start, end),
+        status_code=status,
+        media_type=attachment["mime_type"],
+        headers=headers,
     )
+
+
+def _content_disposition(filename: str) -> str:
+    """``attachment`` with a quoted ASCII fallback name and the exact name as
+    UTF-8 (RFC 6266 / RFC 5987)"""
+    fallback = "".join(c if " " <= c <= "~" and c not in '"\\' else "_" for c in filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+@router.post("/{entry_id}", status_code=201)
+async def upload_attachment(
+    entry_id: str,
+    request: Request,
+    db: KdbxDatabase = Depends(current_db),
+):
+    """Upload an attachment (multipart/form-data, file field ``file``).
+
+    The body is streamed into an encrypted spool while it arrives and
+    hashed on the way; a payload the vault already holds is referenced
+    instead of stored twice.
+    """
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    with EncryptedSpool() as spool:
+        try:
+            reader = MultipartFileReader(request.headers.get("content-type", ""), spool)
+            # Parsing, hashing and encryption run in the worker pool, fed
+            # about one spool chunk at a time
+            pending: list[bytes] = []
+            pending_size = 0
+            async for chunk in request.stream():
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= SPOOL_CHUNK_SIZE:
+                    await anyio.to_thread.run_sync(reader.write, b"".join(pending))
+                    pending, pending_size = [], 0
+            if pending:
+                await anyio.to_thread.run_sync(reader.write, b"".join(pending))
+            filename = await anyio.to_thread.run_sync(reader.finish)
+        except UploadTooLarge:
+            raise HTTPException(status_code=413, detail="Anhang zu groß")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Ungültiger Upload: {e}")
+
+        try:
+            attachment = await anyio.to_thread.run_sync(db.add_attachment, entry_id, filename, spool)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Fehler beim Speichern: {e}")
+    if attachment is None:
+        raise HTTPException(status_code=404, detail="Eintrag nicht gefunden")
+    return attachment
+
+
+@router.delete("/{entry_id}/{attachment_id}")
+def delete_attachment(
+    entry_id: str,
+    attachment_id: str,
+    db: KdbxDatabase = Depends(current_db),
+):
+    """Remove an attachment; the data is dropped from the vault with its last reference"""
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    if not db.delete_attachment(entry_id, attachment_id):
+        raise HTTPException(status_code=404, detail="Anhang nicht gefunden")
+    return {"success": True}
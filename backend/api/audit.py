@@ -1,35 +1,95 @@
 """Security audit API endpoints"""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from backend.api.dependencies import current_db
+from backend.core.kdbx.parser import KdbxDatabase
+from backend.core.security.breach_checker import BreachIndex, breach_index
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
 
 @router.get("/health")
-async def password_health():
+def password_health(db: KdbxDatabase = Depends(current_db)):
     """Get overall password health dashboard data"""
-    raise HTTPException(status_code=501, detail="Not implemented yet")
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    return db.audit_health()
 
 
 @router.get("/weak")
-async def weak_passwords():
+def weak_passwords(
+    limit: int | None = Query(default=None, ge=1),
+    db: KdbxDatabase = Depends(current_db),
+):
     """Find entries with weak passwords"""
-    raise HTTPException(status_code=501, detail="Not implemented yet")
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    return db.audit_weak(limit)
 
 
 @router.get("/duplicates")
-async def duplicate_passwords():
-    """Find entries with duplicate passwords"""
-    raise HTTPException(status_code=501, detail="Not implemented yet")
+def duplicate_passwords(db: KdbxDatabase = Depends(current_db)):
+    """Find entries with duplicate or near-duplicate passwords"""
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    return db.audit_duplicates()
+
+
+@router.get("/reuse/{entry_id}")
+def password_reuse(entry_id: str, db: KdbxDatabase = Depends(current_db)):
+    """How often an entry's password is reused, exactly or as a near variant"""
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    result = db.password_reuse(entry_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Eintrag nicht gefunden")
+    return result
 
 
 @router.get("/expired")
-async def expired_entries():
+def expired_entries(db: KdbxDatabase = Depends(current_db)):
     """Find entries that have expired"""
-    raise HTTPException(status_code=501, detail="Not implemented yet")
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    return db.audit_expired()
+
+
+@router.get("/expiring")
+def expiring_entries(
+    days: float | None = Query(default=None, gt=0),
+    db: KdbxDatabase = Depends(current_db),
+):
+    """Find entries that expire within the next ``days`` days (default: warning period)"""
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    return db.audit_expiring(days)
+
+
+@router.post("/breach-check")
+def check_all_breaches(db: KdbxDatabase = Depends(current_db)):
+    """Check every password of the vault against the offline breach dataset"""
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    return db.breach_check_all(_breach_index())
 
 
 @router.post("/breach-check/{entry_id}")
-async def check_breach(entry_id: str):
-    """Check if a password has been found in a data breach (HaveIBeenPwned)"""
-    raise HTTPException(status_code=501, detail="Not implemented yet")
+def check_breach(entry_id: str, db: KdbxDatabase = Depends(current_db)):
+    """Check if a password has been found in a data breach (offline HaveIBeenPwned data)"""
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    result = db.breach_check(entry_id, _breach_index())
+    if result is None:
+        raise HTTPException(status_code=404, detail="Eintrag nicht gefunden")
+    return result
+
+
+def _breach_index() -> BreachIndex:
+    try:
+        index = breach_index()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=503, detail=f"Breach-Datenbank nicht lesbar: {e}")
+    if index is None:
+        raise HTTPException(status_code=503, detail="Keine Breach-Datenbank konfiguriert")
+    return index
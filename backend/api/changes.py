@@ -0,0 +1,76 @@
+"""Change feed API endpoints - entry/group deltas since a revision"""
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from backend.api.dependencies import current_db
+from backend.core.kdbx.parser import KdbxDatabase
+
+router = APIRouter(prefix="/api/changes", tags=["changes"])
+
+KEEPALIVE_SECONDS = 15.0
+
+
+@router.get("")
+async def list_changes(since: int, db: KdbxDatabase = Depends(current_db)):
+    """Entry/group changes after revision ``since``.
+
+    Returns ``{revision, resync, changes}``. With ``resync: true`` the
+    changes after ``since`` are no longer known (vault reopened or log
+    truncated) and the client must refetch its lists. Changes carry field
+    names only, never values; an entry moved to the recycle bin is a
+    ``move`` to that group. When an entry's expiry time passes an
+    ``expire`` change is recorded for it, so dashboards need not poll.
+    """
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    return db.change_log.since(since)
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    since: int | None = None,
+    last_event_id: str | None = Header(default=None),
+    db: KdbxDatabase = Depends(current_db),
+):
+    """Server-sent events: one ``changes`` event per batch of new changes.
+
+    Starts after ``since`` (or the reconnecting client's Last-Event-ID, or
+    the current revision). Sends a ``resync`` event when changes were lost.
+    """
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    cursor = since if since is not None else db.revision
+    log = db.change_log
+
+    async def events():
+        event = log.subscribe()
+        try:
+            nonlocal cursor
+            while not await request.is_disconnected():
+                # Clear before reading so a change in between wakes us again
+                event.clear()
+                delta = log.since(cursor)
+                if delta["resync"] or delta["changes"]:
+                    kind = "resync" if delta["resync"] else "changes"
+                    cursor = delta["revision"]
+                    yield f"id: {cursor}\nevent: {kind}\ndata: {json.dumps(delta)}\n\n"
+                    continue
+                try:
+                    await asyncio.wait_for(event.wait(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            log.unsubscribe(event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,9 +1,12 @@
 """Database API endpoints - real pykeepass implementation"""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
 from pydantic import BaseModel
 
-from backend.core.kdbx.parser import db
+from backend.api.dependencies import current_db, not_modified, revision_etag
+from backend.core.kdbx import kdf
+from backend.core.kdbx.parser import KdbxDatabase
+from backend.core.kdbx.sessions import new_session_id, sessions
 
 router = APIRouter(prefix="/api/database", tags=["database"])
 
@@ -12,20 +15,53 @@ class OpenDatabaseRequest(BaseModel):
     path: str
     password: str
     key_file: str | None = None
+    new_session: bool = False
+
+
+class KdfSettings(BaseModel):
+    """Explicit Argon2 parameters, or a target unlock time to calibrate for"""
+
+    target_seconds: float | None = None
+    algorithm: str | None = None
+    iterations: int | None = None
+    memory_kib: int | None = None
+    parallelism: int | None = None
 
 
 class CreateDatabaseRequest(BaseModel):
     path: str
     password: str
     name: str = "Neue Datenbank"
+    new_session: bool = False
+    kdf: KdfSettings | None = None
+
+
+class SaveSettingsRequest(BaseModel):
+    write_behind: bool | None = None
+    debounce: float | None = None
+    max_dirty_age: float | None = None
+
+
+class SessionSettingsRequest(BaseModel):
+    max_sessions: int | None = None
+    idle_timeout: float | None = None
+    memory_budget_mb: float | None = None
 
 
 @router.post("/open")
-async def open_database(request: OpenDatabaseRequest):
-    """Open a KDBX database file"""
+def open_database(
+    request: OpenDatabaseRequest,
+    x_vault_session: str | None = Header(default=None),
+):
+    """Open a KDBX database file into the session named by X-Vault-Session.
+
+    With ``new_session`` a fresh session id is generated; send it back as
+    X-Vault-Session to work with this vault while others stay open.
+    """
+    session_id = new_session_id() if request.new_session else x_vault_session
     try:
-        info = db.open(request.path, request.password, request.key_file)
-        return {"success": True, "database": info}
+        session_id, info = sessions.open(session_id, request.path, request.password, request.key_file)
+        return {"success": True, "session_id": session_id, "database": info}
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Datei nicht gefunden")
     except Exception as e:
@@ -36,24 +72,39 @@ async def open_database(request: OpenDatabaseRequest):
 
 
 @router.post("/create")
-async def create_database(request: CreateDatabaseRequest):
-    """Create a new KDBX database"""
+def create_database(
+    request: CreateDatabaseRequest,
+    x_vault_session: str | None = Header(default=None),
+):
+    """Create a new KDBX database (sessions as for /open)"""
+    session_id = new_session_id() if request.new_session else x_vault_session
     try:
-        info = db.create(request.path, request.password, request.name)
-        return {"success": True, "database": info}
+        kdf_settings = request.kdf.model_dump(exclude_none=True) if request.kdf else None
+        session_id, info = sessions.create(
+            session_id, request.path, request.password, request.name, kdf_settings
+        )
+        return {"success": True, "session_id": session_id, "database": info}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Ungültige KDF-Parameter: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fehler beim Erstellen: {e}")
 
 
 @router.post("/close")
-async def close_database():
-    """Close the current database"""
-    db.close()
+def close_database(x_vault_session: str | None = Header(default=None)):
+    """Flush pending changes and close the session's database"""
+    try:
+        if not sessions.close(x_vault_session):
+            raise HTTPException(status_code=404, detail="Sitzung nicht gefunden")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler beim Speichern: {e}")
     return {"success": True}
 
 
 @router.post("/save")
-async def save_database():
+def save_database(db: KdbxDatabase = Depends(current_db)):
     """Save current database to disk"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
@@ -65,14 +116,79 @@ async def save_database():
 
 
 @router.get("/info")
-async def get_database_info():
+def get_database_info(
+    request: Request,
+    response: Response,
+    db: KdbxDatabase = Depends(current_db),
+):
     """Get information about the current database"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    cached = not_modified(request, response, revision_etag(db))
+    if cached:
+        return cached
     return db.get_info()
 
 
 @router.get("/status")
-async def get_status():
-    """Check if a database is currently open"""
-    return {"is_open": db.is_open, "path": db.path}
+async def get_status(db: KdbxDatabase = Depends(current_db)):
+    """Check if a database is currently open and whether it has unsaved changes"""
+    return {"is_open": db.is_open, "path": db.path, "revision": db.revision, **db.save_status()}
+
+
+@router.put("/kdf")
+def retune_kdf(request: KdfSettings, db: KdbxDatabase = Depends(current_db)):
+    """Re-tune the vault's Argon2 parameters and save it with them right away"""
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    try:
+        return db.retune_kdf(request.model_dump(exclude_none=True))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Ungültige KDF-Parameter: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler beim Speichern: {e}")
+
+
+@router.get("/kdf/calibration")
+def calibrate_kdf(
+    target_seconds: float = 1.0,
+    memory_kib: int | None = None,
+    parallelism: int | None = None,
+    algorithm: str | None = None,
+):
+    """Argon2 parameters that take about ``target_seconds`` per unlock on this host"""
+    settings = {"target_seconds": target_seconds, "memory_kib": memory_kib,
+                "parallelism": parallelism, "algorithm": algorithm}
+    try:
+        return kdf.resolve(settings)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Ungültige KDF-Parameter: {e}")
+
+
+@router.put("/save-settings")
+def update_save_settings(request: SaveSettingsRequest, db: KdbxDatabase = Depends(current_db)):
+    """Configure write-behind saving (debounce / max dirty age in seconds)"""
+    try:
+        return db.configure_saving(request.write_behind, request.debounce, request.max_dirty_age)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler beim Speichern: {e}")
+
+
+@router.get("/index-check")
+def check_index(db: KdbxDatabase = Depends(current_db)):
+    """Debug: compare the in-memory UUID index against the KDBX tree"""
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    return db.check_index()
+
+
+@router.get("/sessions")
+def list_sessions():
+    """Open vault sessions with per-vault usage and memory estimates"""
+    return sessions.stats()
+
+
+@router.put("/session-settings")
+def update_session_settings(request: SessionSettingsRequest):
+    """Configure session limits (count, idle timeout in seconds, memory budget)"""
+    return sessions.configure(request.max_sessions, request.idle_timeout, request.memory_budget_mb)
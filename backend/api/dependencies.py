@@ -0,0 +1,54 @@
+"""Shared route dependencies and conditional-request helpers"""
+
+import secrets
+
+from fastapi import Header, HTTPException, Request, Response
+
+from backend.core.kdbx.parser import KdbxDatabase
+from backend.core.kdbx.sessions import sessions
+
+# Distinguishes revisions of this process from those of an earlier run
+_BOOT = secrets.token_hex(4)
+
+
+async def current_db(x_vault_session: str | None = Header(default=None)) -> KdbxDatabase:
+    """The vault of the session named by ``X-Vault-Session`` (default session if absent)"""
+    session = sessions.get(x_vault_session)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Sitzung nicht gefunden")
+    return session.db
+
+
+def revision_etag(db: KdbxDatabase, *parts: str) -> str:
+    """Weak ETag for the vault's current revision, optionally scoped to an object id.
+
+    Read it before reading the data: a mutation in between then yields an
+    older tag for newer data (refetched next time), never the reverse.
+    """
+    return 'W/"' + "-".join((_BOOT, str(db.revision), *parts)) + '"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """Return a 304 if the client already has ``etag``; else tag ``response``"""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """Whether ``If-None-Match`` lists ``etag`` (or ``*``)"""
+    candidates = [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+    # If-None-Match uses weak comparison: W/ prefixes are ignored
+    return "*" in candidates or _opaque(etag) in {_opaque(t) for t in candidates}
+
+
+def json_response(response: Response, content: bytes) -> Response:
+    """Send already serialized JSON, keeping the headers set on ``response``"""
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return Response(content, media_type="application/json", headers=headers)
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
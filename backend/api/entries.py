@@ -1,9 +1,14 @@
 """Entry CRUD API endpoints - real pykeepass implementation"""
 
-from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 
-from backend.core.kdbx.parser import db
+from backend.api.dependencies import current_db, json_response, not_modified, revision_etag
+from backend.core.kdbx.parser import BatchRollbackError, KdbxDatabase
+from backend.core.kdbx.serialization import dumps
 
 router = APIRouter(prefix="/api/entries", tags=["entries"])
 
@@ -27,29 +32,98 @@ class EntryUpdate(BaseModel):
     notes: str | None = None
     custom_fields: dict[str, str] | None = None
     tags: list[str] | None = None
+    expires: bool | None = None
+    expiry_time: datetime | None = None
+
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete", "move"]
+    id: str | None = None
+    group_id: str | None = None
+    fields: EntryUpdate | None = None
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation]
 
 
 @router.get("/")
-async def list_entries(group_id: str | None = None):
-    """List all entries, optionally filtered by group"""
+def list_entries(
+    request: Request,
+    response: Response,
+    group_id: str | None = None,
+    fields: str | None = None,
+    sort: str | None = None,
+    cursor: str | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    db: KdbxDatabase = Depends(current_db),
+):
+    """List entries, optionally filtered by group.
+
+    Listings never carry passwords, notes or custom field values; those
+    come from ``GET /entries/{id}`` only. With any of
+    ``fields``/``sort``/``cursor``/``limit`` the response is a page
+    ``{items, total, next_cursor}`` of projections (``fields=summary`` by
+    default). Without them it is an array of all entries with every
+    listable field.
+    """
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
-    return db.list_entries(group_id)
+    cached = not_modified(request, response, revision_etag(db))
+    if cached:
+        return cached
+    if fields is None and sort is None and cursor is None and limit is None:
+        return json_response(response, db.list_entries_json(group_id))
+    try:
+        page = db.list_entries_page(group_id, fields, sort, cursor, limit)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(response, dumps(page))
 
 
 @router.get("/search")
-async def search_entries(q: str = ""):
-    """Search entries"""
+def search_entries(
+    request: Request,
+    response: Response,
+    q: str = "",
+    limit: int | None = Query(default=None, ge=1),
+    fields: str | None = None,
+    cursor: str | None = None,
+    db: KdbxDatabase = Depends(current_db),
+):
+    """Ranked search; supports user:, url:, tag:, group: field prefixes.
+
+    Returns an array of entries with every listable field (no secrets),
+    or with ``fields`` or ``cursor`` a page ``{items, next_cursor}`` of
+    projections.
+    """
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
-    return db.search(q)
+    cached = not_modified(request, response, revision_etag(db))
+    if cached:
+        return cached
+    if fields is None and cursor is None:
+        return json_response(response, db.search_json(q, limit))
+    try:
+        page = db.search_page(q, fields, cursor, limit)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(response, dumps(page))
 
 
 @router.get("/{entry_id}")
-async def get_entry(entry_id: str):
+def get_entry(
+    entry_id: str,
+    request: Request,
+    response: Response,
+    db: KdbxDatabase = Depends(current_db),
+):
     """Get a single entry by ID"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    cached = not_modified(request, response, revision_etag(db, entry_id))
+    if cached:
+        return cached
     entry = db.get_entry(entry_id)
     if not entry:
         raise HTTPException(status_code=404, detail="Eintrag nicht gefunden")
@@ -57,7 +131,7 @@ async def get_entry(entry_id: str):
 
 
 @router.post("/")
-async def create_entry(data: EntryCreate):
+def create_entry(data: EntryCreate, db: KdbxDatabase = Depends(current_db)):
     """Create a new entry"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
@@ -76,8 +150,22 @@ async def create_entry(data: EntryCreate):
         raise HTTPException(status_code=500, detail=f"Fehler: {e}")
 
 
+@router.post("/batch")
+def apply_batch(request: BatchRequest, db: KdbxDatabase = Depends(current_db)):
+    """Apply many entry operations at once; all succeed or none are applied"""
+    if not db.is_open:
+        raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    try:
+        result = db.apply_batch([op.model_dump(exclude_none=True) for op in request.operations])
+    except BatchRollbackError as e:
+        raise HTTPException(status_code=500, detail=f"Batch konnte nicht zurückgesetzt werden: {e}")
+    if not result["success"]:
+        raise HTTPException(status_code=409, detail=result)
+    return result
+
+
 @router.put("/{entry_id}")
-async def update_entry(entry_id: str, updates: EntryUpdate):
+def update_entry(entry_id: str, updates: EntryUpdate, db: KdbxDatabase = Depends(current_db)):
     """Update an existing entry"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
@@ -88,7 +176,7 @@ async def update_entry(entry_id: str, updates: EntryUpdate):
 
 
 @router.delete("/{entry_id}")
-async def delete_entry(entry_id: str):
+def delete_entry(entry_id: str, db: KdbxDatabase = Depends(current_db)):
     """Delete an entry (move to recycle bin)"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
@@ -1,107 +1,89 @@
 """Password/Passphrase/PIN generation API endpoints"""
 
-import secrets
-import string
-
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from backend.core.generators.passphrase import generate_passphrases, passphrase_entropy
+from backend.core.generators.password import build_charset, generate_passwords, password_entropy
+from backend.core.generators.pin import generate_pins, pin_entropy
+from backend.core.generators.strength import strength_label
 
 router = APIRouter(prefix="/api/generator", tags=["generator"])
 
+# Upper bound of ``count`` per request (bulk provisioning)
+MAX_COUNT = 10000
+
 
 class PasswordRequest(BaseModel):
-    length: int = 20
+    length: int = Field(default=20, ge=1, le=1024)
     uppercase: bool = True
     lowercase: bool = True
     numbers: bool = True
     symbols: bool = True
     exclude_similar: bool = False
+    count: int = Field(default=1, ge=1, le=MAX_COUNT)
 
 
 class PassphraseRequest(BaseModel):
-    word_count: int = 6
+    word_count: int = Field(default=6, ge=1, le=64)
     separator: str = "-"
     capitalize: bool = True
     include_number: bool = True
+    count: int = Field(default=1, ge=1, le=MAX_COUNT)
 
 
 class PinRequest(BaseModel):
-    length: int = 6
+    length: int = Field(default=6, ge=1, le=64)
     exclude_sequential: bool = True
+    count: int = Field(default=1, ge=1, le=MAX_COUNT)
 
 
 class GeneratorResponse(BaseModel):
     result: str
     entropy: float
     strength: str
+    # All generated values when ``count`` > 1 (``result`` is the first)
+    results: list[str] | None = None
 
 
-@router.post("/password", response_model=GeneratorResponse)
-async def generate_password(request: PasswordRequest):
-    """Generate a random password"""
-    charset = ""
-    if request.lowercase:
-        charset += string.ascii_lowercase
-    if request.uppercase:
-        charset += string.ascii_uppercase
-    if request.numbers:
-        charset += string.digits
-    if request.symbols:
-        charset += string.punctuation
-
-    if not charset:
-        charset = string.ascii_lowercase
-
-    password = "".join(secrets.choice(charset) for _ in range(request.length))
-
-    import math
-    entropy = request.length * math.log2(len(charset))
-    strength = (
-        "weak" if entropy < 40
-        else "medium" if entropy < 60
-        else "strong" if entropy < 80
-        else "veryStrong"
+def _response(values: list[str], entropy: float) -> GeneratorResponse:
+    return GeneratorResponse(
+        result=values[0],
+        entropy=entropy,
+        strength=strength_label(entropy),
+        results=values if len(values) > 1 else None,
     )
 
-    return GeneratorResponse(result=password, entropy=entropy, strength=strength)
+
+@router.post("/password", response_model=GeneratorResponse)
+def generate_password(request: PasswordRequest):
+    """Generate one or more random passwords"""
+    charset = build_charset(
+        uppercase=request.uppercase,
+        lowercase=request.lowercase,
+        numbers=request.numbers,
+        symbols=request.symbols,
+        exclude_similar=request.exclude_similar,
+    )
+    passwords = generate_passwords(charset, request.length, request.count)
+    return _response(passwords, password_entropy(charset, request.length))
 
 
 @router.post("/passphrase", response_model=GeneratorResponse)
-async def generate_passphrase(request: PassphraseRequest):
-    """Generate a random passphrase"""
-    # Simplified wordlist for demo
-    words = [
-        "acid", "acme", "aged", "also", "area", "army", "away", "baby",
-        "back", "bail", "bake", "ball", "band", "bank", "bare", "bark",
-        "barn", "base", "bash", "bath", "beam", "bean", "bear", "beat",
-        "bird", "blow", "blue", "boat", "bold", "bolt", "bond", "bone",
-        "book", "born", "boss", "both", "bulk", "burn", "busy", "cafe",
-    ]
-
-    selected = [secrets.choice(words) for _ in range(request.word_count)]
-    if request.capitalize:
-        selected = [w.capitalize() for w in selected]
-
-    passphrase = request.separator.join(selected)
-    if request.include_number:
-        passphrase += request.separator + str(secrets.randbelow(10000))
-
-    import math
-    entropy = request.word_count * math.log2(len(words))
-
-    return GeneratorResponse(
-        result=passphrase,
-        entropy=entropy,
-        strength="strong" if entropy > 60 else "medium",
+def generate_passphrase(request: PassphraseRequest):
+    """Generate one or more Diceware passphrases (EFF large wordlist)"""
+    phrases = generate_passphrases(
+        request.word_count,
+        separator=request.separator,
+        capitalize=request.capitalize,
+        include_number=request.include_number,
+        count=request.count,
     )
+    return _response(phrases, passphrase_entropy(request.word_count, request.include_number))
 
 
 @router.post("/pin", response_model=GeneratorResponse)
-async def generate_pin(request: PinRequest):
-    """Generate a random PIN"""
-    pin = "".join(str(secrets.randbelow(10)) for _ in range(request.length))
-
-    import math
-    entropy = request.length * math.log2(10)
-
-    return GeneratorResponse(result=pin, entropy=entropy, strength="weak")
+def generate_pin(request: PinRequest):
+    """Generate one or more random PINs"""
+    pins = generate_pins(request.length, request.exclude_sequential, request.count)
+    return _response(pins, pin_entropy(request.length, request.exclude_sequential))
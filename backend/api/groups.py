@@ -1,9 +1,10 @@
 """Group operations API endpoints - real pykeepass implementation"""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel
 
-from backend.core.kdbx.parser import db
+from backend.api.dependencies import current_db, not_modified, revision_etag
+from backend.core.kdbx.parser import KdbxDatabase
 
 router = APIRouter(prefix="/api/groups", tags=["groups"])
 
@@ -19,15 +20,18 @@ class GroupUpdate(BaseModel):
 
 
 @router.get("/")
-async def list_groups():
+def list_groups(request: Request, response: Response, db: KdbxDatabase = Depends(current_db)):
     """List all groups as tree structure"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
+    cached = not_modified(request, response, revision_etag(db))
+    if cached:
+        return cached
     return db.list_groups()
 
 
 @router.post("/")
-async def create_group(group: GroupCreate):
+def create_group(group: GroupCreate, db: KdbxDatabase = Depends(current_db)):
     """Create a new group"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
@@ -38,7 +42,7 @@ async def create_group(group: GroupCreate):
 
 
 @router.put("/{group_id}")
-async def update_group(group_id: str, updates: GroupUpdate):
+def update_group(group_id: str, updates: GroupUpdate, db: KdbxDatabase = Depends(current_db)):
     """Update a group"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
@@ -49,7 +53,7 @@ async def update_group(group_id: str, updates: GroupUpdate):
 
 
 @router.delete("/{group_id}")
-async def delete_group(group_id: str):
+def delete_group(group_id: str, db: KdbxDatabase = Depends(current_db)):
     """Delete a group"""
     if not db.is_open:
         raise HTTPException(status_code=400, detail="Keine Datenbank geöffnet")
@@ -0,0 +1,16 @@
+"""Metrics API endpoint - Prometheus text exposition"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.core.metrics import registry
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", response_class=PlainTextResponse)
+def get_metrics():
+    """Request latencies, vault timings (KDF, decrypt, save), lookups and cache hits"""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
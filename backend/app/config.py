@@ -0,0 +1,114 @@
+"""Runtime configuration, read once from VAULTIX_* environment variables"""
+
+from __future__ import annotations
+
+import os
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+# Write-behind saving: mutations mark the database dirty and a background
+# flusher writes the .kdbx once the vault has been quiet for SAVE_DEBOUNCE
+# seconds, or at the latest SAVE_MAX_DIRTY_AGE seconds after the first
+# unsaved change.
+WRITE_BEHIND = _env_bool("VAULTIX_WRITE_BEHIND", True)
+SAVE_DEBOUNCE = _env_float("VAULTIX_SAVE_DEBOUNCE", 2.0)
+SAVE_MAX_DIRTY_AGE = _env_float("VAULTIX_SAVE_MAX_DIRTY_AGE", 10.0)
+
+# Mutation journal: every change is appended, encrypted and fsynced, to
+# ``<vault>.vaultix-journal`` and replayed on the next open after a crash,
+# so the full KDBX save (a checkpoint) can be rare. With the journal on,
+# checkpoints run once the vault has been quiet for JOURNAL_CHECKPOINT_DEBOUNCE
+# seconds, JOURNAL_CHECKPOINT_MAX_AGE seconds after the first unsaved change,
+# or as soon as the journal grows past JOURNAL_CHECKPOINT_BYTES; the SAVE_*
+# timings above apply without it.
+JOURNAL = _env_bool("VAULTIX_JOURNAL", True)
+JOURNAL_CHECKPOINT_DEBOUNCE = _env_float("VAULTIX_JOURNAL_CHECKPOINT_DEBOUNCE", 60.0)
+JOURNAL_CHECKPOINT_MAX_AGE = _env_float("VAULTIX_JOURNAL_CHECKPOINT_MAX_AGE", 600.0)
+JOURNAL_CHECKPOINT_BYTES = _env_int("VAULTIX_JOURNAL_CHECKPOINT_BYTES", 8 * 1024 * 1024)
+
+# Key derivation of new vaults: Argon2 (KDF_ALGORITHM "argon2id" or
+# "argon2d") with KDF_MEMORY_MB and KDF_PARALLELISM lanes, its iterations
+# calibrated on this host so one unlock takes about KDF_TARGET_SECONDS.
+# Memory is halved until a single iteration fits the target. 0 keeps the
+# pykeepass defaults (Argon2d, 64 MiB, 14 iterations).
+KDF_TARGET_SECONDS = _env_float("VAULTIX_KDF_TARGET_SECONDS", 1.0)
+KDF_ALGORITHM = os.environ.get("VAULTIX_KDF_ALGORITHM", "argon2id")
+KDF_MEMORY_MB = _env_int("VAULTIX_KDF_MEMORY_MB", 64)
+KDF_PARALLELISM = _env_int("VAULTIX_KDF_PARALLELISM", 2)
+
+# Attachment uploads are spooled before they enter the vault: up to
+# UPLOAD_SPOOL_MEMORY_MB in memory, beyond that in an anonymous temporary
+# file in UPLOAD_SPOOL_DIR (the system default if empty), encrypted under a
+# per-upload key. Larger uploads than UPLOAD_MAX_MB are rejected; the vault
+# keeps every attachment in memory while it is open.
+UPLOAD_SPOOL_MEMORY_MB = _env_float("VAULTIX_UPLOAD_SPOOL_MEMORY_MB", 1.0)
+UPLOAD_SPOOL_DIR = os.environ.get("VAULTIX_UPLOAD_SPOOL_DIR", "")
+UPLOAD_MAX_MB = _env_float("VAULTIX_UPLOAD_MAX_MB", 512.0)
+
+# Size of the worker thread pool that runs the (blocking) database routes,
+# so Argon2, XPath scans and saves never stall the event loop.
+WORKER_THREADS = _env_int("VAULTIX_WORKER_THREADS", 16)
+
+# Open vault sessions: at most MAX_SESSIONS vaults stay decrypted at once.
+# A session unused for SESSION_IDLE_TIMEOUT seconds is closed, and the least
+# recently used sessions are closed while the estimated memory of all open
+# vaults exceeds SESSION_MEMORY_BUDGET_MB.
+MAX_SESSIONS = _env_int("VAULTIX_MAX_SESSIONS", 8)
+SESSION_IDLE_TIMEOUT = _env_float("VAULTIX_SESSION_IDLE_TIMEOUT", 900.0)
+SESSION_MEMORY_BUDGET_MB = _env_float("VAULTIX_SESSION_MEMORY_BUDGET_MB", 1024.0)
+
+# Number of entry/group change records kept per vault for /api/changes;
+# clients whose cursor is older than the oldest record must resync.
+CHANGE_LOG_SIZE = _env_int("VAULTIX_CHANGE_LOG_SIZE", 10000)
+
+# Password audit: zxcvbn runs in AUDIT_WORKERS processes (0 scores in the
+# server process) and up to AUDIT_CACHE_SIZE scores are cached by keyed
+# password hash. With AUDIT_ON_OPEN the passwords of a vault are scored in
+# the background as soon as it is opened.
+AUDIT_WORKERS = _env_int("VAULTIX_AUDIT_WORKERS", os.cpu_count() or 1)
+AUDIT_CACHE_SIZE = _env_int("VAULTIX_AUDIT_CACHE_SIZE", 100000)
+AUDIT_ON_OPEN = _env_bool("VAULTIX_AUDIT_ON_OPEN", True)
+
+# Local Pwned Passwords dataset for offline breach checks: the SHA-1 text
+# file ordered by hash, or its compact form built with
+# ``python -m backend.core.security.breach_checker``. Empty disables them.
+BREACH_DATASET = os.environ.get("VAULTIX_BREACH_DATASET", "")
+
+# Serialized JSON of up to ENTRY_JSON_CACHE_SIZE entries is kept per open
+# vault; full entry listings and search results are assembled from it.
+ENTRY_JSON_CACHE_SIZE = _env_int("VAULTIX_ENTRY_JSON_CACHE_SIZE", 25000)
+
+# Entries expiring within this many days count as "expiring soon" on the
+# audit dashboard.
+EXPIRY_WARNING_DAYS = _env_float("VAULTIX_EXPIRY_WARNING_DAYS", 14.0)
+
+# Debug only: with PROFILE_DIR set, requests sent with the header
+# ``X-Vault-Profile: 1`` run under cProfile and the stats are dumped there
+# (one .prof file per request, readable with pstats or snakeviz).
+PROFILE_DIR = os.environ.get("VAULTIX_PROFILE_DIR", "")
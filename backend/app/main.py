@@ -1,16 +1,58 @@
 """Vaultix Backend - FastAPI Application"""
 
+import sys
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.api import database, entries, groups, attachments, generator, audit
+from backend.api import metrics
+from backend.app import config
+from backend.app.middleware import ProfilingMiddleware, TimingMiddleware
+from backend.app.routers import LazyRouterMiddleware, LazyRouters
+
+# Routers are imported on their first request, so /api/health answers before
+# pykeepass, lxml and the crypto libraries are loaded. The vault routers are
+# preloaded in the background right after startup; audit and the generators
+# (zxcvbn, the EFF wordlist) load only when first used.
+ROUTERS = {
+    "/api/database": "backend.api.database",
+    "/api/entries": "backend.api.entries",
+    "/api/groups": "backend.api.groups",
+    "/api/attachments": "backend.api.attachments",
+    "/api/changes": "backend.api.changes",
+    "/api/generator": "backend.api.generator",
+    "/api/audit": "backend.api.audit",
+}
+PRELOADED = ("/api/database", "/api/entries", "/api/groups", "/api/attachments", "/api/changes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Database routes are plain ``def`` and run in this pool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = config.WORKER_THREADS
+    routers.preload(PRELOADED)
+    yield
+    # Flush pending write-behind changes before the process exits (nothing
+    # to do for modules that were never loaded)
+    session_module = sys.modules.get("backend.core.kdbx.sessions")
+    if session_module is not None:
+        await anyio.to_thread.run_sync(session_module.sessions.close_all)
+    audit_module = sys.modules.get("backend.core.security.audit_service")
+    if audit_module is not None:
+        audit_module.scoring_pool.shutdown()
+
 
 app = FastAPI(
     title="Vaultix",
     description="Next-Gen KeePass Password Manager API",
     version="0.1.0",
+    lifespan=lifespan,
 )
+routers = LazyRouters(app, ROUTERS)
 
+app.add_middleware(LazyRouterMiddleware, routers=routers)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
@@ -18,13 +60,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if config.PROFILE_DIR:
+    app.add_middleware(ProfilingMiddleware, directory=config.PROFILE_DIR)
+app.add_middleware(TimingMiddleware)
 
-app.include_router(database.router)
-app.include_router(entries.router)
-app.include_router(groups.router)
-app.include_router(attachments.router)
-app.include_router(generator.router)
-app.include_router(audit.router)
+app.include_router(metrics.router)
 
 
 @app.get("/api/health")
@@ -0,0 +1,113 @@
+"""ASGI middleware: per-route latency metrics and the debug request profiler"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import os
+import pstats
+import re
+import time
+from datetime import datetime
+
+from backend.core.metrics import http_request_duration
+from backend.core.profiling import profile_request
+
+
+class TimingMiddleware:
+    """Records the latency of every HTTP request by method, route template and status.
+
+    The route template (``/api/entries/{entry_id}``) is used instead of the
+    path, so ids and query strings never become label values; requests no
+    route matched are counted as ``unmatched``. Streaming responses are
+    timed until their last byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=_route_template(scope),
+                status=str(status),
+            )
+
+
+class ProfilingMiddleware:
+    """Debug only: runs requests sent with ``X-Vault-Profile: 1`` under cProfile.
+
+    The event-loop part of the request (routing, async dependencies,
+    response rendering) and the vault operations it runs in a worker
+    thread are profiled separately and merged into one ``.prof`` file in
+    ``directory``; its name is returned in the ``X-Vault-Profile-File``
+    header. Profiled requests run one at a time, but other requests served
+    by the event loop meanwhile show up in the loop's profile.
+    """
+
+    def __init__(self, app, directory: str):
+        self.app = app
+        self.directory = directory
+        self._one_at_a_time = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _header(scope, b"x-vault-profile") != b"1":
+            await self.app(scope, receive, send)
+            return
+
+        started = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+
+        def filename() -> str:
+            # Named after the route template, not the path, so no ids end up on disk
+            route = re.sub(r"[^A-Za-z0-9]+", "_", _route_template(scope)).strip("_")
+            return f"{started}-{scope['method']}-{route}.prof"
+
+        async def send_with_filename(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-vault-profile-file", filename().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        async with self._one_at_a_time:
+            try:
+                with profile_request() as profiles:
+                    await self.app(scope, receive, send_with_filename)
+            finally:
+                self._dump(profiles, filename())
+
+    def _dump(self, profiles: list[cProfile.Profile], filename: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(os.path.join(self.directory, filename))
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _header(scope, name: bytes) -> bytes | None:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value
+    return None
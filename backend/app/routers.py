@@ -0,0 +1,78 @@
+"""API routers imported on first request, so the process starts serving early"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import threading
+from typing import Iterable
+
+import anyio.to_thread
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+
+class LazyRouters:
+    """Routers by URL prefix, imported and included when first requested.
+
+    ``routers`` maps a prefix (``/api/entries``) to the module that defines
+    its ``router``. The import runs in a worker thread, so the event loop
+    keeps answering ``/api/health`` meanwhile; requests for the OpenAPI
+    schema load every router first.
+    """
+
+    def __init__(self, app: FastAPI, routers: dict[str, str]):
+        self.app = app
+        self.routers = routers
+        self._included: set[str] = set()
+        self._lock = asyncio.Lock()
+
+    async def include_for(self, path: str) -> None:
+        """Include the router serving ``path`` unless that already happened"""
+        if path == self.app.openapi_url:
+            prefixes = list(self.routers)
+        else:
+            prefixes = [p for p in self.routers if path == p or path.startswith(p + "/")]
+        if all(p in self._included for p in prefixes):
+            return
+        async with self._lock:
+            for prefix in prefixes:
+                if prefix in self._included:
+                    continue
+                module = await anyio.to_thread.run_sync(importlib.import_module, self.routers[prefix])
+                self.app.include_router(module.router)
+                self._included.add(prefix)
+            self.app.openapi_schema = None
+
+    def preload(self, prefixes: Iterable[str]) -> threading.Thread:
+        """Import the modules of ``prefixes`` in a background thread.
+
+        The routers are still included on their first request, which then
+        finds the module (and pykeepass, lxml, ...) already imported.
+        """
+
+        def run():
+            for prefix in prefixes:
+                try:
+                    importlib.import_module(self.routers[prefix])
+                except Exception:
+                    logger.exception("Preloading %s failed", self.routers[prefix])
+
+        thread = threading.Thread(target=run, name="vaultix-preload", daemon=True)
+        thread.start()
+        return thread
+
+
+class LazyRouterMiddleware:
+    """Includes the lazily loaded router for a request before it is routed"""
+
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            await self.routers.include_for(scope["path"])
+        await self.app(scope, receive, send)
@@ -0,0 +1,123 @@
+"""Benchmark: peak Python memory per attachment download.
+
+Builds a throwaway vault with one large attachment, then downloads it
+through the FastAPI route (full body and a 1 MiB range) while tracing
+allocations. Run from the repository root:
+
+    python -m backend.benchmarks.attachment_download --size-mb 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from backend.app.main import app
+from backend.core.attachments.spool import SPOOL_CHUNK_SIZE, EncryptedSpool
+from backend.core.kdbx.parser import db
+
+
+def _download(url: str, headers: dict | None = None) -> dict:
+    """Drive the ASGI app directly and discard the body as it arrives.
+
+    TestClient collects the whole response before returning it, which
+    would hide what the server itself holds in memory.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": url,
+        "raw_path": url.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    result = {"status": None, "bytes": 0}
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            # The client never disconnects; block like a live connection
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            result["bytes"] += len(message.get("body", b""))
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    asyncio.run(app(scope, receive, send))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        **result,
+        "seconds": round(elapsed, 3),
+        "mb_per_s": round(result["bytes"] / elapsed / 1e6, 1) if elapsed else None,
+        "peak_mb": round(peak / 1e6, 2),
+    }
+
+
+def _attach(entry_id: str, data: bytes) -> dict:
+    with EncryptedSpool(max_size=len(data)) as spool:
+        spool.write(data)
+        spool.finish()
+        return db.add_attachment(entry_id, "other.bin", spool)
+
+
+def run(size_mb: int) -> dict:
+    size = size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.kdbx")
+        db.create(path, "benchmark")
+        try:
+            entry = db.create_entry("attachment holder", group_id="")
+            # Attachment ids are positions within the entry, not binary pool
+            # indexes; a pool that already holds a binary keeps the two apart
+            _attach(db.create_entry("other holder", group_id="")["id"], b"other")
+            with EncryptedSpool(max_size=size) as spool:
+                for offset in range(0, size, SPOOL_CHUNK_SIZE):
+                    spool.write(os.urandom(min(SPOOL_CHUNK_SIZE, size - offset)))
+                spool.finish()
+                attachment = db.add_attachment(entry["id"], "payload.bin", spool)
+
+            url = f"/api/attachments/{entry['id']}/{attachment['id']}"
+            # The first request also computes and caches the content hash
+            results = {
+                "size_mb": size_mb,
+                "full_first": _download(url),
+                "full": _download(url),
+                "range_1mb": _download(url, {"Range": "bytes=0-1048575"}),
+            }
+        finally:
+            db.close()
+    for name, expected in (("full_first", 200), ("full", 200), ("range_1mb", 206)):
+        if results[name]["status"] != expected:
+            raise RuntimeError(f"{name}: HTTP {results[name]['status']}, expected {expected}")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=200)
+    args = parser.parse_args()
+    for name, value in run(args.size_mb).items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Benchmark: server memory per attachment upload.
+
+Creates a throwaway vault and uploads one large attachment through the
+FastAPI route as a streamed multipart body, then the same payload again
+(deduplicated), reporting the peak of traced Python memory and of the
+process RSS for each. A new binary makes the route wait for a checkpoint,
+so the save is also measured on its own, and the upload without it is
+compared with the naive way: body buffered whole, the file part copied
+out, then added to the vault. Run from the repository root:
+
+    python -m backend.benchmarks.attachment_upload --size-mb 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterator
+
+from backend.app.main import app
+from backend.core.attachments import file_handler
+from backend.core.attachments.spool import EncryptedSpool
+from backend.core.attachments.upload import MultipartFileReader
+from backend.core.kdbx.parser import db
+
+BOUNDARY = "vaultix-benchmark-boundary"
+MESSAGE_SIZE = 64 * 1024
+
+
+def _body(size: int, seed: int) -> Iterator[bytes]:
+    """A multipart body with ``size`` pseudo-random file bytes, generated as it is sent"""
+    yield (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; "
+           f"filename=\"payload.bin\"\r\nContent-Type: application/octet-stream\r\n\r\n").encode()
+    rng = random.Random(seed)
+    for start in range(0, size, MESSAGE_SIZE):
+        yield rng.randbytes(min(MESSAGE_SIZE, size - start))
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark (Linux only)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _rss_kib(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def _measured(operation: Callable[[], dict]) -> dict:
+    rss = _reset_peak_rss()
+    rss_before = _rss_kib("VmRSS") if rss else 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = operation()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result.update({"seconds": round(elapsed, 3), "peak_mb": round(peak / 1e6, 2)})
+    if rss:
+        result["peak_rss_growth_mb"] = round((_rss_kib("VmHWM") - rss_before) * 1024 / 1e6, 2)
+    return result
+
+
+def _upload(url: str, body: Iterator[bytes]) -> dict:
+    """Drive the ASGI app directly, sending the body in small messages.
+
+    TestClient would build the whole body first, which hides what the
+    server itself holds in memory.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": url,
+        "raw_path": url.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    result = {"status": None, "response": b""}
+    messages = iter(body)
+    done = False
+
+    async def receive():
+        nonlocal done
+        if done:
+            await asyncio.Event().wait()
+        chunk = next(messages, None)
+        if chunk is None:
+            done = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.request", "body": chunk, "more_body": True}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            result["response"] += message.get("body", b"")
+
+    asyncio.run(app(scope, receive, send))
+    return {"status": result["status"], "response": result["response"].decode()[:120]}
+
+
+def _buffered(entry_id: str, body: Iterator[bytes]) -> dict:
+    """The naive path: whole body in memory, file part copied out, then added"""
+    raw = b"".join(body)
+    spool = EncryptedSpool(max_memory=len(raw), max_size=len(raw))
+    reader = MultipartFileReader(f"multipart/form-data; boundary={BOUNDARY}", spool)
+    reader.write(raw)
+    filename = reader.finish()
+    data = b"".join(bytes(chunk) for chunk in spool.chunks())
+    spool.close()
+    kp_entry = db._find_entry_by_uuid(entry_id)
+    binary_id = db._kp.add_binary(data, protected=True)
+    kp_entry.add_attachment(binary_id, filename)
+    return {"binary_id": binary_id}
+
+
+def _spooled(entry_id: str, body: Iterator[bytes]) -> dict:
+    """What the route does before its checkpoint: stream, spool, append to the pool"""
+    with EncryptedSpool() as spool:
+        reader = MultipartFileReader(f"multipart/form-data; boundary={BOUNDARY}", spool)
+        for chunk in body:
+            reader.write(chunk)
+        filename = reader.finish()
+        binary_id = file_handler.append_binary(db._kp, spool.chunks(), spool.size)
+        on_disk = spool.on_disk
+    db._find_entry_by_uuid(entry_id).add_attachment(binary_id, filename)
+    return {"binary_id": binary_id, "spooled_to_disk": on_disk}
+
+
+def run(size_mb: int, seed: int) -> dict:
+    size = size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        db.create(os.path.join(tmp, "bench.kdbx"), "benchmark")
+        try:
+            first = db.create_entry("upload target", group_id="")["id"]
+            second = db.create_entry("duplicate target", group_id="")["id"]
+            third = db.create_entry("buffered target", group_id="")["id"]
+            fourth = db.create_entry("spooled target", group_id="")["id"]
+            results = {
+                "size_mb": size_mb,
+                "journal": db.save_status()["journal"]["enabled"],
+                "streamed": _measured(lambda: _upload(f"/api/attachments/{first}", _body(size, seed))),
+                "duplicate": _measured(lambda: _upload(f"/api/attachments/{second}", _body(size, seed))),
+                "save": _measured(lambda: {"saved": db.save()}),
+                # Both without a save, bypassing the vault's bookkeeping
+                "buffered": _measured(lambda: _buffered(third, _body(size, seed + 1))),
+                "spooled": _measured(lambda: _spooled(fourth, _body(size, seed + 2))),
+            }
+        finally:
+            db.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    for name, value in run(args.size_mb, args.seed).items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
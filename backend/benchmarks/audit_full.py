@@ -0,0 +1,125 @@
+"""Benchmark: full password audit of a synthetic vault.
+
+Builds an in-memory vault (default 50k entries) with a realistic mix of
+common, reused and unique random passwords, then measures:
+
+* a cold audit (every distinct password scored in the process pool),
+* the same audit again (all scores cached, served from the aggregates),
+* an audit after a small batch of password changes (only those rescored),
+* the serial zxcvbn rate on a sample, extrapolated to the whole vault.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.audit_full --entries 50000 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from backend.benchmarks.synthetic_vault import synthetic_passwords
+from backend.core.kdbx.parser import KdbxDatabase
+from backend.core.security import audit_service
+from backend.core.security.strength_analyzer import score_batch
+
+def _fill(db: KdbxDatabase, passwords: list[str], rng: random.Random) -> list[str]:
+    ids = []
+    for start in range(0, len(passwords), 1000):
+        operations = [
+            {
+                "op": "create",
+                "fields": {
+                    "title": f"Service {start + i}",
+                    "username": f"user{rng.randint(0, 5000)}@example.com",
+                    "password": password,
+                },
+            }
+            for i, password in enumerate(passwords[start:start + 1000])
+        ]
+        result = db.apply_batch(operations)
+        ids.extend(r["id"] for r in result["results"])
+    return ids
+
+
+def run(entries: int, workers: int, changes: int, sample: int) -> dict:
+    rng = random.Random(1234)
+    passwords = synthetic_passwords(entries, rng)
+    pool = audit_service.scoring_pool
+    pool.shutdown()
+    pool.workers = workers
+    audit_service.strength_cache.clear()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = KdbxDatabase(write_behind=True, save_debounce=3600, save_max_dirty_age=3600)
+        db.create(os.path.join(tmp, "audit.kdbx"), "audit")
+        try:
+            ids = _fill(db, passwords, rng)
+
+            started = time.perf_counter()
+            scored = db.score_passwords()
+            health = db.audit_health()
+            cold = time.perf_counter() - started
+
+            started = time.perf_counter()
+            db.audit_health()
+            warm = time.perf_counter() - started
+
+            started = time.perf_counter()
+            duplicates = db.audit_duplicates()
+            weak = db.audit_weak()
+            listings = time.perf_counter() - started
+
+            for entry_id in rng.sample(ids, changes):
+                token = "".join(rng.choices(string.ascii_letters + string.digits, k=16))
+                db.update_entry(entry_id, {"password": token})
+            started = time.perf_counter()
+            rescored = db.score_passwords()
+            db.audit_health()
+            incremental = time.perf_counter() - started
+        finally:
+            db.close()
+
+    sample_passwords = list(dict.fromkeys(passwords))[:sample]
+    started = time.perf_counter()
+    score_batch(sample_passwords)
+    per_password = (time.perf_counter() - started) / max(len(sample_passwords), 1)
+    pool.shutdown()
+
+    return {
+        "entries": entries,
+        "workers": workers,
+        "distinct_passwords": scored,
+        "cold_audit_seconds": round(cold, 2),
+        "cold_passwords_per_second": round(scored / cold) if cold else 0,
+        "serial_estimate_seconds": round(per_password * scored, 2),
+        "cached_health_ms": round(warm * 1000, 2),
+        "weak_and_duplicates_ms": round(listings * 1000, 2),
+        "changed_entries": changes,
+        "rescored_passwords": rescored,
+        "incremental_audit_ms": round(incremental * 1000, 2),
+        "weak": health["weak"],
+        "duplicate_groups": len(duplicates),
+        "weak_listed": len(weak),
+        "security_score": health["security_score"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--changes", type=int, default=100)
+    parser.add_argument("--sample", type=int, default=2000, help="passwords scored serially for the estimate")
+    args = parser.parse_args()
+    results = run(args.entries, args.workers, args.changes, args.sample)
+    for name, value in results.items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Stress test: concurrent readers against writers and background saves.
+
+Every entry keeps ``title == username``; writers always change both fields
+in one mutation. Readers check the invariant on every entry they see, so a
+read that observes half of a mutation (a torn read) is counted and makes
+the script exit non-zero. A final phase forces a save and counts how many
+reads and writes complete while it runs. Run from the repository root:
+
+    python -m backend.benchmarks.concurrency_stress --seconds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from backend.core.kdbx.parser import KdbxDatabase
+
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.torn: list[str] = []
+        self.latencies: list[float] = []
+
+    def read(self, seconds: float) -> None:
+        with self.lock:
+            self.reads += 1
+            self.latencies.append(seconds)
+
+    def tear(self, detail: str) -> None:
+        with self.lock:
+            self.torn.append(detail)
+
+
+def _check(stats: _Stats, item: dict) -> None:
+    if item["title"] != item["username"]:
+        stats.tear(f"{item['id']}: {item['title']!r} != {item['username']!r}")
+
+
+def _reader(db: KdbxDatabase, ids: list[str], stats: _Stats, stop: threading.Event) -> None:
+    rng = random.Random()
+    while not stop.is_set():
+        started = time.perf_counter()
+        if rng.random() < 0.8:
+            _check(stats, db.get_entry(rng.choice(ids)))
+        else:
+            page = db.list_entries_page(None, "title,username", "title", None, 200)
+            for item in page["items"]:
+                _check(stats, item)
+        stats.read(time.perf_counter() - started)
+
+
+def _writer(db: KdbxDatabase, ids: list[str], stats: _Stats, stop: threading.Event) -> None:
+    rng = random.Random()
+    while not stop.is_set():
+        if rng.random() < 0.5:
+            token = f"t{rng.getrandbits(40):x}"
+            db.update_entry(rng.choice(ids), {"title": token, "username": token})
+        else:
+            operations = []
+            for entry_id in rng.sample(ids, 20):
+                token = f"t{rng.getrandbits(40):x}"
+                operations.append({
+                    "op": "update",
+                    "id": entry_id,
+                    "fields": {"title": token, "username": token},
+                })
+            db.apply_batch(operations)
+        with stats.lock:
+            stats.writes += 1
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(entries: int, readers: int, writers: int, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = KdbxDatabase(write_behind=True, save_debounce=0.5, save_max_dirty_age=2.0)
+        db.create(os.path.join(tmp, "stress.kdbx"), "stress")
+        try:
+            ids = []
+            for i in range(entries):
+                token = f"seed{i}"
+                ids.append(db.create_entry(token, "", username=token)["id"])
+
+            stats = _Stats()
+            stop = threading.Event()
+            threads = [
+                threading.Thread(target=_reader, args=(db, ids, stats, stop)) for _ in range(readers)
+            ] + [
+                threading.Thread(target=_writer, args=(db, ids, stats, stop)) for _ in range(writers)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(seconds)
+
+            # Reads and writes that complete while a forced save (Argon2 + encryption) runs
+            reads_before, writes_before = stats.reads, stats.writes
+            save_started = time.perf_counter()
+            db.save()
+            save_seconds = time.perf_counter() - save_started
+            reads_during_save = stats.reads - reads_before
+            writes_during_save = stats.writes - writes_before
+
+            stop.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            db.close()
+
+    return {
+        "reads": stats.reads,
+        "writes": stats.writes,
+        "torn_reads": len(stats.torn),
+        "read_p50_ms": round(_percentile(stats.latencies, 0.5) * 1000, 2),
+        "read_p99_ms": round(_percentile(stats.latencies, 0.99) * 1000, 2),
+        "read_max_ms": round(max(stats.latencies, default=0.0) * 1000, 2),
+        "save_seconds": round(save_seconds, 3),
+        "reads_during_save": reads_during_save,
+        "writes_during_save": writes_during_save,
+        "examples": stats.torn[:5],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+    results = run(args.entries, args.readers, args.writers, args.seconds)
+    for name, value in results.items():
+        print(f"{name}: {value}")
+    sys.exit(1 if results["torn_reads"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark: password, passphrase and PIN generation throughput.
+
+Compares the batched generators (one urandom buffer per request) with the
+old one-``secrets.choice``-per-character loop. Run from the repository root:
+
+    python -m backend.benchmarks.generator_throughput --count 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import secrets
+import time
+
+from backend.core.generators.passphrase import generate_passphrases
+from backend.core.generators.password import build_charset, generate_passwords
+from backend.core.generators.pin import generate_pins
+
+
+def _rate(generate, count: int, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        generate(count)
+    return count * rounds / (time.perf_counter() - started)
+
+
+def _per_character(charset: str, length: int, count: int) -> list[str]:
+    return ["".join(secrets.choice(charset) for _ in range(length)) for _ in range(count)]
+
+
+def run(count: int, length: int, rounds: int) -> dict:
+    charset = build_charset()
+    similar = build_charset(exclude_similar=True)
+    rates = {
+        "password_per_char_loop": _rate(lambda n: _per_character(charset, length, n), count, rounds),
+        "password_batched": _rate(lambda n: generate_passwords(charset, length, n), count, rounds),
+        "password_batched_exclude_similar": _rate(
+            lambda n: generate_passwords(similar, length, n), count, rounds
+        ),
+        "passphrase_6_words": _rate(lambda n: generate_passphrases(6, count=n), count, rounds),
+        "pin_6_digits": _rate(lambda n: generate_pins(6, True, n), count, rounds),
+    }
+    return {name: round(rate) for name, rate in rates.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000, help="values per call")
+    parser.add_argument("--length", type=int, default=20, help="password length")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    for name, rate in run(args.count, args.length, args.rounds).items():
+        print(f"{name}: {rate} per second")
+
+
+if __name__ == "__main__":
+    main()
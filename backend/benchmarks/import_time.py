@@ -0,0 +1,130 @@
+"""Cold-start report for the backend process, based on ``python -X importtime``.
+
+Measures, each in fresh interpreters:
+
+    import_app      cumulative import time of backend.app.main
+    first_health    process start until /api/health has been answered
+    interpreter     a bare ``python -c pass``, for reference
+
+and lists the slowest imports plus which heavy dependencies (pykeepass,
+lxml, zxcvbn, ...) are already loaded at startup. Run from the repository
+root; the benchmark suite includes these timings:
+
+    python -m backend.benchmarks.import_time --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+APP_MODULE = "backend.app.main"
+
+# Dependencies that should only be imported once a feature needs them
+HEAVY_MODULES = (
+    "pykeepass", "lxml.etree", "Cryptodome", "argon2", "construct", "zxcvbn",
+    "whoosh", "PIL", "pypdf", "backend.core.kdbx.parser",
+)
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Answers one /api/health request through the ASGI interface directly, so
+# no HTTP client library distorts the measurement
+_FIRST_HEALTH = """
+import asyncio
+from backend.app.main import app
+
+async def main():
+    sent = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        sent.append(message)
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+             "method": "GET", "scheme": "http", "path": "/api/health", "raw_path": b"/api/health",
+             "root_path": "", "query_string": b"", "headers": [], "client": ("127.0.0.1", 1),
+             "server": ("127.0.0.1", 80)}
+    await app(scope, receive, send)
+    assert sent[0]["status"] == 200, sent
+
+asyncio.run(main())
+"""
+
+_LOADED = "import sys, {module}; print(' '.join(m for m in {heavy!r} if m in sys.modules))"
+
+
+def _timing(samples: list[float]) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "runs": len(samples),
+    }
+
+
+def _wall(code: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[float, float]]:
+    """``{module: (self ms, cumulative ms)}`` from ``-X importtime`` output"""
+    modules = {}
+    for match in _IMPORTTIME.finditer(stderr):
+        own, cumulative, _, name = match.groups()
+        modules[name] = (int(own) / 1000, int(cumulative) / 1000)
+    return modules
+
+
+def importtime(module: str = APP_MODULE) -> dict[str, tuple[float, float]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True, capture_output=True, text=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def startup_report(repeat: int = 5, top: int = 15) -> dict:
+    """Timings (in the suite's median/min format) plus the slowest imports"""
+    runs = [importtime() for _ in range(repeat)]
+    timings = {
+        "interpreter": _timing([_wall("pass") for _ in range(repeat)]),
+        "import_app": _timing([run[APP_MODULE][1] for run in runs]),
+        "first_health": _timing([_wall(_FIRST_HEALTH) for _ in range(repeat)]),
+    }
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:top]
+    loaded = subprocess.run(
+        [sys.executable, "-c", _LOADED.format(module=APP_MODULE, heavy=HEAVY_MODULES)],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return {
+        "timings": timings,
+        "slowest_imports": [
+            {"module": name, "self_ms": own, "cumulative_ms": cumulative}
+            for name, (own, cumulative) in slowest
+        ],
+        "heavy_modules_at_startup": loaded,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    report = startup_report(args.repeat, args.top)
+    for name, timing in report["timings"].items():
+        print(f"{name:<14} {timing['median_ms']:>9.1f} ms")
+    print("\nslowest imports (self time):")
+    for item in report["slowest_imports"]:
+        print(f"  {item['self_ms']:>8.1f} ms  {item['module']}")
+    print("\nheavy modules loaded at startup:", ", ".join(report["heavy_modules_at_startup"]) or "none")
+
+
+if __name__ == "__main__":
+    main()
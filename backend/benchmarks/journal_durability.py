@@ -0,0 +1,107 @@
+"""Benchmark: time until an edit is durable, journal append against full save.
+
+Opens a synthetic vault twice and updates the same entries in both:
+
+* full_save   journal off, write-behind off: every edit rewrites and
+              re-encrypts the whole KDBX (KDF included) before returning
+* journal     journal on: every edit appends one fsynced record; the KDBX
+              itself is only rewritten at checkpoints
+
+Also reports the time to replay the journal on the next open. Run from
+the repository root:
+
+    python -m backend.benchmarks.journal_durability --entries 10000 --edits 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from backend.benchmarks.suite import cached_vault
+from backend.benchmarks.synthetic_vault import PASSWORD
+from backend.core.kdbx.journal import journal_path
+from backend.core.kdbx.parser import KdbxDatabase
+
+
+def _edit_latencies(db: KdbxDatabase, entry_ids: list[str]) -> list[float]:
+    samples = []
+    for n, entry_id in enumerate(entry_ids):
+        started = time.perf_counter()
+        db.update_entry(entry_id, {"notes": f"edit {n}"})
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _summary(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1], 2),
+        "total_s": round(sum(ordered) / 1000, 2),
+    }
+
+
+def run(source: str, edits: int, tmp: str) -> dict:
+    report = {}
+
+    path = os.path.join(tmp, "full.kdbx")
+    shutil.copyfile(source, path)
+    db = KdbxDatabase(write_behind=False, audit_on_open=False, journal=False)
+    db.open(path, PASSWORD)
+    try:
+        entry_ids = [e["id"] for e in db.list_entries()[:edits]]
+        report["full_save"] = _summary(_edit_latencies(db, entry_ids))
+    finally:
+        db.close()
+
+    path = os.path.join(tmp, "journal.kdbx")
+    shutil.copyfile(source, path)
+    db = KdbxDatabase(write_behind=True, audit_on_open=False, journal=True, save_debounce=3600)
+    db.open(path, PASSWORD)
+    try:
+        # A vault without journal credentials checkpoints on its first change
+        db.save()
+        report["journal"] = _summary(_edit_latencies(db, entry_ids))
+        report["journal"]["bytes"] = db.save_status()["journal"]["bytes"]
+        # Open a copy of the files as they are now, like after a crash
+        shutil.copyfile(path, path + ".crash")
+        shutil.copyfile(journal_path(path), journal_path(path + ".crash"))
+    finally:
+        db.close()
+
+    recovered = KdbxDatabase(write_behind=True, audit_on_open=False, journal=True)
+    started = time.perf_counter()
+    recovered.open(path + ".crash", PASSWORD)
+    report["recovery_open_s"] = round(time.perf_counter() - started, 2)
+    recovered.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--edits", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--vault-dir", help="keep the generated vault here and reuse it")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source, _ = cached_vault(args.entries, args.vault_dir or tmp, args.seed)
+        report = run(source, args.edits, tmp)
+
+    for name in ("full_save", "journal"):
+        item = report[name]
+        print(f"{name:<10} median {item['median_ms']:8.2f} ms, p95 {item['p95_ms']:8.2f} ms, "
+              f"total {item['total_s']:.2f} s")
+    print(f"recovery open {report['recovery_open_s']:.2f} s")
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark: Argon2 calibration against the unlock times it produces.
+
+For each target unlock time, calibrates Argon2 on this host, creates a
+vault with the result and opens it again, reporting the calibrated
+parameters, how long calibrating took and the KDF time measured on open.
+Run from the repository root:
+
+    python -m backend.benchmarks.kdf_calibration --targets 0.25 0.5 1 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from backend.core.kdbx import kdf
+from backend.core.kdbx.parser import KdbxDatabase
+
+PASSWORD = "calibration"
+
+
+def run(targets: list[float], algorithm: str, memory_mb: int, parallelism: int) -> list[dict]:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = KdbxDatabase(write_behind=False, audit_on_open=False)
+        for target in targets:
+            started = time.perf_counter()
+            params = kdf.calibrate(target, memory_mb * 1024, parallelism, algorithm)
+            calibrate_s = time.perf_counter() - started
+
+            path = os.path.join(tmp, f"kdf-{target}.kdbx")
+            db.create(path, PASSWORD, kdf_settings=params)
+            db.close()
+            info = db.open(path, PASSWORD)
+            db.close()
+            rows.append({
+                "target_s": target,
+                **{k: params[k] for k in ("iterations", "memory_kib", "parallelism")},
+                "calibrate_s": round(calibrate_s, 2),
+                "calibrated_s": params["measured_seconds"],
+                "unlock_s": info["unlock_seconds"],
+            })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--targets", type=float, nargs="+", default=[0.25, 0.5, 1.0, 2.0])
+    parser.add_argument("--algorithm", default="argon2id", choices=["argon2id", "argon2d"])
+    parser.add_argument("--memory-mb", type=int, default=64)
+    parser.add_argument("--parallelism", type=int, default=2)
+    args = parser.parse_args()
+
+    rows = run(args.targets, args.algorithm, args.memory_mb, args.parallelism)
+    for row in rows:
+        print(f"target {row['target_s']:5.2f} s  {row['iterations']:4d} it x {row['memory_kib'] // 1024:4d} MiB "
+              f"x {row['parallelism']} lanes  calibrated in {row['calibrate_s']:5.2f} s  "
+              f"unlock {row['unlock_s']:.3f} s")
+    print(json.dumps(rows))
+
+
+if __name__ == "__main__":
+    main()
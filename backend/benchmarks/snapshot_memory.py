@@ -0,0 +1,152 @@
+"""Benchmark: memory and time of the entry snapshot against per-request wrapper reads.
+
+Opens a synthetic vault (default 100k entries, built once and kept in
+``--vault-dir``) and measures with tracemalloc:
+
+* snapshot        memory the snapshot records keep alive for the session,
+                  and the time to build them on open
+* list_legacy     a full ``list_entries`` as it was built before the
+                  snapshot: one dict per entry from the pykeepass property
+                  accessors (an XPath query per field)
+* list_snapshot   the same response built from the snapshot records
+
+For the listings, ``result`` is the size of the finished list of dicts and
+``peak`` the highest allocation while building it; the difference is
+temporary garbage (lxml proxies, XPath results) per request. tracemalloc
+only sees the Python allocator, so the libxml2 tree itself, which both
+variants keep, is not included. Run from the repository root:
+
+    python -m backend.benchmarks.snapshot_memory --entries 100000 --vault-dir /tmp/vaults
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+from pykeepass.entry import Entry as KPEntry
+
+from backend.benchmarks.suite import cached_vault
+from backend.benchmarks.synthetic_vault import PASSWORD
+from backend.core.kdbx.parser import KdbxDatabase
+from backend.core.kdbx.snapshot import VaultSnapshot
+
+
+def legacy_entry_dict(db: KdbxDatabase, entry: KPEntry) -> dict:
+    """An entry dict built the pre-snapshot way, through the pykeepass wrappers"""
+    custom_fields = {}
+    for key, value in (entry.custom_properties or {}).items():
+        entry._element.findall('.//String[Key="{}"]'.format(key))
+        custom_fields[key] = {"value": value or "", "protected": False}
+
+    attachments = []
+    for binary in entry._element.iterchildren("Binary"):
+        value = binary.find("Value")
+        if value is not None and value.get("Ref") is not None:
+            attachments.append(
+                db._binaries.describe(len(attachments), int(value.get("Ref")), binary.findtext("Key") or "")
+            )
+
+    return {
+        "id": str(entry.uuid),
+        "title": entry.title or "",
+        "username": entry.username or "",
+        "password": entry.password or "",
+        "url": entry.url or "",
+        "notes": entry.notes or "",
+        "icon": entry.icon or 0,
+        "tags": list(entry.tags or []),
+        "group_id": str(entry.group.uuid) if entry.group else "",
+        "custom_fields": custom_fields,
+        "attachments": attachments,
+        "password_reuse": db._audit.reuse(entry.uuid),
+        "created": entry.ctime.isoformat() if entry.ctime else "",
+        "modified": entry.mtime.isoformat() if entry.mtime else "",
+        "expiry_time": entry.expiry_time.isoformat() if entry.expiry_time else None,
+    }
+
+
+def _timed(operation: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(min(samples), 1)
+
+
+def _traced(operation: Callable[[], object]) -> tuple[object, dict]:
+    """Run ``operation`` under tracemalloc; returns its result and the byte counts"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = operation()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {"result_bytes": current - before, "peak_bytes": peak - before}
+
+
+def run(path: str, repeat: int) -> dict:
+    db = KdbxDatabase(write_behind=False, audit_on_open=False)
+    db.open(path, PASSWORD)
+    try:
+        entries = list(db._index.entries.values())
+
+        def build_snapshot() -> VaultSnapshot:
+            snapshot = VaultSnapshot()
+            snapshot.build(db._kp, entries)
+            return snapshot
+
+        def list_legacy() -> list[dict]:
+            return [legacy_entry_dict(db, e) for e in entries]
+
+        snapshot, snapshot_memory = _traced(build_snapshot)
+        del snapshot
+        report = {
+            "entries": len(entries),
+            "snapshot": {
+                "retained_bytes": snapshot_memory["result_bytes"],
+                "bytes_per_entry": round(snapshot_memory["result_bytes"] / max(len(entries), 1)),
+                "build_ms": _timed(build_snapshot, repeat),
+            },
+        }
+        for name, operation in (("list_legacy", list_legacy), ("list_snapshot", db.list_entries)):
+            result, memory = _traced(operation)
+            del result
+            report[name] = {**memory, "ms": _timed(operation, repeat)}
+        return report
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--vault-dir", help="keep the generated vault here and reuse it")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = cached_vault(args.entries, args.vault_dir or tmp, args.seed)
+        report = run(path, args.repeat)
+
+    mib = 1024 * 1024
+    print(f"entries             {report['entries']}")
+    snapshot = report["snapshot"]
+    print(f"snapshot retained   {snapshot['retained_bytes'] / mib:8.1f} MiB "
+          f"({snapshot['bytes_per_entry']} B/entry), built in {snapshot['build_ms']:.0f} ms")
+    for name in ("list_legacy", "list_snapshot"):
+        item = report[name]
+        print(f"{name:<19} result {item['result_bytes'] / mib:8.1f} MiB, "
+              f"peak {item['peak_bytes'] / mib:8.1f} MiB, {item['ms']:.0f} ms")
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
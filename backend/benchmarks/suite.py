@@ -0,0 +1,254 @@
+"""Benchmark suite for the backend hot paths, with JSON results and baselines.
+
+For each vault size a synthetic vault is built (or reused from
+``--vault-dir``) and the following are timed, both on ``KdbxDatabase``
+directly and through the FastAPI routes:
+
+    open, list_entries (dicts and cached JSON), list_entries_page, search, get_entry,
+    update_entry + save, list_groups, attachment download
+
+The cold-start timings of ``import_time`` (app import, first /api/health)
+are recorded under ``startup``.
+
+Results are written as JSON. With ``--baseline`` every median is compared
+against an earlier run and the script exits non-zero when one regressed by
+more than ``--threshold``. Run from the repository root:
+
+    python -m backend.benchmarks.suite --sizes 1000,10000 --output backend/benchmarks/results/now.json
+    python -m backend.benchmarks.suite --baseline backend/benchmarks/results/before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable
+
+from backend.benchmarks.import_time import startup_report
+from backend.benchmarks.synthetic_vault import PASSWORD, build_vault
+from backend.core.kdbx.parser import KdbxDatabase
+
+DEFAULT_SIZES = (1000, 10000)
+SEARCH_QUERY = "github"
+
+# A slower median only counts as a regression if it is also this much
+# slower in absolute terms; sub-millisecond timings are mostly noise.
+MIN_REGRESSION_MS = 1.0
+
+
+def _measure(operation: Callable[[], object], repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "runs": repeat,
+    }
+
+
+def cached_vault(size: int, vault_dir: str, seed: int) -> tuple[str, dict]:
+    """Path and description of a synthetic vault, built on first use"""
+    os.makedirs(vault_dir, exist_ok=True)
+    path = os.path.join(vault_dir, f"synthetic-{size}-{seed}.kdbx")
+    info_path = path + ".json"
+    if os.path.exists(path) and os.path.exists(info_path):
+        with open(info_path) as f:
+            return path, json.load(f)
+    info = build_vault(path, size, seed)
+    with open(info_path, "w") as f:
+        json.dump(info, f)
+    return path, info
+
+
+def bench_database(path: str, repeat: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    db = KdbxDatabase(write_behind=True, audit_on_open=False)
+    results = {"open": _measure(lambda: db.open(path, PASSWORD), max(1, repeat // 3))}
+    try:
+        ids = [e["id"] for e in db.list_entries_page(fields="id", limit=1000)["items"]]
+        with_attachment = next(e for e in db.list_entries() if e["attachments"])
+        attachment_id = with_attachment["attachments"][0]["id"]
+
+        results["list_entries"] = _measure(db.list_entries, repeat)
+        results["list_entries_json"] = _measure(db.list_entries_json, repeat)
+        results["list_entries_page"] = _measure(lambda: db.list_entries_page(limit=100), repeat)
+        results["search"] = _measure(lambda: db.search(SEARCH_QUERY), repeat)
+        results["get_entry"] = _measure(lambda: db.get_entry(rng.choice(ids)), repeat * 10)
+
+        def update_and_save():
+            db.update_entry(rng.choice(ids), {"notes": f"changed {rng.random()}"})
+            db.save()
+
+        results["update_entry_save"] = _measure(update_and_save, max(1, repeat // 3))
+
+        def list_groups_after_change():
+            db.update_entry(rng.choice(ids), {"title": f"renamed {rng.random()}"})
+            db.list_groups()
+
+        results["list_groups_after_change"] = _measure(list_groups_after_change, repeat)
+        results["list_groups_cached"] = _measure(db.list_groups, repeat)
+
+        def download():
+            attachment = db.open_attachment(with_attachment["id"], attachment_id)
+            bytes(attachment["view"])
+
+        results["attachment_download"] = _measure(download, repeat)
+    finally:
+        db.close()
+    return results
+
+
+def bench_api(path: str, repeat: int, seed: int) -> dict:
+    from fastapi.testclient import TestClient
+
+    from backend.app.main import app
+
+    rng = random.Random(seed)
+    results = {}
+    with TestClient(app) as client:
+        def open_vault():
+            response = client.post("/api/database/open", json={"path": path, "password": PASSWORD})
+            response.raise_for_status()
+
+        results["open"] = _measure(open_vault, max(1, repeat // 3))
+        try:
+            ids = [e["id"] for e in client.get("/api/entries/", params={"fields": "id", "limit": 1000}).json()["items"]]
+            # Listings carry no attachments; ask the attachment route per entry
+            entry_id, attachments = next(
+                (entry_id, listed) for entry_id in ids
+                if (listed := client.get(f"/api/attachments/{entry_id}").json())
+            )
+            download_url = f"/api/attachments/{entry_id}/{attachments[0]['id']}"
+            client.get(download_url).raise_for_status()
+
+            results["list_entries"] = _measure(lambda: client.get("/api/entries/"), repeat)
+            results["list_entries_page"] = _measure(
+                lambda: client.get("/api/entries/", params={"limit": 100}), repeat
+            )
+            results["search"] = _measure(
+                lambda: client.get("/api/entries/search", params={"q": SEARCH_QUERY}), repeat
+            )
+            results["get_entry"] = _measure(
+                lambda: client.get(f"/api/entries/{rng.choice(ids)}"), repeat * 10
+            )
+
+            def update_and_save():
+                client.put(f"/api/entries/{rng.choice(ids)}", json={"notes": f"changed {rng.random()}"})
+                client.post("/api/database/save")
+
+            results["update_entry_save"] = _measure(update_and_save, max(1, repeat // 3))
+            results["list_groups"] = _measure(lambda: client.get("/api/groups/"), repeat)
+            results["attachment_download"] = _measure(lambda: client.get(download_url), repeat)
+        finally:
+            client.post("/api/database/close")
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Operations whose median got more than ``threshold`` (fraction) slower"""
+    regressions = []
+    for size, suites in current["results"].items():
+        for suite, operations in _timed(suites):
+            for name, timing in operations.items():
+                before = baseline.get("results", {}).get(size, {}).get(suite, {}).get(name)
+                if not before:
+                    continue
+                old, new = before["median_ms"], timing["median_ms"]
+                if new > old * (1 + threshold) and new - old > MIN_REGRESSION_MS:
+                    regressions.append(
+                        f"{size} {suite}.{name}: {old:.2f} ms -> {new:.2f} ms (+{(new / old - 1) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def _timed(suites: dict) -> list[tuple[str, dict]]:
+    """The timing groups of one result set (skips vault statistics)"""
+    return [(name, group) for name, group in suites.items() if name != "vault"]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: list[int], repeat: int, seed: int, vault_dir: str, api: bool, startup: bool = True) -> dict:
+    results = {}
+    report = {}
+    if startup:
+        report = startup_report(max(3, repeat // 2))
+        results["startup"] = {"import": report.pop("timings")}
+    for size in sizes:
+        path, info = cached_vault(size, vault_dir, seed)
+        results[str(size)] = {"vault": info, "database": bench_database(path, repeat, seed)}
+        if api:
+            results[str(size)]["api"] = bench_api(path, repeat, seed)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+        "startup": report,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated entry counts, e.g. 1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--vault-dir", help="keep generated vaults here and reuse them")
+    parser.add_argument("--no-api", action="store_true", help="skip the FastAPI route timings")
+    parser.add_argument("--no-startup", action="store_true", help="skip the cold-start timings")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run(
+            sizes, args.repeat, args.seed, args.vault_dir or tmp, not args.no_api, not args.no_startup
+        )
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    for size, suites in report["results"].items():
+        for suite, operations in _timed(suites):
+            for name, timing in operations.items():
+                print(f"{size:>7} {suite:<9} {name:<26} {timing['median_ms']:>10.2f} ms")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Reproducible synthetic KDBX vaults for benchmarks.
+
+The same ``entries``/``seed`` always yields the same content: group tree,
+entries with UUIDs and timestamps, custom fields, history and attachments
+(only the file's encryption salts differ). Run from the repository root:
+
+    python -m backend.benchmarks.synthetic_vault vault.kdbx --entries 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pykeepass import PyKeePass, create_database
+from pykeepass.entry import Entry as KPEntry
+from pykeepass.group import Group as KPGroup
+
+PASSWORD = "benchmark"
+
+_COMMON = [
+    "password", "123456", "qwerty", "letmein", "dragon", "monkey", "football",
+    "iloveyou", "admin", "welcome", "sunshine", "princess", "shadow", "master",
+]
+_SERVICES = [
+    "github", "gitlab", "google", "microsoft", "aws", "azure", "slack", "jira",
+    "confluence", "bank", "paypal", "amazon", "netflix", "spotify", "dropbox",
+    "vpn", "router", "nas", "printer", "wiki", "mail", "calendar", "hr", "crm",
+]
+_WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa",
+]
+_TAGS = ["work", "private", "shared", "legacy", "2fa", "admin", "finance", "dev"]
+_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def synthetic_passwords(count: int, rng: random.Random) -> list[str]:
+    """About 20% common passwords, 15% reused from a small pool, the rest unique"""
+    alphabet = string.ascii_letters + string.digits + "!#$%&*+-=?@_"
+    shared = [
+        rng.choice(_COMMON).capitalize() + str(rng.randint(1, 9999)) + rng.choice("!?#")
+        for _ in range(max(1, count // 100))
+    ]
+    passwords = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.2:
+            passwords.append(rng.choice(_COMMON) + str(rng.randint(0, 99)))
+        elif roll < 0.35:
+            passwords.append(rng.choice(shared))
+        else:
+            passwords.append("".join(rng.choices(alphabet, k=rng.randint(10, 20))))
+    return passwords
+
+
+def build_vault(
+    path: str,
+    entries: int,
+    seed: int = 0,
+    password: str = PASSWORD,
+    depth: int = 4,
+    fanout: int = 5,
+    attachment_ratio: float = 0.02,
+    attachment_pool: int = 20,
+    attachment_max_bytes: int = 256 * 1024,
+    history_ratio: float = 0.2,
+) -> dict:
+    """Write a synthetic vault to ``path`` and describe what it contains.
+
+    Groups form a tree ``depth`` levels deep with ``fanout`` children each;
+    entries are spread over all groups. A fraction of entries gets history
+    items, custom fields and attachments; attachments are drawn from a small
+    pool of binaries, so several entries share one payload.
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    kp = create_database(path, password=password)
+    kp.root_group.name = f"Synthetic {entries}"
+
+    groups = [kp.root_group]
+    level = [kp.root_group]
+    for d in range(depth):
+        next_level = []
+        for parent in level:
+            for i in range(fanout if d else fanout * 2):
+                group = KPGroup(name=f"{rng.choice(_WORDS).title()} {d}.{i}", kp=kp)
+                group.uuid = uuid.UUID(int=rng.getrandbits(128))
+                parent.append(group)
+                next_level.append(group)
+        groups.extend(next_level)
+        level = next_level[: max(1, len(next_level) // 2)]
+
+    binaries = [
+        kp.add_binary(rng.randbytes(rng.randint(1024, attachment_max_bytes)), compressed=False)
+        for _ in range(attachment_pool)
+    ]
+
+    passwords = synthetic_passwords(entries, rng)
+    stats = {"history_items": 0, "attachments": 0, "custom_fields": 0}
+    for i, secret in enumerate(passwords):
+        service = rng.choice(_SERVICES)
+        entry = KPEntry(
+            title=f"{service.title()} {i}",
+            username=f"{rng.choice(_WORDS)}{rng.randint(0, 999)}@example.com",
+            password=secret,
+            url=f"https://{service}.example.com/{rng.choice(_WORDS)}",
+            notes=" ".join(rng.choices(_WORDS, k=rng.randint(0, 30))),
+            tags=rng.sample(_TAGS, rng.randint(0, 3)) or None,
+            kp=kp,
+        )
+        entry.uuid = uuid.UUID(int=rng.getrandbits(128))
+        created = _EPOCH + timedelta(seconds=rng.randint(0, 5 * 365 * 86400))
+        entry.ctime = created
+        entry.mtime = created + timedelta(seconds=rng.randint(0, 365 * 86400))
+        rng.choice(groups).append(entry)
+
+        if rng.random() < 0.3:
+            for k in range(rng.randint(1, 4)):
+                entry.set_custom_property(f"field{k}", rng.choice(_WORDS), protect=k == 0)
+                stats["custom_fields"] += 1
+        if rng.random() < history_ratio:
+            for _ in range(rng.randint(1, 3)):
+                entry.save_history()
+                stats["history_items"] += 1
+        if rng.random() < attachment_ratio:
+            entry.add_attachment(rng.choice(binaries), f"{rng.choice(_WORDS)}.bin")
+            stats["attachments"] += 1
+
+    kp.save()
+    return {
+        "path": path,
+        "entries": entries,
+        "groups": len(groups),
+        "seed": seed,
+        **stats,
+        "binaries": attachment_pool,
+        "build_seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def open_vault(path: str, password: str = PASSWORD) -> PyKeePass:
+    return PyKeePass(path, password=password)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=5)
+    args = parser.parse_args()
+    info = build_vault(args.path, args.entries, args.seed, depth=args.depth, fanout=args.fanout)
+    for name, value in info.items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Per-binary metadata cache (size, content hash, MIME type)"""
+
+from __future__ import annotations
+
+import bisect
+import mimetypes
+import threading
+from typing import Iterable
+
+from pykeepass import PyKeePass
+
+from backend.core.attachments import file_handler
+from backend.core.metrics import cache_requests
+
+DEFAULT_MIME = "application/octet-stream"
+
+# Leading bytes of common attachment formats
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"\x1f\x8b", "application/gzip"),
+    (b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed"),
+    (b"-----BEGIN ", "application/x-pem-file"),
+    (b"ssh-", "text/plain"),
+)
+
+
+def sniff_mime(head: bytes, filename: str = "") -> str:
+    """Guess a MIME type from the first bytes, falling back to the filename"""
+    for signature, mime in _SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    guessed, _ = mimetypes.guess_type(filename)
+    return guessed or DEFAULT_MIME
+
+
+class BinaryMetadata:
+    """Size, SHA-256 and sniffed MIME type per binary pool id.
+
+    Sizes are read from the pool without copying the payload; the hash and
+    MIME type are computed on first use. Binary ids are positions in the
+    pool and shift when a binary is removed, so the cache drops itself
+    whenever the pool size changes unexpectedly; ``added()`` and
+    ``removed()`` keep it across the database's own pool changes.
+
+    Readers share the database lock, so the caches have a lock of their own.
+    """
+
+    def __init__(self):
+        # Re-entrant: find() and describe() go through size() and friends
+        self._lock = threading.RLock()
+        self._kp: PyKeePass | None = None
+        self._sizes: dict[int, int] = {}
+        self._hashes: dict[int, str] = {}
+        self._mimes: dict[int, str] = {}
+        self._pool_size = -1
+
+    def reset(self, kp: PyKeePass | None) -> None:
+        with self._lock:
+            self._kp = kp
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._sizes.clear()
+            self._hashes.clear()
+            self._mimes.clear()
+            self._pool_size = -1
+
+    def size(self, binary_id: int) -> int:
+        with self._lock:
+            self._check_pool()
+            if binary_id not in self._sizes:
+                self._load(binary_id)
+            return self._sizes[binary_id]
+
+    def content_hash(self, binary_id: int) -> str | None:
+        with self._lock:
+            self._check_pool()
+            digest = self._hashes.get(binary_id)
+            cache_requests.inc(cache="binary_hash", result="miss" if digest is None else "hit")
+            if digest is None:
+                view = self._view(binary_id)
+                if view is None:
+                    return None
+                digest = self._hashes[binary_id] = file_handler.content_hash(view)
+            return digest
+
+    def mime_type(self, binary_id: int, filename: str = "") -> str:
+        with self._lock:
+            self._check_pool()
+            if binary_id not in self._mimes:
+                self._load(binary_id, filename)
+            return self._mimes[binary_id]
+
+    def find(self, size: int, digest: str) -> int | None:
+        """Id of a binary with this size and SHA-256, if the pool has one.
+
+        Only binaries of the same size are hashed, so a lookup stays cheap
+        even before the hashes are cached.
+        """
+        with self._lock:
+            self._check_pool()
+            for binary_id in range(self._pool_size):
+                if self.size(binary_id) == size and self.content_hash(binary_id) == digest:
+                    return binary_id
+            return None
+
+    def added(self, binary_id: int, size: int, digest: str, mime: str) -> None:
+        """Record a binary just appended to the pool"""
+        with self._lock:
+            if self._pool_size != binary_id:
+                # Out of sync with the pool before the append already
+                self.invalidate()
+            self._pool_size = file_handler.pool_size(self._kp)
+            self._sizes[binary_id] = size
+            self._hashes[binary_id] = digest
+            self._mimes[binary_id] = mime
+
+    def removed(self, binary_ids: Iterable[int]) -> None:
+        """Shift cached values after binaries were removed from the pool"""
+        removed = sorted(set(binary_ids))
+        with self._lock:
+            for cache in (self._sizes, self._hashes, self._mimes):
+                shifted = {
+                    old - bisect.bisect_left(removed, old): value
+                    for old, value in cache.items()
+                    if old not in removed
+                }
+                cache.clear()
+                cache.update(shifted)
+            self._pool_size -= len(removed)
+            self._check_pool()
+
+    def describe(self, position: int, binary_id: int, filename: str) -> dict:
+        """Listing metadata for the attachment at ``position`` of an entry; never
+        copies the payload"""
+        with self._lock:
+            return {
+                "id": str(position),
+                "filename": filename,
+                "size": self.size(binary_id),
+                "mime_type": self.mime_type(binary_id, filename),
+            }
+
+    def _check_pool(self) -> None:
+        size = file_handler.pool_size(self._kp) if self._kp is not None else 0
+        if size != self._pool_size:
+            self.invalidate()
+            self._pool_size = size
+
+    def _load(self, binary_id: int, filename: str = "") -> None:
+        # Size and MIME type come from the same view: for KDBX3 pools
+        # getting the view means decoding the base64 payload.
+        view = self._view(binary_id)
+        if view is None:
+            self._sizes[binary_id] = 0
+            self._mimes[binary_id] = sniff_mime(b"", filename)
+            return
+        self._sizes[binary_id] = len(view)
+        self._mimes[binary_id] = sniff_mime(bytes(view[:16]), filename)
+
+    def _view(self, binary_id: int) -> memoryview | None:
+        if self._kp is None:
+            return None
+        return file_handler.binary_view(self._kp, binary_id)
@@ -0,0 +1,137 @@
+"""Upload spooling: memory-bounded, encrypted temporary storage with a running hash"""
+
+from __future__ import annotations
+
+import hashlib
+import secrets
+import tempfile
+from typing import Iterator
+
+from Cryptodome.Cipher import ChaCha20_Poly1305
+
+from backend.app import config
+
+# Plaintext bytes per sealed record on disk
+SPOOL_CHUNK_SIZE = 1024 * 1024
+_TAG_SIZE = 16
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class EncryptedSpool:
+    """Write-once buffer for one upload.
+
+    The first ``max_memory`` bytes stay in memory. Past that, everything
+    moves to an anonymous temporary file, sealed in SPOOL_CHUNK_SIZE
+    records with ChaCha20-Poly1305 under a key that only this object
+    holds, so upload contents never reach the disk in the clear and are
+    unreadable once the process is gone. Size and SHA-256 are computed
+    while writing; ``chunks()`` reads the plaintext back once finished.
+    """
+
+    def __init__(
+        self,
+        max_memory: int = int(config.UPLOAD_SPOOL_MEMORY_MB * 1024 * 1024),
+        max_size: int = int(config.UPLOAD_MAX_MB * 1024 * 1024),
+        directory: str | None = config.UPLOAD_SPOOL_DIR or None,
+    ):
+        self.max_memory = max_memory
+        self.max_size = max_size
+        self._directory = directory
+        self._buffer = bytearray()
+        self._file = None
+        self._key = b""
+        self._records = 0
+        self._size = 0
+        self._digest = hashlib.sha256()
+        self._finished = False
+
+    def __enter__(self) -> EncryptedSpool:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def on_disk(self) -> bool:
+        return self._file is not None
+
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def write(self, data: bytes | memoryview) -> None:
+        if self._finished:
+            raise ValueError("Spool already finished")
+        if self._size + len(data) > self.max_size:
+            raise UploadTooLarge(f"Upload exceeds {self.max_size} bytes")
+        self._digest.update(data)
+        self._size += len(data)
+        self._buffer += data
+        if self._file is None and len(self._buffer) > self.max_memory:
+            self._file = tempfile.TemporaryFile(dir=self._directory)
+            self._key = secrets.token_bytes(32)
+        if self._file is not None:
+            self._seal_full_chunks()
+
+    def finish(self) -> None:
+        """No more data; seals the last partial record of an on-disk spool"""
+        if self._finished:
+            return
+        self._finished = True
+        if self._file is not None:
+            self._seal_full_chunks()
+            if self._buffer:
+                self._seal(self._buffer)
+                self._buffer = bytearray()
+            self._file.flush()
+
+    def chunks(self) -> Iterator[bytes | memoryview]:
+        """The plaintext, in order, in chunks of at most SPOOL_CHUNK_SIZE"""
+        self.finish()
+        if self._file is None:
+            view = memoryview(self._buffer)
+            for start in range(0, len(view), SPOOL_CHUNK_SIZE):
+                yield view[start:start + SPOOL_CHUNK_SIZE]
+            return
+        self._file.seek(0)
+        total = 0
+        for counter in range(self._records):
+            record = self._file.read(SPOOL_CHUNK_SIZE + _TAG_SIZE)
+            cipher = ChaCha20_Poly1305.new(key=self._key, nonce=counter.to_bytes(12, "big"))
+            # Raises ValueError if the temporary file was tampered with
+            chunk = cipher.decrypt_and_verify(record[:-_TAG_SIZE], record[-_TAG_SIZE:])
+            total += len(chunk)
+            yield chunk
+        if total != self._size:
+            raise ValueError("Spool file is truncated")
+
+    def head(self, length: int = 16) -> bytes:
+        """The first bytes, for sniffing the MIME type"""
+        for chunk in self.chunks():
+            return bytes(chunk[:length])
+        return b""
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buffer = bytearray()
+        self._key = b""
+
+    def _seal_full_chunks(self) -> None:
+        while len(self._buffer) >= SPOOL_CHUNK_SIZE:
+            self._seal(self._buffer[:SPOOL_CHUNK_SIZE])
+            del self._buffer[:SPOOL_CHUNK_SIZE]
+
+    def _seal(self, plaintext: bytes | bytearray | memoryview) -> None:
+        cipher = ChaCha20_Poly1305.new(key=self._key, nonce=self._records.to_bytes(12, "big"))
+        ciphertext, tag = cipher.encrypt_and_digest(plaintext)
+        self._file.write(ciphertext)
+        self._file.write(tag)
+        self._records += 1
@@ -0,0 +1,84 @@
+"""Streaming multipart/form-data parsing of attachment uploads into a spool"""
+
+from __future__ import annotations
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from backend.core.attachments.spool import EncryptedSpool
+
+
+class MultipartFileReader:
+    """Feeds the file part named ``field`` of a multipart body into a spool.
+
+    The body is passed in with ``write`` as it arrives, so only the
+    parser's small buffers and the spool hold upload data. Other parts
+    are skipped; raises ValueError for bodies that are not
+    multipart/form-data or carry no such file part.
+    """
+
+    def __init__(self, content_type: str, spool: EncryptedSpool, field: str = "file"):
+        media_type, params = parse_options_header(content_type)
+        if media_type != b"multipart/form-data" or not params.get(b"boundary"):
+            raise ValueError("Expected a multipart/form-data body")
+        self.filename: str | None = None
+        self._spool = spool
+        self._field = field.encode()
+        self._headers: dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file = False
+        self._parser = MultipartParser(
+            params[b"boundary"],
+            callbacks={
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def write(self, data: bytes) -> None:
+        self._parser.write(data)
+
+    def finish(self) -> str:
+        """End of body; returns the uploaded file's name"""
+        self._parser.finalize()
+        if self.filename is None:
+            raise ValueError(f"No file in field {self._field.decode()!r}")
+        self._spool.finish()
+        return self.filename
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, disposition = parse_options_header(self._headers.get(b"content-disposition", b""))
+        filename = disposition.get(b"filename")
+        if self.filename is None and disposition.get(b"name") == self._field and filename is not None:
+            self.filename = _base_name(filename.decode("utf-8", "replace")) or "attachment"
+            self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._spool.write(memoryview(data)[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_file = False
+
+
+def _base_name(filename: str) -> str:
+    """Strip any directory part a client sent along with the file name"""
+    return filename.replace("\\", "/").rsplit("/", 1)[-1].strip()
@@ -0,0 +1,57 @@
+"""Diceware passphrases from the EFF large wordlist"""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+from backend.core.generators.sampling import random_indices
+
+WORDLIST_PATH = Path(__file__).parent / "wordlists" / "eff_large_wordlist.txt"
+
+# Range of the number appended with ``include_number``
+NUMBER_RANGE = 10000
+
+
+def load_wordlist(path: Path = WORDLIST_PATH) -> tuple[str, ...]:
+    """Words of a Diceware list (``11111<TAB>word`` lines, or one word per line)"""
+    words = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        parts = line.split()
+        if parts:
+            words.append(parts[-1])
+    if len(set(words)) != len(words):
+        raise ValueError(f"Wordlist has duplicate words: {path}")
+    return tuple(words)
+
+
+# Loaded once, when the generator API is imported at startup
+WORDS = load_wordlist()
+
+
+def generate_passphrases(
+    word_count: int,
+    separator: str = "-",
+    capitalize: bool = True,
+    include_number: bool = True,
+    count: int = 1,
+) -> list[str]:
+    """``count`` passphrases; all word indices come from one random draw"""
+    indices = random_indices(len(WORDS), word_count * count)
+    numbers = random_indices(NUMBER_RANGE, count) if include_number else None
+    phrases = []
+    for i in range(count):
+        words = [WORDS[j] for j in indices[i * word_count:(i + 1) * word_count]]
+        if capitalize:
+            words = [w.capitalize() for w in words]
+        if numbers is not None:
+            words.append(str(numbers[i]))
+        phrases.append(separator.join(words))
+    return phrases
+
+
+def passphrase_entropy(word_count: int, include_number: bool = True) -> float:
+    entropy = word_count * math.log2(len(WORDS))
+    if include_number:
+        entropy += math.log2(NUMBER_RANGE)
+    return entropy
@@ -0,0 +1,43 @@
+"""Random password generation"""
+
+from __future__ import annotations
+
+import math
+import string
+
+from backend.core.generators.sampling import random_strings
+
+# Characters that are easily confused with one another in many fonts
+SIMILAR_CHARACTERS = "il1Lo0OI|"
+
+
+def build_charset(
+    uppercase: bool = True,
+    lowercase: bool = True,
+    numbers: bool = True,
+    symbols: bool = True,
+    exclude_similar: bool = False,
+) -> str:
+    charset = ""
+    if lowercase:
+        charset += string.ascii_lowercase
+    if uppercase:
+        charset += string.ascii_uppercase
+    if numbers:
+        charset += string.digits
+    if symbols:
+        charset += string.punctuation
+    if not charset:
+        charset = string.ascii_lowercase
+    if exclude_similar:
+        charset = "".join(c for c in charset if c not in SIMILAR_CHARACTERS)
+    return charset
+
+
+def generate_passwords(charset: str, length: int, count: int = 1) -> list[str]:
+    """``count`` passwords of ``length`` characters drawn uniformly from ``charset``"""
+    return random_strings(charset, length, count)
+
+
+def password_entropy(charset: str, length: int) -> float:
+    return length * math.log2(len(charset))
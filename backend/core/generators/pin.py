@@ -0,0 +1,56 @@
+"""Random PIN generation"""
+
+from __future__ import annotations
+
+import functools
+import math
+import string
+
+from backend.core.generators.sampling import random_strings
+
+
+def is_sequential(pin: str) -> bool:
+    """True if three consecutive digits repeat or step by one (111, 123, 987)"""
+    for i in range(len(pin) - 2):
+        a, b, c = (ord(pin[i]), ord(pin[i + 1]), ord(pin[i + 2]))
+        if b - a == c - b and abs(b - a) <= 1:
+            return True
+    return False
+
+
+def generate_pins(length: int, exclude_sequential: bool = True, count: int = 1) -> list[str]:
+    """``count`` PINs; with ``exclude_sequential`` sequential ones are redrawn,
+    which keeps the result uniform over the allowed PINs"""
+    pins: list[str] = []
+    while len(pins) < count:
+        # Oversample a little so one pass usually suffices
+        batch = random_strings(string.digits, length, count - len(pins) + 8)
+        if exclude_sequential:
+            batch = [p for p in batch if not is_sequential(p)]
+        pins.extend(batch)
+    return pins[:count]
+
+
+def pin_entropy(length: int, exclude_sequential: bool = True) -> float:
+    if not exclude_sequential:
+        return length * math.log2(10)
+    allowed = _allowed_pins(length)
+    return math.log2(allowed) if allowed else 0.0
+
+
+@functools.lru_cache(maxsize=32)
+def _allowed_pins(length: int) -> int:
+    """Number of PINs of ``length`` digits without a sequential triple"""
+    if length <= 2:
+        return 10 ** max(length, 0)
+    # counts[(a, b)]: allowed prefixes ending in digits a, b
+    counts = {(a, b): 1 for a in range(10) for b in range(10)}
+    for _ in range(length - 2):
+        following: dict[tuple[int, int], int] = {}
+        for (a, b), n in counts.items():
+            for c in range(10):
+                if b - a == c - b and abs(b - a) <= 1:
+                    continue
+                following[(b, c)] = following.get((b, c), 0) + n
+        counts = following
+    return sum(counts.values())
@@ -0,0 +1,68 @@
+"""Unbiased uniform sampling from large os.urandom buffers"""
+
+from __future__ import annotations
+
+import functools
+import os
+from array import array
+
+
+@functools.lru_cache(maxsize=64)
+def _byte_tables(symbols: bytes) -> tuple[bytes, bytes]:
+    """Translate table mapping random bytes to ``symbols``, and the rejected bytes.
+
+    Bytes at or above the largest multiple of ``len(symbols)`` are
+    rejected, so every symbol is equally likely.
+    """
+    n = len(symbols)
+    limit = 256 - 256 % n
+    table = bytes(symbols[b % n] if b < limit else 0 for b in range(256))
+    return table, bytes(range(limit, 256))
+
+
+def _filtered_bytes(symbols: bytes, count: int) -> bytes:
+    """``count`` bytes drawn uniformly from ``symbols`` (1 to 256 distinct bytes).
+
+    Filters whole urandom buffers with ``bytes.translate`` instead of
+    drawing one symbol at a time, so the per-symbol cost is C-level.
+    """
+    if not 0 < len(symbols) <= 256:
+        raise ValueError("Alphabet must have 1 to 256 symbols")
+    table, rejected = _byte_tables(symbols)
+    acceptance = (256 - len(rejected)) / 256
+    out = bytearray()
+    while len(out) < count:
+        missing = count - len(out)
+        out += os.urandom(int(missing / acceptance) + 16).translate(table, rejected)
+    return bytes(out[:count])
+
+
+def random_text(alphabet: str, length: int) -> str:
+    """``length`` characters drawn uniformly from an ASCII ``alphabet``"""
+    return _filtered_bytes(alphabet.encode("ascii"), length).decode("ascii")
+
+
+def random_strings(alphabet: str, length: int, count: int) -> list[str]:
+    """``count`` independent strings, cut from one buffer"""
+    text = random_text(alphabet, length * count)
+    return [text[i:i + length] for i in range(0, length * count, length)]
+
+
+def random_indices(n: int, count: int) -> list[int]:
+    """``count`` integers uniform in ``[0, n)`` for ``n`` up to 2**32"""
+    if not 0 < n <= 1 << 32:
+        raise ValueError("n must be between 1 and 2**32")
+    if n <= 256:
+        return list(_filtered_bytes(bytes(range(n)), count))
+    # The narrowest unsigned word that holds n - 1: "I" and "L" are 4 or 8
+    # bytes depending on the platform, so go by itemsize, not the typecode
+    typecode = next(t for t in "HILQ" if n <= 1 << (8 * array(t).itemsize))
+    words = array(typecode)
+    space = 1 << (8 * words.itemsize)
+    limit = space - space % n
+    out: list[int] = []
+    while len(out) < count:
+        missing = count - len(out)
+        words = array(typecode, os.urandom((int(missing * space / limit) + 8) * words.itemsize))
+        out.extend(w % n for w in words if w < limit)
+    return out[:count]
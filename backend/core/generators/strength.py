@@ -0,0 +1,14 @@
+"""Entropy-based strength labels for generated secrets"""
+
+from __future__ import annotations
+
+
+def strength_label(entropy: float) -> str:
+    """Label a secret by its entropy in bits"""
+    if entropy < 40:
+        return "weak"
+    if entropy < 60:
+        return "medium"
+    if entropy < 80:
+        return "strong"
+    return "veryStrong"
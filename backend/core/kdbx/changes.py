@@ -0,0 +1,88 @@
+"""Bounded in-memory log of entry/group changes for delta sync"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from typing import Iterable
+
+from backend.app import config
+
+
+class ChangeLog:
+    """Recent changes of one vault, newest last.
+
+    Each record is ``{revision, op, type, id, group_id, fields}`` where
+    ``fields`` names the changed fields; values are never recorded, so the
+    log holds no secrets. Records of one mutation share its revision.
+
+    ``since(rev)`` returns the records newer than ``rev``, or asks for a
+    full resync when records after ``rev`` have been dropped: the log was
+    reset (open/close) or truncated to ``capacity``. The log has its own
+    lock and never waits for the database lock, so it is safe to poll from
+    the event loop.
+    """
+
+    def __init__(self, capacity: int = config.CHANGE_LOG_SIZE):
+        self.capacity = max(1, capacity)
+        self._records: deque[dict] = deque()
+        self._base = 0
+        self._revision = 0
+        self._lock = threading.Lock()
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def reset(self, revision: int) -> None:
+        """Start over at ``revision``; older cursors must resync"""
+        with self._lock:
+            self._records.clear()
+            self._base = revision
+            self._revision = revision
+        self._notify()
+
+    def record(self, revision: int, records: Iterable[dict]) -> None:
+        with self._lock:
+            for record in records:
+                self._records.append({"revision": revision, **record})
+            self._revision = revision
+            while len(self._records) > self.capacity:
+                self._base = self._records.popleft()["revision"]
+        self._notify()
+
+    def since(self, revision: int) -> dict:
+        """Changes after ``revision``, or ``resync: True`` if they are incomplete"""
+        with self._lock:
+            current = self._revision
+            if revision < self._base or revision > current:
+                return {"revision": current, "resync": True, "changes": []}
+            newer = []
+            for record in reversed(self._records):
+                if record["revision"] <= revision:
+                    break
+                newer.append(record)
+            newer.reverse()
+            return {"revision": current, "resync": False, "changes": newer}
+
+    def subscribe(self) -> asyncio.Event:
+        """An event set (from any thread) whenever the log changes.
+
+        Must be called from the event loop that will wait on it.
+        """
+        event = asyncio.Event()
+        with self._lock:
+            self._waiters.add((asyncio.get_running_loop(), event))
+        return event
+
+    def unsubscribe(self, event: asyncio.Event) -> None:
+        with self._lock:
+            self._waiters = {w for w in self._waiters if w[1] is not event}
+
+    def _notify(self) -> None:
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The subscriber's loop is closed; drop it
+                self.unsubscribe(event)
@@ -0,0 +1,150 @@
+"""Entries ordered by expiry time, and a timer that announces expiries"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Iterable
+
+from backend.core.kdbx.snapshot import EntryRecord, record_expiry
+
+logger = logging.getLogger(__name__)
+
+# Upper bound of one scheduler sleep, so wall-clock jumps (suspend, NTP)
+# delay an announcement by at most this long
+MAX_SLEEP = 60.0
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ExpiryIndex:
+    """Entries that expire, kept sorted by expiry time.
+
+    Expired / expiring-soon queries are bisections plus a scan of the
+    matching range only. Entries in the recycle bin are left out. Not
+    thread-safe; the owner serializes access.
+    """
+
+    def __init__(self):
+        self._order: list[tuple[datetime, uuid.UUID]] = []
+        self._times: dict[uuid.UUID, datetime] = {}
+        self._excluded: uuid.UUID | None = None
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def clear(self) -> None:
+        self._order.clear()
+        self._times.clear()
+        self._excluded = None
+
+    def build(self, records: Iterable[EntryRecord], recycle_bin: uuid.UUID | None) -> None:
+        self.clear()
+        self._excluded = recycle_bin
+        for record in records:
+            expires = self._expiry_of(record)
+            if expires is not None:
+                self._times[record.uuid] = expires
+        self._order = sorted((t, uid) for uid, t in self._times.items())
+
+    def update(self, changes: Iterable[tuple[uuid.UUID, EntryRecord | None]]) -> None:
+        """Refresh entries that were added, changed, moved or removed (None)"""
+        for entry_id, record in changes:
+            old = self._times.pop(entry_id, None)
+            if old is not None:
+                del self._order[bisect.bisect_left(self._order, (old, entry_id))]
+            expires = self._expiry_of(record) if record is not None else None
+            if expires is not None:
+                self._times[entry_id] = expires
+                bisect.insort(self._order, (expires, entry_id))
+
+    def between(self, start: datetime | None, end: datetime) -> list[tuple[datetime, uuid.UUID]]:
+        """(expiry, id) with ``start < expiry <= end``, soonest first"""
+        lo = bisect.bisect_right(self._order, start, key=_time) if start is not None else 0
+        return self._order[lo:bisect.bisect_right(self._order, end, key=_time)]
+
+    def count_until(self, end: datetime) -> int:
+        """Number of entries expiring at or before ``end``"""
+        return bisect.bisect_right(self._order, end, key=_time)
+
+    def next_after(self, start: datetime) -> datetime | None:
+        i = bisect.bisect_right(self._order, start, key=_time)
+        return self._order[i][0] if i < len(self._order) else None
+
+    def _expiry_of(self, record: EntryRecord) -> datetime | None:
+        if self._excluded is not None and record.group_uuid == self._excluded:
+            return None
+        return record_expiry(record)
+
+
+class ExpiryScheduler:
+    """Background timer that sleeps until the next expiry and reports it.
+
+    ``next_due`` returns the next expiry time still to announce (or None);
+    ``fire`` is called with the current time once that time has passed.
+    Both are called without the scheduler's lock held, so they may take the
+    database lock. ``reschedule`` must be called whenever the next due time
+    may have changed; the thread is started on demand.
+    """
+
+    def __init__(
+        self,
+        next_due: Callable[[], datetime | None],
+        fire: Callable[[datetime], None],
+    ):
+        self._next_due = next_due
+        self._fire = fire
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._changed = False
+
+    def reschedule(self) -> None:
+        with self._cond:
+            self._changed = True
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="vaultix-expiry", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def stop(self) -> None:
+        """Stop the timer; like the write-behind flusher it is not joined"""
+        with self._cond:
+            self._thread = None
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        me = threading.current_thread()
+        while True:
+            with self._cond:
+                self._changed = False
+            try:
+                due = self._next_due()
+            except Exception:
+                logger.exception("Reading the next expiry failed")
+                due = None
+            with self._cond:
+                if self._thread is not me:
+                    return
+                if self._changed:
+                    continue
+                delay = MAX_SLEEP if due is None else (due - utcnow()).total_seconds()
+                if delay > 0:
+                    self._cond.wait(min(delay, MAX_SLEEP))
+                    continue
+            try:
+                self._fire(utcnow())
+            except Exception:
+                logger.exception("Announcing expired entries failed")
+                with self._cond:
+                    self._cond.wait(MAX_SLEEP)
+
+
+def _time(item: tuple[datetime, uuid.UUID]) -> datetime:
+    return item[0]
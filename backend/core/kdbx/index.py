@@ -0,0 +1,138 @@
+"""In-memory UUID index over the entries and groups of an open KDBX tree"""
+
+from __future__ import annotations
+
+import base64
+import uuid
+
+from lxml.etree import _Element
+from pykeepass import PyKeePass
+from pykeepass.entry import Entry as KPEntry
+from pykeepass.group import Group as KPGroup
+
+
+def parse_uuid(value: str | uuid.UUID | None) -> uuid.UUID | None:
+    """Parse a UUID string, returning None for anything malformed"""
+    if value is None:
+        return None
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(value)
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+def element_uuid(element: _Element) -> uuid.UUID | None:
+    """Decode the base64 <UUID> child of an Entry/Group element"""
+    text = element.findtext("UUID")
+    if not text:
+        return None
+    try:
+        return uuid.UUID(bytes=base64.b64decode(text))
+    except (ValueError, TypeError):
+        return None
+
+
+class UuidIndex:
+    """UUID -> pykeepass wrapper maps, kept in sync by KdbxDatabase mutations.
+
+    History entries (``Entry/History/Entry``) share the UUID of their owning
+    entry and are never indexed.
+    """
+
+    def __init__(self):
+        self.entries: dict[uuid.UUID, KPEntry] = {}
+        self.groups: dict[uuid.UUID, KPGroup] = {}
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.groups.clear()
+
+    def build(self, kp: PyKeePass) -> None:
+        """Index every group and non-history entry with a single tree walk"""
+        self.clear()
+        root = kp.tree.getroot().find("Root")
+        if root is None:
+            return
+        for element in root.iter("Group", "Entry"):
+            self._add_element(element, kp)
+
+    def get_entry(self, entry_id: str | uuid.UUID | None) -> KPEntry | None:
+        uid = parse_uuid(entry_id)
+        return self.entries.get(uid) if uid else None
+
+    def get_group(self, group_id: str | uuid.UUID | None) -> KPGroup | None:
+        uid = parse_uuid(group_id)
+        return self.groups.get(uid) if uid else None
+
+    def add_entry(self, entry: KPEntry) -> None:
+        self.entries[entry.uuid] = entry
+
+    def remove_entry(self, entry: KPEntry) -> None:
+        self.entries.pop(entry.uuid, None)
+
+    def add_group(self, group: KPGroup) -> None:
+        """Index a group together with all of its descendants"""
+        for element in group._element.iter("Group", "Entry"):
+            self._add_element(element, group._kp)
+
+    def remove_group(self, group: KPGroup) -> None:
+        """Drop a group together with all of its descendants"""
+        for element in group._element.iter("Group", "Entry"):
+            uid = element_uuid(element)
+            if uid is None:
+                continue
+            if element.tag == "Group":
+                self.groups.pop(uid, None)
+            elif not _is_history(element):
+                self.entries.pop(uid, None)
+
+    def entry_ids_under(self, group: KPGroup) -> list[uuid.UUID]:
+        """UUIDs of all non-history entries inside a group, recursively"""
+        return [
+            uid
+            for element in group._element.iter("Entry")
+            if not _is_history(element) and (uid := element_uuid(element)) is not None
+        ]
+
+    def verify(self, kp: PyKeePass) -> dict:
+        """Compare the index against an XPath scan of the tree.
+
+        Returns a report listing UUIDs missing from the index, UUIDs indexed
+        but no longer in the tree, and UUIDs whose indexed element is not the
+        element found in the tree.
+        """
+        tree_entries = {e.uuid: e for e in kp.find_entries()}
+        tree_groups = {g.uuid: g for g in kp.find_groups()}
+
+        report = {}
+        for kind, indexed, actual in (
+            ("entries", self.entries, tree_entries),
+            ("groups", self.groups, tree_groups),
+        ):
+            report[f"missing_{kind}"] = sorted(str(u) for u in actual.keys() - indexed.keys())
+            report[f"stale_{kind}"] = sorted(str(u) for u in indexed.keys() - actual.keys())
+            report[f"mismatched_{kind}"] = sorted(
+                str(u)
+                for u in indexed.keys() & actual.keys()
+                if indexed[u]._element is not actual[u]._element
+            )
+        report["ok"] = not any(report.values())
+        report["entry_count"] = len(self.entries)
+        report["group_count"] = len(self.groups)
+        return report
+
+    def _add_element(self, element: _Element, kp: PyKeePass) -> None:
+        uid = element_uuid(element)
+        if uid is None:
+            return
+        if element.tag == "Group":
+            self.groups[uid] = KPGroup(element=element, kp=kp)
+        elif not _is_history(element):
+            self.entries[uid] = KPEntry(element=element, kp=kp)
+
+
+def _is_history(element: _Element) -> bool:
+    parent = element.getparent()
+    return parent is not None and parent.tag == "History"
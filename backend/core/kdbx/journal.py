@@ -0,0 +1,535 @@
+"""Encrypted append-only journal of the mutations since the last full save.
+
+Each mutation appends one record holding the new state of every entry and
+group it touched (or that they were deleted) and fsyncs it. Replaying
+the records in order onto the last saved KDBX gives back the vault as it
+was, so the full save ("checkpoint") can run rarely.
+
+A checkpoint saves a copy of the vault, taken under the database lock,
+so mutations go on while it is encrypted and written. They are appended
+to the old journal as usual and also kept for the journal that continues
+the new save. That journal is written as ``<journal>.next`` before the
+vault is replaced and renamed over the old one after; on open, whichever
+of the two belongs to the vault file is used.
+
+The journal lives next to the vault as ``<vault>.vaultix-journal``:
+
+    header   magic ``VXJ1``, 16-byte journal id
+    record   4-byte length, 12-byte nonce, ChaCha20-Poly1305 ciphertext + tag
+
+Records are authenticated with the journal id and their sequence number,
+so they cannot be reordered or moved between journals. The id and the key
+are stored in the vault itself (``Meta/CustomData``), where only the
+password opens them. Every checkpoint writes a new id and key into the
+vault it saves, so a journal only replays onto the exact vault file it
+continues. A torn record at the end (crash mid-append) is cut off.
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+import os
+import secrets
+import struct
+import threading
+from copy import deepcopy
+from typing import Any
+
+import orjson
+from construct import Container, ListContainer
+from Cryptodome.Cipher import ChaCha20_Poly1305
+from lxml import etree
+from lxml.etree import _Element
+from pykeepass import PyKeePass
+from pykeepass.kdbx_parsing import KDBX
+from pykeepass.kdbx_parsing.common import rotate_seeds
+
+from backend.core.kdbx.index import element_uuid
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = ".vaultix-journal"
+NEXT_SUFFIX = ".next"
+CUSTOM_DATA_KEY = "Vaultix.Journal"
+
+_MAGIC = b"VXJ1"
+_ID_SIZE = 16
+_KEY_SIZE = 32
+_NONCE_SIZE = 12
+_TAG_SIZE = 16
+_HEADER_SIZE = len(_MAGIC) + _ID_SIZE
+_LENGTH = struct.Struct(">I")
+
+# Children of a group element that are not the group's own fields
+_CONTAINERS = ("Group", "Entry")
+
+
+def journal_path(vault_path: str) -> str:
+    return vault_path + SUFFIX
+
+
+class Journal:
+    """The journal of one open vault.
+
+    Appends run under the database write lock and checkpoints one at a
+    time under the saver's mutex. The end of a checkpoint runs without the
+    database lock; the journal's own lock keeps appends out of it.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._path: str | None = None
+        self._file = None
+        self._id = b""
+        self._key = b""
+        self._sequence = 0
+        self._size = 0
+        self._suspended = False
+        self._lock = threading.Lock()
+        # While a checkpoint is written: its vault path, journal id and key,
+        # and the mutations made since its copy was taken
+        self._next: tuple[str, bytes, bytes] | None = None
+        self._forked: list[list[dict]] = []
+        self._forked_suspended = False
+
+    @property
+    def active(self) -> bool:
+        """Whether mutations are journaled; false until the vault holds a journal key
+        and while suspended"""
+        return self._file is not None and not self._suspended
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def records(self) -> int:
+        return self._sequence
+
+    def status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "active": self.active,
+            "suspended": self._suspended,
+            "records": self._sequence,
+            "bytes": self._size,
+        }
+
+    def open(self, kp: PyKeePass, vault_path: str) -> list[list[dict]]:
+        """Start journaling for a freshly opened vault.
+
+        Returns the records of a journal left behind by an unclean
+        shutdown, to be replayed onto ``kp``. A journal that belongs to an
+        older save of the vault is deleted; its changes are in the vault.
+        """
+        self.close()
+        if not self.enabled:
+            return []
+        self._path = journal_path(vault_path)
+        credentials = _read_credentials(kp)
+        if credentials is None:
+            # Never checkpointed by us: the first save adds a journal key
+            self._path = None
+            return []
+        self._id, self._key = credentials
+
+        records: list[list[dict]] = []
+        good = 0
+        data = _read_file(self._path)
+        header = _MAGIC + self._id
+        following = _read_file(self._path + NEXT_SUFFIX)
+        if following[:_HEADER_SIZE] == header and data[:_HEADER_SIZE] != header:
+            # A crash between replacing the vault and its journal
+            os.replace(self._path + NEXT_SUFFIX, self._path)
+            data = following
+        elif following:
+            os.remove(self._path + NEXT_SUFFIX)
+        if data[:_HEADER_SIZE] == header:
+            records, good = self._decode(data)
+            if good < len(data):
+                logger.warning("Cutting %d bytes of torn records off %s", len(data) - good, self._path)
+        elif data:
+            logger.info("Discarding %s: it belongs to an earlier save of the vault", self._path)
+
+        if records:
+            self._file = open(self._path, "r+b")
+            self._file.truncate(good)
+            self._file.seek(good)
+            self._sequence = len(records)
+            self._size = good
+        else:
+            self._start()
+        return records
+
+    def suspend(self) -> None:
+        """Stop journaling until the next checkpoint.
+
+        For changes the journal cannot express, such as adding or removing
+        binaries (pool positions are their ids). Records written so far stay
+        valid against the saved vault; later changes are only saved by the
+        checkpoint, so a crash before it loses them together.
+        """
+        with self._lock:
+            self._suspended = True
+            if self._next is not None:
+                self._forked_suspended = True
+
+    def append(self, ops: list[dict]) -> None:
+        """Write one mutation durably (fsynced before returning)"""
+        if not ops:
+            return
+        with self._lock:
+            if self._next is not None and not self._forked_suspended:
+                self._forked.append(ops)
+            if self._file is None or self._suspended:
+                return
+            record = _record(self._id, self._key, self._sequence, ops)
+            self._file.write(record)
+            self._file.flush()
+            _sync(self._file.fileno())
+            self._sequence += 1
+            self._size += len(record)
+
+    def prepare_checkpoint(self, kp: PyKeePass, vault_path: str) -> Container:
+        """Start folding the journal into a full save; under the database lock.
+
+        Returns a copy of the vault to save with ``finish_checkpoint``,
+        holding a new journal id and key. The live tree is not touched.
+        """
+        copy = frozen_copy(kp)
+        if self.enabled:
+            journal_id, key = secrets.token_bytes(_ID_SIZE), secrets.token_bytes(_KEY_SIZE)
+            _write_credentials(copy.body.payload.xml, journal_id, key)
+            with self._lock:
+                self._next = (vault_path, journal_id, key)
+                self._forked = []
+                self._forked_suspended = False
+        return copy
+
+    def finish_checkpoint(self, copy: Container, vault_path: str, password: str | None, keyfile: str | None) -> None:
+        """Write the copy from ``prepare_checkpoint`` over the vault; no database lock needed.
+
+        The vault is encrypted into a temporary file first. The journal
+        for the new save, holding the mutations made meanwhile, goes to
+        ``.next``; then the vault and the journal are renamed into place.
+        If anything fails, the old vault and journal stay in use.
+        """
+        temporary = next_path = None
+        try:
+            temporary = write_temporary(copy, vault_path, password, keyfile)
+            with self._lock:
+                if self._next is not None:
+                    _, journal_id, key = self._next
+                    next_path = journal_path(vault_path) + NEXT_SUFFIX
+                    records = [] if self._forked_suspended else self._forked
+                    _write_journal(next_path, journal_id, key, records)
+                os.replace(temporary, vault_path)
+                temporary = None
+                _sync_directory(vault_path)
+                if next_path is not None:
+                    os.replace(next_path, journal_path(vault_path))
+                    _sync_directory(vault_path)
+                    next_path = None
+                    self._switch(vault_path, journal_id, key, len(records))
+        finally:
+            for leftover in (temporary, next_path):
+                if leftover is not None:
+                    try:
+                        os.remove(leftover)
+                    except OSError:
+                        pass
+            with self._lock:
+                self._next = None
+                self._forked = []
+
+    def close(self, remove_if_empty: bool = False) -> None:
+        if self._file is not None:
+            self._file.close()
+            if remove_if_empty and self._sequence == 0:
+                try:
+                    os.remove(self._path)
+                except OSError:
+                    pass
+        self._file = None
+        self._path = None
+        self._id = self._key = b""
+        self._sequence = 0
+        self._size = 0
+        self._suspended = False
+
+    def _start(self) -> None:
+        """Atomically replace the journal file with an empty one for the current id"""
+        _write_journal(self._path + ".tmp", self._id, self._key, [])
+        os.replace(self._path + ".tmp", self._path)
+        _sync_directory(self._path)
+        self._file = open(self._path, "r+b")
+        self._file.seek(0, os.SEEK_END)
+        self._sequence = 0
+        self._size = _HEADER_SIZE
+        self._suspended = False
+
+    def _switch(self, vault_path: str, journal_id: bytes, key: bytes, records: int) -> None:
+        """Continue in the journal a checkpoint just put in place"""
+        suspended = self._forked_suspended
+        if self._file is not None:
+            self._file.close()
+        self._path = journal_path(vault_path)
+        self._id, self._key = journal_id, key
+        self._file = open(self._path, "r+b")
+        self._size = self._file.seek(0, os.SEEK_END)
+        self._sequence = records
+        self._suspended = suspended
+
+    def _decode(self, data: bytes) -> tuple[list[list[dict]], int]:
+        """Records up to the first torn or invalid one, and where it starts"""
+        records: list[list[dict]] = []
+        offset = _HEADER_SIZE
+        while offset + _LENGTH.size + _NONCE_SIZE <= len(data):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            start = offset + _LENGTH.size + _NONCE_SIZE
+            end = start + length
+            if length < _TAG_SIZE or end > len(data):
+                break
+            nonce = data[offset + _LENGTH.size:start]
+            cipher = ChaCha20_Poly1305.new(key=self._key, nonce=nonce)
+            cipher.update(self._aad(len(records)))
+            try:
+                payload = cipher.decrypt_and_verify(data[start:end - _TAG_SIZE], data[end - _TAG_SIZE:end])
+            except ValueError:
+                break
+            records.append(orjson.loads(payload))
+            offset = end
+        return records, offset
+
+    def _aad(self, sequence: int) -> bytes:
+        return _aad(self._id, sequence)
+
+
+def _aad(journal_id: bytes, sequence: int) -> bytes:
+    return journal_id + sequence.to_bytes(8, "big")
+
+
+def _record(journal_id: bytes, key: bytes, sequence: int, ops: list[dict]) -> bytes:
+    nonce = secrets.token_bytes(_NONCE_SIZE)
+    cipher = ChaCha20_Poly1305.new(key=key, nonce=nonce)
+    cipher.update(_aad(journal_id, sequence))
+    ciphertext, tag = cipher.encrypt_and_digest(orjson.dumps(ops))
+    return _LENGTH.pack(len(ciphertext) + _TAG_SIZE) + nonce + ciphertext + tag
+
+
+def _write_journal(path: str, journal_id: bytes, key: bytes, records: list[list[dict]]) -> None:
+    """Write a complete journal file and fsync it"""
+    with open(path, "wb") as f:
+        f.write(_MAGIC + journal_id)
+        for sequence, ops in enumerate(records):
+            f.write(_record(journal_id, key, sequence, ops))
+        f.flush()
+        _sync(f.fileno())
+    os.chmod(path, 0o600)
+
+
+def _read_file(path: str) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return b""
+
+
+# ==========================================
+# Mutation records
+# ==========================================
+
+def entry_state(entry_id: str, element: _Element | None) -> dict:
+    """Journal op for an entry: its full element, or that it is gone"""
+    if element is None:
+        return {"entry": entry_id, "deleted": True}
+    return {
+        "entry": entry_id,
+        "parent": str(element_uuid(element.getparent())),
+        "xml": etree.tostring(element).decode(),
+    }
+
+
+def group_state(group_id: str, element: _Element | None) -> dict:
+    """Journal op for a group: its own fields (not its children), or that it is gone"""
+    if element is None:
+        return {"group": group_id, "deleted": True}
+    fields = etree.Element("Group")
+    for child in element:
+        if child.tag not in _CONTAINERS:
+            fields.append(deepcopy(child))
+    parent = element.getparent()
+    return {
+        "group": group_id,
+        "parent": str(element_uuid(parent)) if parent is not None and parent.tag == "Group" else None,
+        "xml": etree.tostring(fields).decode(),
+    }
+
+
+def replay(kp: PyKeePass, records: list[list[dict]]) -> int:
+    """Apply journal records to a freshly loaded tree; returns the ops applied"""
+    root = kp.tree.getroot().find("Root")
+    elements: dict[str, _Element] = {}
+    for element in root.iter(*_CONTAINERS):
+        parent = element.getparent()
+        if parent is not None and parent.tag == "History":
+            continue
+        uid = element_uuid(element)
+        if uid is not None:
+            elements[str(uid)] = element
+
+    applied = 0
+    for ops in records:
+        for op in ops:
+            try:
+                _apply(op, elements)
+                applied += 1
+            except Exception:
+                logger.exception("Skipping journal op for %s", op.get("entry") or op.get("group"))
+    return applied
+
+
+def _apply(op: dict[str, Any], elements: dict[str, _Element]) -> None:
+    key = op.get("entry") or op.get("group")
+    old = elements.get(key)
+    if op.get("deleted"):
+        if old is not None:
+            old.getparent().remove(old)
+            for element in old.iter(*_CONTAINERS):
+                uid = element_uuid(element)
+                if uid is not None and elements.get(str(uid)) is element:
+                    del elements[str(uid)]
+        return
+
+    new = etree.fromstring(op["xml"])
+    parent = elements.get(op.get("parent") or "")
+    if "group" in op and old is not None:
+        # Replace the group's own fields, keeping its children
+        for child in list(old):
+            if child.tag not in _CONTAINERS:
+                old.remove(child)
+        for position, child in enumerate(new):
+            old.insert(position, child)
+        return
+    if parent is None:
+        raise LookupError(f"parent group {op.get('parent')} not found")
+    if old is not None and old.getparent() is parent:
+        parent.replace(old, new)
+    else:
+        if old is not None:
+            old.getparent().remove(old)
+        parent.append(new)
+    elements[key] = new
+
+
+# ==========================================
+# Journal id and key inside the vault
+# ==========================================
+
+def _custom_data_item(tree: etree._ElementTree, create: bool = False) -> _Element | None:
+    meta = tree.getroot().find("Meta")
+    if meta is None:
+        return None
+    custom_data = meta.find("CustomData")
+    if custom_data is None:
+        if not create:
+            return None
+        custom_data = etree.SubElement(meta, "CustomData")
+    for item in custom_data.iterchildren("Item"):
+        if item.findtext("Key") == CUSTOM_DATA_KEY:
+            return item
+    if not create:
+        return None
+    item = etree.SubElement(custom_data, "Item")
+    etree.SubElement(item, "Key").text = CUSTOM_DATA_KEY
+    etree.SubElement(item, "Value")
+    return item
+
+
+def _read_credentials(kp: PyKeePass) -> tuple[bytes, bytes] | None:
+    item = _custom_data_item(kp.tree)
+    if item is None:
+        return None
+    try:
+        raw = base64.b64decode(item.findtext("Value") or "", validate=True)
+    except ValueError:
+        return None
+    if len(raw) != _ID_SIZE + _KEY_SIZE:
+        return None
+    return raw[:_ID_SIZE], raw[_ID_SIZE:]
+
+
+def _write_credentials(tree: etree._ElementTree, journal_id: bytes, key: bytes) -> None:
+    item = _custom_data_item(tree, create=True)
+    item.find("Value").text = base64.b64encode(journal_id + key).decode()
+
+
+def _sync(fd: int) -> None:
+    (getattr(os, "fdatasync", None) or os.fsync)(fd)
+
+
+def _sync_directory(path: str) -> None:
+    """Make a rename in the directory of ``path`` durable (no-op where unsupported)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def frozen_copy(kp: PyKeePass) -> Container:
+    """The parsed vault, copied so that it can be saved while the live one changes.
+
+    The XML tree is copied, and the containers around it, whose fields a
+    save replaces (seeds, KDF salt). Binary payloads and other leaf values
+    are never changed in place and stay shared.
+    """
+    copy = _copy_containers(kp.kdbx)
+    copy.body.payload.xml = deepcopy(kp.tree)
+    return copy
+
+
+def _copy_containers(value: Any) -> Any:
+    if isinstance(value, Container):
+        return Container((key, _copy_containers(item)) for key, item in value.items())
+    if isinstance(value, ListContainer):
+        return ListContainer(_copy_containers(item) for item in value)
+    if type(value) is dict:
+        # KDF parameters (a variant dictionary)
+        return {key: _copy_containers(item) for key, item in value.items()}
+    return value
+
+
+def write_temporary(copy: Container, path: str, password: str | None, keyfile: str | None) -> str:
+    """Encrypt a vault copy into an fsynced temporary file next to ``path``; returns its name.
+
+    Rotates the copy's seeds and KDF salt like ``PyKeePass.save``, so the
+    key derivation runs here.
+    """
+    temporary = path + ".vaultix-tmp"
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o600
+    rotate_seeds(copy)
+    try:
+        # Read and written: building the header reads it back for the checksum
+        with open(temporary, "w+b") as f:
+            KDBX.build_stream(copy, f, password=password, keyfile=keyfile, transformed_key=None, decrypt=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temporary, mode)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+    return temporary
@@ -0,0 +1,180 @@
+"""Cipher and key derivation settings of a vault, and Argon2 calibration.
+
+The KDF dominates unlock time: every open, and every save (which derives
+a key for a fresh salt), runs it once. Vaults from other tools range from
+AES-KDF with a few thousand rounds to Argon2 settings that take many
+seconds here, so new vaults are calibrated on this host for a target
+unlock time instead of using fixed parameters.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import time
+
+import argon2.low_level
+from construct import Container
+from pykeepass import PyKeePass
+from pykeepass.kdbx_parsing.kdbx4 import kdf_uuids
+
+from backend.app import config
+
+ARGON2_VERSION = 0x13
+MIN_MEMORY_KIB = 8 * 1024
+CIPHER_NAMES = {"aes256": "AES256", "chacha20": "ChaCha20", "twofish": "Twofish"}
+KDF_NAMES = {"argon2": "Argon2d", "argon2id": "Argon2id", "aeskdf": "AES-KDF"}
+_ARGON2_TYPES = {"argon2d": argon2.low_level.Type.D, "argon2id": argon2.low_level.Type.ID}
+_ARGON2_UUIDS = {"argon2d": kdf_uuids["argon2"], "argon2id": kdf_uuids["argon2id"]}
+# VariantDictionary value types (KeePass KdfParameters)
+_UINT32, _UINT64, _BYTES = 0x04, 0x05, 0x42
+
+
+def cipher_name(kp: PyKeePass) -> str:
+    return CIPHER_NAMES.get(kp.encryption_algorithm, kp.encryption_algorithm)
+
+
+def kdf_name(kp: PyKeePass) -> str:
+    return KDF_NAMES.get(kp.kdf_algorithm, kp.kdf_algorithm or "unknown")
+
+
+def kdf_parameters(kp: PyKeePass) -> dict:
+    """The vault's KDF settings as stored in its header"""
+    header = kp.kdbx.header.value.dynamic_header
+    if kp.version < (4, 0):
+        return {"algorithm": "aeskdf", "rounds": header.transform_rounds.data}
+    params = header.kdf_parameters.data.dict
+    algorithm = kp.kdf_algorithm
+    if algorithm == "aeskdf":
+        return {"algorithm": algorithm, "rounds": params["R"].value}
+    return {
+        "algorithm": "argon2d" if algorithm == "argon2" else algorithm,
+        "iterations": params["I"].value,
+        "memory_kib": params["M"].value // 1024,
+        "parallelism": params["P"].value,
+    }
+
+
+def validate(params: dict) -> dict:
+    """Normalized Argon2 parameters; raises ValueError for unusable ones"""
+    algorithm = params.get("algorithm", config.KDF_ALGORITHM)
+    if algorithm not in _ARGON2_TYPES:
+        raise ValueError(f"Unsupported KDF: {algorithm!r} (argon2d or argon2id)")
+    try:
+        iterations = int(params["iterations"])
+        memory_kib = int(params["memory_kib"])
+        parallelism = int(params["parallelism"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("iterations, memory_kib and parallelism are required integers")
+    if not 1 <= parallelism < 2**24:
+        raise ValueError("parallelism must be between 1 and 2**24 - 1")
+    if not 1 <= iterations < 2**32:
+        raise ValueError("iterations must be between 1 and 2**32 - 1")
+    if not max(MIN_MEMORY_KIB, 8 * parallelism) <= memory_kib < 2**32:
+        raise ValueError(f"memory_kib must be at least {MIN_MEMORY_KIB}")
+    return {"algorithm": algorithm, "iterations": iterations, "memory_kib": memory_kib,
+            "parallelism": parallelism}
+
+
+def resolve(settings: dict | None) -> dict | None:
+    """Argon2 parameters, with their measured time, for create or re-tune.
+
+    ``settings`` has either explicit ``iterations`` (plus memory_kib,
+    parallelism, algorithm) or a ``target_seconds`` to calibrate for; the
+    KDF_* settings fill in what is missing. None means keep the defaults
+    (calibration disabled and nothing given).
+    """
+    settings = {k: v for k, v in (settings or {}).items() if v is not None}
+    if "iterations" in settings:
+        params = validate({"memory_kib": config.KDF_MEMORY_MB * 1024,
+                           "parallelism": config.KDF_PARALLELISM, **settings})
+        return {**params, "measured_seconds": round(measure(params), 3)}
+    target = settings.get("target_seconds", config.KDF_TARGET_SECONDS)
+    if not target:
+        return None
+    return calibrate(
+        target,
+        settings.get("memory_kib", config.KDF_MEMORY_MB * 1024),
+        settings.get("parallelism", config.KDF_PARALLELISM),
+        settings.get("algorithm", config.KDF_ALGORITHM),
+    )
+
+
+def set_argon2(kp: PyKeePass, params: dict) -> None:
+    """Switch a KDBX 4 vault to these Argon2 parameters, taking effect on its next save"""
+    if kp.version < (4, 0):
+        raise ValueError("Argon2 needs a KDBX 4 vault")
+    params = validate(params)
+    header = kp.kdbx.header.value.dynamic_header
+    old = header.kdf_parameters.data.dict
+    salt = old["S"].value if "S" in old else os.urandom(32)
+    items = (
+        ("$UUID", _BYTES, _ARGON2_UUIDS[params["algorithm"]]),
+        ("S", _BYTES, salt),
+        ("P", _UINT32, params["parallelism"]),
+        ("M", _UINT64, params["memory_kib"] * 1024),
+        ("I", _UINT64, params["iterations"]),
+        ("V", _UINT32, ARGON2_VERSION),
+    )
+    # Rebuilt rather than edited, so AES-KDF vaults lose their "R" entry.
+    # next_byte (the following item's type, 0 after the last) ends the list.
+    next_types = [kind for _, kind, _ in items[1:]] + [0]
+    header.kdf_parameters.data.dict = Container(
+        (key, Container(type=kind, key=key, value=value, next_byte=next_type))
+        for (key, kind, value), next_type in zip(items, next_types)
+    )
+
+
+def measure(params: dict) -> float:
+    """Seconds one key derivation with these Argon2 parameters takes here"""
+    started = time.perf_counter()
+    argon2.low_level.hash_secret_raw(
+        secret=os.urandom(32),
+        salt=os.urandom(32),
+        time_cost=params["iterations"],
+        memory_cost=params["memory_kib"],
+        parallelism=params["parallelism"],
+        hash_len=32,
+        type=_ARGON2_TYPES[params["algorithm"]],
+        version=ARGON2_VERSION,
+    )
+    return time.perf_counter() - started
+
+
+def calibrate(
+    target_seconds: float,
+    memory_kib: int = config.KDF_MEMORY_MB * 1024,
+    parallelism: int = config.KDF_PARALLELISM,
+    algorithm: str = config.KDF_ALGORITHM,
+) -> dict:
+    """Argon2 parameters that take about ``target_seconds`` per unlock on this host.
+
+    Memory is kept unless a single iteration already exceeds the target,
+    then halved down to MIN_MEMORY_KIB; iterations are fitted from timed
+    runs with one and two passes, and corrected once if a full run misses
+    the target by more than 15%. Cached per process, since the host does
+    not change; the result carries the measured time of a final run.
+    """
+    if target_seconds <= 0:
+        raise ValueError("target_seconds must be positive")
+    return dict(_calibrated(target_seconds, memory_kib, parallelism, algorithm))
+
+
+@functools.lru_cache(maxsize=16)
+def _calibrated(target_seconds: float, memory_kib: int, parallelism: int, algorithm: str) -> dict:
+    params = validate({"algorithm": algorithm, "iterations": 1, "memory_kib": memory_kib,
+                       "parallelism": parallelism})
+    one = measure(params)
+    while one > target_seconds and params["memory_kib"] // 2 >= MIN_MEMORY_KIB:
+        params["memory_kib"] //= 2
+        one = measure(params)
+    two = measure({**params, "iterations": 2})
+    per_pass = max(two - one, 1e-6)
+    overhead = max(one - per_pass, 0.0)
+    params["iterations"] = max(1, round((target_seconds - overhead) / per_pass))
+    measured = measure(params)
+    if abs(measured - target_seconds) > target_seconds * 0.15:
+        # The two short runs misjudged the pass time; correct from the full run
+        params["iterations"] = max(1, round(params["iterations"] * target_seconds / measured))
+        measured = measure(params)
+    return {**params, "measured_seconds": round(measured, 3)}
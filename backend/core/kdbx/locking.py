@@ -0,0 +1,114 @@
+"""Reader/writer lock guarding the open KDBX tree"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class RWLock:
+    """Many concurrent readers or one writer, both reentrant per thread.
+
+    Phase-fair: once a writer is waiting, new readers queue behind it so a
+    steady stream of reads cannot starve mutations, and when a writer
+    releases, the readers that queued meanwhile go before the next writer.
+    The exception is a *background* read (a save): it may run for seconds,
+    so while one is held new readers are let in regardless and only the
+    writers wait.
+
+    The thread holding the write lock may also take the read lock. Upgrading
+    a read lock to a write lock would deadlock and raises RuntimeError.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers: dict[int, int] = {}
+        self._writer: int | None = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._waiting_readers = 0
+        # Write releases so far, and how many readers that queued before the
+        # last one have yet to get in; only those go before waiting writers
+        self._releases = 0
+        self._phase_readers = 0
+        self._background = 0
+
+    @contextmanager
+    def read(self, background: bool = False) -> Iterator[None]:
+        self.acquire_read(background)
+        try:
+            yield
+        finally:
+            self.release_read(background)
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    def acquire_read(self, background: bool = False) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me and me not in self._readers:
+                arrival = self._releases
+                self._waiting_readers += 1
+                try:
+                    while self._writer is not None or (
+                        self._waiting_writers and not self._background and arrival == self._releases
+                    ):
+                        self._cond.wait()
+                finally:
+                    self._waiting_readers -= 1
+                    if arrival != self._releases:
+                        self._phase_readers -= 1
+                        if not self._phase_readers:
+                            self._cond.notify_all()
+            self._readers[me] = self._readers.get(me, 0) + 1
+            if background:
+                self._background += 1
+
+    def release_read(self, background: bool = False) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            depth = self._readers.get(me)
+            if not depth:
+                raise RuntimeError("Read lock released without being held")
+            if depth == 1:
+                del self._readers[me]
+            else:
+                self._readers[me] = depth - 1
+            if background:
+                self._background -= 1
+            self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("Cannot upgrade a read lock to a write lock")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers or self._phase_readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self) -> None:
+        with self._cond:
+            if self._writer != threading.get_ident():
+                raise RuntimeError("Write lock released by a thread that does not hold it")
+            self._writer_depth -= 1
+            if self._writer_depth == 0:
+                self._writer = None
+                self._releases += 1
+                self._phase_readers = self._waiting_readers
+                self._cond.notify_all()
@@ -2,22 +2,134 @@
 
 from __future__ import annotations
 
+import base64
+import bisect
+import functools
+import io
+import itertools
+import logging
+import threading
+import time
 import uuid
-from datetime import datetime
-from pathlib import Path
-from typing import Any
+from copy import deepcopy
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable
 
-from pykeepass import PyKeePass, create_database
+from lxml.etree import _Element
+from pykeepass import PyKeePass
 from pykeepass.entry import Entry as KPEntry
 from pykeepass.group import Group as KPGroup
+from pykeepass.pykeepass import BLANK_DATABASE_LOCATION, BLANK_DATABASE_PASSWORD
+
+from backend.app import config
+from backend.core.attachments import file_handler
+from backend.core.attachments.metadata import BinaryMetadata, sniff_mime
+from backend.core.attachments.spool import EncryptedSpool
+from backend.core.kdbx import kdf, projection
+from backend.core.kdbx.changes import ChangeLog
+from backend.core.kdbx.expiry import ExpiryIndex, ExpiryScheduler, utcnow
+from backend.core.kdbx.index import UuidIndex, element_uuid, parse_uuid
+from backend.core.kdbx.journal import Journal, entry_state, group_state, replay
+from backend.core.kdbx.locking import RWLock
+from backend.core.kdbx.serialization import EntryJsonCache, dumps, json_array
+from backend.core.kdbx.snapshot import EntryRecord, VaultSnapshot
+from backend.core.kdbx.tree import GroupTree
+from backend.core.kdbx.writer import WriteBehindSaver
+from backend.core.metrics import cache_requests, kdbx_lookups, kdbx_operation_duration
+from backend.core.profiling import profiled
+from backend.core.search.indexer import SearchIndex
+from backend.core.security.audit_service import AuditIndex, scoring_pool
+from backend.core.security.breach_checker import BreachIndex, password_digest
+
+logger = logging.getLogger(__name__)
+
+# Measured resident bytes per XML element of an open vault, including the
+# lxml node, its pykeepass wrappers and the UUID/search indexes.
+ELEMENT_MEMORY_COST = 460
+# Measured bytes per entry record of the snapshot (snapshot_memory benchmark)
+SNAPSHOT_ENTRY_COST = 950
+
+# Shared by all instances so revisions never repeat across vault sessions
+_revisions = itertools.count(1)
+
+
+class BatchRollbackError(RuntimeError):
+    """A failed batch could not be reverted cleanly"""
+
+
+def _reading(method):
+    """Run a KdbxDatabase method under the shared (read) lock"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+
+    return profiled(wrapper)
+
+
+def _writing(method):
+    """Run a KdbxDatabase method under the exclusive (write) lock"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.write():
+            return method(self, *args, **kwargs)
+
+    return profiled(wrapper)
 
 
 class KdbxDatabase:
-    """Wrapper around pykeepass for KDBX operations"""
+    """Wrapper around pykeepass for KDBX operations.
+
+    Thread-safe: reads share a reader/writer lock and run in parallel,
+    mutations take it exclusively. Saves only hold it shared, so reads of
+    the committed state continue while Argon2 and encryption run.
 
-    def __init__(self):
+    With the journal, each mutation is made durable by an fsynced journal
+    append and the full save is a checkpoint that runs rarely; the save
+    delays default to the JOURNAL_CHECKPOINT_* settings then.
+    """
+
+    def __init__(
+        self,
+        write_behind: bool = config.WRITE_BEHIND,
+        save_debounce: float | None = None,
+        save_max_dirty_age: float | None = None,
+        audit_on_open: bool = config.AUDIT_ON_OPEN,
+        journal: bool = config.JOURNAL,
+    ):
+        if save_debounce is None:
+            save_debounce = config.JOURNAL_CHECKPOINT_DEBOUNCE if journal else config.SAVE_DEBOUNCE
+        if save_max_dirty_age is None:
+            save_max_dirty_age = config.JOURNAL_CHECKPOINT_MAX_AGE if journal else config.SAVE_MAX_DIRTY_AGE
         self._kp: PyKeePass | None = None
         self._path: str | None = None
+        self._unlock_seconds: float | None = None
+        self._index = UuidIndex()
+        self._snapshot = VaultSnapshot()
+        self._search = SearchIndex()
+        self._groups = GroupTree()
+        self._sorted_cache: dict[tuple[str | None, str], list] = {}
+        self._entry_json = EntryJsonCache()
+        self._binaries = BinaryMetadata()
+        self._binaries_released = False
+        self._audit = AuditIndex()
+        self._audit_on_open = audit_on_open
+        self._expiry = ExpiryIndex()
+        self._expiry_announced: datetime | None = None
+        self._expiry_scheduler = ExpiryScheduler(self._next_expiry, self._announce_expired)
+        self._revision = 0
+        self._changes = ChangeLog()
+        self._lock = RWLock()
+        self._journal = Journal(enabled=journal)
+        self._saver = WriteBehindSaver(
+            self._prepare_write,
+            self._lock,
+            enabled=write_behind,
+            debounce=save_debounce,
+            max_dirty_age=save_max_dirty_age,
+        )
 
     @property
     def is_open(self) -> bool:
@@ -27,79 +139,242 @@ class KdbxDatabase:
     def path(self) -> str | None:
         return self._path
 
+    @property
+    def revision(self) -> int:
+        """Increases on every open, close and applied mutation"""
+        return self._revision
+
+    @property
+    def change_log(self) -> ChangeLog:
+        return self._changes
+
+    @_writing
     def open(self, path: str, password: str, keyfile: str | None = None) -> dict:
         """Open a KDBX database file"""
+        if self.is_open:
+            self.close()
         kf = keyfile if keyfile else None
-        self._kp = PyKeePass(path, password=password, keyfile=kf)
+        self._kp, self._unlock_seconds = _unlock(path, password, kf)
         self._path = path
+        records = self._journal.open(self._kp, path)
+        if records:
+            applied = replay(self._kp, records)
+            logger.warning("Replayed %d journaled changes (%d ops) onto %s", len(records), applied, path)
+        with kdbx_operation_duration.time(operation="index"):
+            self._build_indexes()
+        if records:
+            # Already durable in the journal; folded in by the next checkpoint
+            self._mark_dirty()
+        if self._audit_on_open:
+            self._score_in_background()
         return self.get_info()
 
-    def create(self, path: str, password: str, name: str = "Vaultix Database") -> dict:
-        """Create a new KDBX database"""
-        self._kp = create_database(path, password=password)
+    def create(
+        self, path: str, password: str, name: str = "Vaultix Database", kdf_settings: dict | None = None
+    ) -> dict:
+        """Create a new KDBX database.
+
+        ``kdf_settings`` holds explicit Argon2 parameters (algorithm,
+        iterations, memory_kib, parallelism) or a ``target_seconds`` to
+        calibrate for; without them the KDF_* settings apply.
+        """
+        # Calibrating takes a few seconds; not under the lock
+        params = kdf.resolve(kdf_settings)
+        return self._create(path, password, name, params)
+
+    @_writing
+    def _create(self, path: str, password: str, name: str, params: dict | None) -> dict:
+        if self.is_open:
+            self.close()
+        self._kp = _blank_database(path, password)
         self._kp.root_group.name = name
-        self._kp.save()
+        if params is not None:
+            kdf.set_argon2(self._kp, params)
+            self._unlock_seconds = params["measured_seconds"]
+        self._write(path)
         self._path = path
+        self._build_indexes()
         return self.get_info()
 
+    @_writing
     def close(self) -> None:
-        """Close the database"""
+        """Flush pending changes and close the database"""
+        if self.is_open:
+            self._saver.flush()
+        self._saver.stop()
+        self._saver.reset()
+        self._journal.close(remove_if_empty=True)
         self._kp = None
         self._path = None
+        self._unlock_seconds = None
+        self._index.clear()
+        self._snapshot.clear()
+        self._search.clear()
+        self._groups.clear()
+        self._sorted_cache.clear()
+        self._entry_json.clear()
+        self._binaries.reset(None)
+        self._binaries_released = False
+        self._audit.clear()
+        self._expiry.clear()
+        self._expiry_scheduler.stop()
+        self._advance_revision(None)
 
     def save(self) -> str:
-        """Save changes to disk"""
+        """Save changes to disk, flushing any pending write-behind save"""
         self._ensure_open()
-        self._kp.save()
+        # Not under a read lock of its own: the flush holds one only while
+        # copying the vault, and mutations go on while it is written
+        self._saver.flush(force=True)
         return datetime.now().isoformat()
 
+    @_writing
     def save_as(self, path: str) -> None:
         """Save to a new file"""
         self._ensure_open()
-        self._kp.save(path)
+        self._write(path)
+        self._kp.filename = path
         self._path = path
+        self._saver.reset()
+        # Same entries, so clients keep their cursors
+        self._advance_revision([])
+
+    def retune_kdf(self, kdf_settings: dict | None = None) -> dict:
+        """Switch the open vault to new Argon2 parameters and save it right away.
+
+        Takes the same settings as ``create``. Returns the database info
+        with the new parameters and their measured unlock time.
+        """
+        self._ensure_open()
+        params = kdf.resolve(kdf_settings)
+        if params is None:
+            raise ValueError("No KDF parameters given and calibration is disabled")
+        self._retune_kdf(params)
+        return self.get_info()
+
+    @_writing
+    def _retune_kdf(self, params: dict) -> None:
+        self._ensure_open()
+        header = self._kp.kdbx.header.value.dynamic_header.kdf_parameters.data
+        previous = header.dict
+        kdf.set_argon2(self._kp, params)
+        try:
+            # The KDF lives in the header, which the journal does not cover
+            self._write()
+        except Exception:
+            header.dict = previous
+            raise
+        self._unlock_seconds = params["measured_seconds"]
+        self._saver.reset()
+        self._advance_revision([])
+
+    def save_status(self) -> dict:
+        """Dirty/pending state of the write-behind saver and the journal"""
+        return {**self._saver.status(), "journal": self._journal.status()}
 
+    def configure_saving(
+        self,
+        write_behind: bool | None = None,
+        debounce: float | None = None,
+        max_dirty_age: float | None = None,
+    ) -> dict:
+        """Change write-behind settings at runtime"""
+        self._saver.configure(write_behind, debounce, max_dirty_age)
+        return self.save_status()
+
+    @_reading
     def get_info(self) -> dict:
         """Get database metadata"""
         self._ensure_open()
-        entries = self._kp.entries or []
-        groups = self._kp.groups or []
         return {
             "name": self._kp.root_group.name or "Database",
             "description": "",
             "path": self._path,
-            "version": "4.0",
-            "cipher": "ChaCha20",
-            "kdf": "Argon2id",
-            "entry_count": len(entries),
-            "group_count": len(groups),
+            "version": "{}.{}".format(*self._kp.version),
+            "cipher": kdf.cipher_name(self._kp),
+            "kdf": kdf.kdf_name(self._kp),
+            "kdf_parameters": kdf.kdf_parameters(self._kp),
+            "unlock_seconds": self._unlock_seconds,
+            "entry_count": len(self._index.entries),
+            "group_count": len(self._index.groups),
         }
 
+    @_reading
+    def memory_estimate(self) -> int:
+        """Rough bytes held for the open vault: XML tree, snapshot, caches, indexes and binaries"""
+        if not self.is_open:
+            return 0
+        elements = sum(1 for _ in self._kp.tree.iter())
+        binaries = sum(self._binaries.size(i) for i in range(file_handler.pool_size(self._kp)))
+        snapshot = len(self._snapshot) * SNAPSHOT_ENTRY_COST + self._entry_json.nbytes
+        return elements * ELEMENT_MEMORY_COST + snapshot + binaries
+
     # ==========================================
     # Entry Operations
     # ==========================================
 
+    @_reading
     def list_entries(self, group_id: str | None = None) -> list[dict]:
         """List all entries, optionally filtered by group"""
         self._ensure_open()
-        if group_id:
-            group = self._find_group_by_uuid(group_id)
-            if group:
-                entries = group.entries or []
-            else:
-                entries = []
+        return [self._entry_to_dict(r) for r in self._group_records(group_id)]
+
+    @_reading
+    def list_entries_json(self, group_id: str | None = None) -> bytes:
+        """Entries without secrets (``projection.LIST_FIELDS``) as a JSON array, from the entry JSON cache"""
+        self._ensure_open()
+        return json_array(self._entry_json_bytes(r) for r in self._group_records(group_id))
+
+    @_reading
+    def list_entries_page(
+        self,
+        group_id: str | None = None,
+        fields: str | None = None,
+        sort: str | None = None,
+        cursor: str | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        """Cursor-paginated, projected entry listing without secrets.
+
+        ``sort`` is a key from ``projection.SORT_KEYS``, prefixed with ``-``
+        for descending order. The cursor encodes the sort value and id of
+        the last returned entry, so pages stay stable across mutations.
+        """
+        self._ensure_open()
+        columns = projection.parse_fields(fields)
+        key, descending = projection.parse_sort(sort)
+        limit = projection.clamp_limit(limit)
+
+        keyed = self._sorted_entries(group_id, key)
+        position = _sort_position(projection.decode_cursor(cursor)) if cursor else None
+
+        # Sorted ascending by (sort value, id); the cursor is found by
+        # bisection and descending pages are read backwards from it
+        if descending:
+            end = len(keyed) if position is None else bisect.bisect_left(keyed, position, key=_sort_key)
+            start = max(0, end - limit)
+            page = keyed[start:end][::-1]
+            has_more = start > 0
         else:
-            entries = self._kp.entries or []
-        return [self._entry_to_dict(e) for e in entries]
+            start = 0 if position is None else bisect.bisect_right(keyed, position, key=_sort_key)
+            page = keyed[start:start + limit]
+            has_more = start + limit < len(keyed)
+        return {
+            "items": [projection.project_entry(r, columns) for _, _, r in page],
+            "total": len(keyed),
+            "next_cursor": projection.encode_cursor(page[-1][:2]) if has_more and page else None,
+        }
 
+    @_reading
     def get_entry(self, entry_id: str) -> dict | None:
         """Get single entry by UUID"""
         self._ensure_open()
-        entry = self._find_entry_by_uuid(entry_id)
-        if entry:
-            return self._entry_to_dict(entry)
+        record = self._find_record(entry_id)
+        if record:
+            return self._entry_to_dict(record)
         return None
 
+    @_writing
     def create_entry(
         self,
         title: str,
@@ -113,27 +388,23 @@ class KdbxDatabase:
     ) -> dict:
         """Create a new entry"""
         self._ensure_open()
-        group = self._find_group_by_uuid(group_id)
-        if not group:
-            group = self._kp.root_group
-
-        entry = self._kp.add_entry(
-            group,
+        entry = self._add_entry(
+            group_id,
             title=title,
             username=username,
             password=password,
             url=url,
             notes=notes,
             tags=tags,
+            custom_fields=custom_fields,
         )
+        self._entries_changed([entry.uuid])
+        self._journal_entries([entry.uuid])
+        self._mark_dirty()
+        self._publish([self._entry_change("create", entry.uuid)])
+        return self._entry_to_dict(self._snapshot.get(entry.uuid))
 
-        if custom_fields:
-            for key, value in custom_fields.items():
-                entry.set_custom_property(key, value)
-
-        self._kp.save()
-        return self._entry_to_dict(entry)
-
+    @_writing
     def update_entry(self, entry_id: str, updates: dict[str, Any]) -> dict | None:
         """Update an entry"""
         self._ensure_open()
@@ -141,26 +412,14 @@ class KdbxDatabase:
         if not entry:
             return None
 
-        if "title" in updates and updates["title"] is not None:
-            entry.title = updates["title"]
-        if "username" in updates and updates["username"] is not None:
-            entry.username = updates["username"]
-        if "password" in updates and updates["password"] is not None:
-            entry.password = updates["password"]
-        if "url" in updates and updates["url"] is not None:
-            entry.url = updates["url"]
-        if "notes" in updates and updates["notes"] is not None:
-            entry.notes = updates["notes"]
-        if "tags" in updates and updates["tags"] is not None:
-            entry.tags = updates["tags"]
-
-        if "custom_fields" in updates and updates["custom_fields"]:
-            for key, value in updates["custom_fields"].items():
-                entry.set_custom_property(key, value)
-
-        self._kp.save()
-        return self._entry_to_dict(entry)
+        self._apply_entry_updates(entry, updates)
+        self._entries_changed([entry.uuid])
+        self._journal_entries([entry.uuid])
+        self._mark_dirty()
+        self._publish([self._entry_change("update", entry.uuid, _changed_fields(updates))])
+        return self._entry_to_dict(self._snapshot.get(entry.uuid))
 
+    @_writing
     def delete_entry(self, entry_id: str) -> bool:
         """Move entry to recycle bin or delete permanently"""
         self._ensure_open()
@@ -168,26 +427,72 @@ class KdbxDatabase:
         if not entry:
             return False
 
-        # Move to recycle bin if it exists
-        recycle_bin = self._kp.recyclebin_group
-        if recycle_bin:
-            self._kp.move_entry(entry, recycle_bin)
-        else:
-            self._kp.delete_entry(entry)
-
-        self._kp.save()
+        self._discard_entry(entry)
+        self._entries_changed([entry.uuid])
+        self._journal_entries([entry.uuid])
+        renumbered = self._collect_binaries()
+        self._mark_dirty()
+        self._publish([self._entry_change("move", entry.uuid, ["group_id"])] + renumbered)
         return True
 
+    @_writing
+    def apply_batch(self, operations: list[dict[str, Any]]) -> dict:
+        """Apply create/update/delete/move operations as one transaction.
+
+        Each operation is a dict with ``op`` plus ``id`` (update/delete/move),
+        ``group_id`` (create/move) and ``fields`` (create/update). Operations
+        run in order against the in-memory tree; if one fails, everything
+        applied so far is undone and nothing is marked for saving. A
+        successful batch counts as a single change for the saver.
+        """
+        self._ensure_open()
+        results: list[dict] = []
+        undo: list[Callable[[], None]] = []
+        touched: list[uuid.UUID] = []
+        failed = False
+
+        for i, op in enumerate(operations):
+            kind = op.get("op")
+            if failed:
+                results.append({"index": i, "op": kind, "id": op.get("id"), "status": "skipped"})
+                continue
+            try:
+                entry_id = self._apply_batch_op(op, undo)
+                touched.append(uuid.UUID(entry_id))
+                results.append({"index": i, "op": kind, "id": entry_id, "status": "ok"})
+            except Exception as e:
+                failed = True
+                results.append({
+                    "index": i, "op": kind, "id": op.get("id"), "status": "error", "error": str(e),
+                })
+
+        if failed:
+            self._rollback(undo)
+            for result in results:
+                if result["status"] == "ok":
+                    result["status"] = "rolled_back"
+        elif operations:
+            self._entries_changed(touched)
+            self._journal_entries(touched)
+            renumbered = self._collect_binaries()
+            self._mark_dirty()
+            self._publish([
+                self._batch_change(op, entry_id) for op, entry_id in zip(operations, touched)
+            ] + renumbered)
+
+        return {"success": not failed, "applied": 0 if failed else len(operations), "results": results}
+
     # ==========================================
     # Group Operations
     # ==========================================
 
+    @_reading
     def list_groups(self) -> list[dict]:
-        """Get group tree"""
+        """Get group tree with direct and recursive entry counts (cached)"""
         self._ensure_open()
-        root = self._kp.root_group
-        return self._build_group_tree(root)
+        return self._groups.render()
 
+    @_writing
     def create_group(self, name: str, parent_id: str | None = None) -> dict:
         """Create a new group"""
         self._ensure_open()
@@ -196,9 +501,14 @@ class KdbxDatabase:
             parent = self._kp.root_group
 
         group = self._kp.add_group(parent, name)
-        self._kp.save()
-        return self._group_to_dict(group)
+        self._index.add_group(group)
+        self._groups.add_group(group._element)
+        self._journal_write([group_state(str(group.uuid), group._element)])
+        self._mark_dirty()
+        self._publish([self._group_change("create", group.uuid)])
+        return self._groups.node_dict(group.uuid)
 
+    @_writing
     def update_group(self, group_id: str, name: str | None = None) -> dict | None:
         """Update a group"""
         self._ensure_open()
@@ -206,12 +516,19 @@ class KdbxDatabase:
         if not group:
             return None
 
-        if name is not None:
-            group.name = name
+        # Nothing to change: keep the revision, ETags and change feed quiet
+        if name is None or name == group.name:
+            return self._groups.node_dict(group.uuid)
 
-        self._kp.save()
-        return self._group_to_dict(group)
+        group.name = name
+        self._groups.rename(group.uuid, name)
+        self._entries_changed(self._index.entry_ids_under(group))
+        self._journal_write([group_state(str(group.uuid), group._element)])
+        self._mark_dirty()
+        self._publish([self._group_change("update", group.uuid, ["name"])])
+        return self._groups.node_dict(group.uuid)
 
+    @_writing
     def delete_group(self, group_id: str) -> bool:
         """Delete a group"""
         self._ensure_open()
@@ -219,132 +536,830 @@ class KdbxDatabase:
         if not group or group == self._kp.root_group:
             return False
 
+        removed = self._index.entry_ids_under(group)
+        removed_groups = [element_uuid(e) for e in group._element.iter("Group")]
+        if group._element.find(".//Binary") is not None:
+            self._binaries_released = True
+        self._index.remove_group(group)
         self._kp.delete_group(group)
-        self._kp.save()
+        self._entries_changed(removed)
+        self._groups.remove_group(group.uuid)
+        self._journal_write([group_state(str(group.uuid), None)])
+        renumbered = self._collect_binaries()
+        self._mark_dirty()
+        self._publish(
+            [self._group_change("delete", uid) for uid in removed_groups if uid]
+            + [self._entry_change("delete", uid) for uid in removed]
+            + renumbered
+        )
         return True
 
     # ==========================================
     # Attachment Operations
     # ==========================================
 
+    @_reading
     def list_attachments(self, entry_id: str) -> list[dict]:
         """List attachments for an entry"""
+        self._ensure_open()
+        record = self._find_record(entry_id)
+        if not record:
+            return []
+
+        return [
+            self._binaries.describe(position, binary_id, filename)
+            for position, (binary_id, filename) in enumerate(record.attachments)
+        ]
+
+    def add_attachment(self, entry_id: str, filename: str, spool: EncryptedSpool) -> dict | None:
+        """Attach a finished upload to an entry.
+
+        A payload already in the binary pool (same size and SHA-256) is
+        referenced instead of stored again. A new binary cannot be
+        journaled, so with the journal on it is saved by a checkpoint
+        before this returns. Returns the attachment's metadata plus
+        ``deduplicated``, or None if there is no such entry.
+        """
+        attachment = self._add_attachment(entry_id, filename, spool)
+        if attachment is not None and not attachment["deduplicated"] and self._journal.enabled:
+            self._saver.flush()
+        return attachment
+
+    @_writing
+    def _add_attachment(self, entry_id: str, filename: str, spool: EncryptedSpool) -> dict | None:
         self._ensure_open()
         entry = self._find_entry_by_uuid(entry_id)
         if not entry:
-            return []
+            return None
+
+        size, digest = spool.size, spool.sha256()
+        binary_id = self._binaries.find(size, digest)
+        deduplicated = binary_id is not None
+        if not deduplicated:
+            binary_id = file_handler.append_binary(self._kp, spool.chunks(), size)
+            self._binaries.added(binary_id, size, digest, sniff_mime(spool.head(), filename))
+            self._journal.suspend()
+        entry.add_attachment(binary_id, filename)
+        entry.touch(modify=True)
+        self._entries_changed([entry.uuid])
+        self._journal_entries([entry.uuid])
+        self._mark_dirty()
+        self._publish([self._entry_change("update", entry.uuid, ["attachments"])])
+        # Appended last, so its id is its position in the entry's list
+        position = len(self._snapshot.get(entry.uuid).attachments) - 1
+        return {**self._binaries.describe(position, binary_id, filename), "deduplicated": deduplicated}
+
+    @_writing
+    def delete_attachment(self, entry_id: str, attachment_id: str) -> bool:
+        """Remove an attachment from an entry; its binary goes with the last reference"""
+        self._ensure_open()
+        entry = self._find_entry_by_uuid(entry_id)
+        position = _attachment_position(attachment_id)
+        if not entry or position is None:
+            return False
+        # The entry's attachments as the snapshot lists them
+        binaries = [b for b in entry._element.iterchildren("Binary") if b.find("Value[@Ref]") is not None]
+        if position >= len(binaries):
+            return False
+        binary = binaries[position]
 
-        result = []
-        for att in entry.attachments or []:
-            result.append({
-                "id": str(att.id),
-                "filename": att.filename,
-                "size": len(att.data) if att.data else 0,
-            })
-        return result
+        entry._element.remove(binary)
+        entry.touch(modify=True)
+        self._binaries_released = True
+        self._entries_changed([entry.uuid])
+        self._journal_entries([entry.uuid])
+        renumbered = self._collect_binaries()
+        self._mark_dirty()
+        self._publish([self._entry_change("update", entry.uuid, ["attachments"])] + renumbered)
+        return True
 
     def get_attachment_data(self, entry_id: str, attachment_id: str) -> tuple[str, bytes] | None:
         """Get attachment filename and raw data"""
+        attachment = self.open_attachment(entry_id, attachment_id)
+        if not attachment:
+            return None
+        return (attachment["filename"], bytes(attachment["view"]))
+
+    @_reading
+    def open_attachment(self, entry_id: str, attachment_id: str) -> dict | None:
+        """Locate an attachment for streaming.
+
+        Returns filename, size, a content-hash ETag and a read-only
+        memoryview over the binary (no copy of the payload is made).
+        """
         self._ensure_open()
-        entry = self._find_entry_by_uuid(entry_id)
-        if not entry:
+        record = self._find_record(entry_id)
+        position = _attachment_position(attachment_id)
+        if not record or position is None or position >= len(record.attachments):
             return None
 
-        for att in entry.attachments or []:
-            if str(att.id) == attachment_id:
-                return (att.filename, att.data or b"")
-        return None
+        binary_id, filename = record.attachments[position]
+        view = file_handler.binary_view(self._kp, binary_id)
+        if view is None:
+            return None
+        return {
+            "filename": filename,
+            "size": len(view),
+            "mime_type": self._binaries.mime_type(binary_id, filename),
+            "etag": self._binaries.content_hash(binary_id),
+            "view": view.toreadonly(),
+        }
 
     # ==========================================
     # Search
     # ==========================================
 
-    def search(self, query: str) -> list[dict]:
-        """Search entries by title, username, url, notes"""
+    @_reading
+    def search(self, query: str, limit: int | None = None) -> list[dict]:
+        """Ranked search over title, username, url, notes, tags and group.
+
+        Supports field-scoped terms (``user:``, ``url:``, ``tag:``,
+        ``group:``, ``title:``, ``notes:``) and quoted phrases. An empty
+        query returns all entries.
+        """
+        self._ensure_open()
+        return [self._entry_to_dict(r) for r in self._search_records(query, limit)]
+
+    @_reading
+    def search_json(self, query: str, limit: int | None = None) -> bytes:
+        """``search`` results without secrets (``projection.LIST_FIELDS``) as a JSON array"""
+        self._ensure_open()
+        return json_array(self._entry_json_bytes(r) for r in self._search_records(query, limit))
+
+    @_reading
+    def search_page(
+        self,
+        query: str,
+        fields: str | None = None,
+        cursor: str | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        """Ranked search returning secret-free projections, paginated by offset"""
         self._ensure_open()
-        q = query.lower()
-        results = []
-        for entry in self._kp.entries or []:
-            if any(
-                q in (getattr(entry, field) or "").lower()
-                for field in ("title", "username", "url", "notes")
-            ):
-                results.append(self._entry_to_dict(entry))
-        return results
+        columns = projection.parse_fields(fields)
+        limit = projection.clamp_limit(limit)
+        offset = projection.decode_cursor(cursor) if cursor else 0
+        if type(offset) is not int or offset < 0:
+            raise ValueError("Invalid cursor")
+
+        if query.strip():
+            ids = self._search.search(query, offset + limit + 1)
+            hits = [self._snapshot.entries[uid] for uid in ids]
+        else:
+            hits = list(itertools.islice(self._snapshot.entries.values(), offset + limit + 1))
+
+        page = hits[offset:offset + limit]
+        has_more = len(hits) > offset + limit
+        return {
+            "items": [projection.project_entry(r, columns) for r in page],
+            "next_cursor": projection.encode_cursor(offset + limit) if has_more else None,
+        }
+
+    # ==========================================
+    # Security Audit
+    # ==========================================
+
+    def score_passwords(self) -> int:
+        """Score the passwords that have no cached score yet.
+
+        Only the reads take the database lock; zxcvbn runs in the scoring
+        pool without it. Returns the number of passwords scored.
+        """
+        with self._audit.scoring:
+            with self._lock.read():
+                self._ensure_open()
+                work = self._audit.pending_passwords(self._snapshot.entries)
+            if work:
+                results = scoring_pool.score([password for _, password in work])
+                self._audit.store(zip(work, results))
+            return len(work)
+
+    def audit_health(self) -> dict:
+        """Password health dashboard (strength, reuse, expiry counts).
+
+        Served from the maintained counters without waiting for zxcvbn:
+        passwords that have no score yet are counted as ``pending`` and
+        scored in the background.
+        """
+        report = self._health_report()
+        if report["pending"]:
+            self._score_in_background()
+        return report
+
+    def audit_weak(self, limit: int | None = None) -> list[dict]:
+        """Entries with weak passwords, weakest first"""
+        self.score_passwords()
+        return self._audit_report(self._audit.weak, limit)
+
+    def audit_duplicates(self) -> dict:
+        """Groups of entries that share a password, exactly or up to case/trailing digits"""
+        return self._audit_report(self._audit.duplicates)
+
+    @_reading
+    def breach_check(self, entry_id: str, index: BreachIndex) -> dict | None:
+        """Look up one entry's password in the offline breach dataset"""
+        self._ensure_open()
+        record = self._find_record(entry_id)
+        if not record:
+            return None
+        password = record.password
+        count = index.lookup(password_digest(password)) if password else 0
+        return {"id": record.id, "breached": count > 0, "breach_count": count}
+
+    @_reading
+    def breach_check_all(self, index: BreachIndex) -> dict:
+        """Look up every distinct password of the vault in one pass"""
+        self._ensure_open()
+        return self._audit.breaches(self._snapshot.entries, index)
+
+    @_reading
+    def password_reuse(self, entry_id: str) -> dict | None:
+        """How many other entries use this entry's password (or a near variant)"""
+        self._ensure_open()
+        record = self._find_record(entry_id)
+        if not record:
+            return None
+        return self._audit.reuse(record.uuid)
+
+    @_reading
+    def audit_expired(self) -> list[dict]:
+        """Entries whose expiry time has passed, longest expired first"""
+        self._ensure_open()
+        return [self._expiry_item(uid) for _, uid in self._expiry.between(None, utcnow())]
+
+    @_reading
+    def audit_expiring(self, days: float | None = None) -> list[dict]:
+        """Entries that expire within the next ``days`` days, soonest first"""
+        self._ensure_open()
+        now = utcnow()
+        days = days if days is not None else config.EXPIRY_WARNING_DAYS
+        return [
+            self._expiry_item(uid)
+            for _, uid in self._expiry.between(now, now + timedelta(days=days))
+        ]
+
+    # ==========================================
+    # Diagnostics
+    # ==========================================
+
+    @_reading
+    def check_index(self) -> dict:
+        """Compare the UUID index and group tree against a full scan of the tree"""
+        self._ensure_open()
+        report = self._index.verify(self._kp)
+        fresh = GroupTree()
+        fresh.build(self._kp)
+        report["group_tree_ok"] = fresh.render() == self._groups.render()
+        report["ok"] = report["ok"] and report["group_tree_ok"]
+        return report
 
     # ==========================================
     # Private Helpers
     # ==========================================
 
-    def _ensure_open(self) -> None:
-        if not self._kp:
-            raise RuntimeError("No database open")
+    def _apply_batch_op(self, op: dict[str, Any], undo: list[Callable[[], None]]) -> str:
+        """Apply one batch operation, recording how to revert it in ``undo``"""
+        kind = op.get("op")
+        fields = op.get("fields") or {}
 
-    def _find_entry_by_uuid(self, entry_id: str) -> KPEntry | None:
+        if kind == "create":
+            entry = self._add_entry(
+                op.get("group_id"),
+                title=fields.get("title") or "",
+                username=fields.get("username") or "",
+                password=fields.get("password") or "",
+                url=fields.get("url") or "",
+                notes=fields.get("notes") or "",
+                tags=fields.get("tags"),
+                custom_fields=fields.get("custom_fields"),
+            )
+
+            def revert_create():
+                parent = entry._element.getparent()
+                if parent is not None:
+                    parent.remove(entry._element)
+                self._index.remove_entry(entry)
+
+            undo.append(revert_create)
+            return str(entry.uuid)
+
+        if kind not in ("update", "delete", "move"):
+            raise ValueError(f"Unknown operation: {kind!r}")
+
+        entry = self._find_entry_by_uuid(op.get("id"))
+        if not entry:
+            raise LookupError(f"Entry not found: {op.get('id')}")
+
+        if kind == "update":
+            element, backup = entry._element, deepcopy(entry._element)
+
+            def revert_update():
+                # In place, so the element stays the one that the index and
+                # any earlier undo step of this batch refer to
+                _restore_element(element, backup)
+
+            undo.append(revert_update)
+            self._apply_entry_updates(entry, fields)
+            return str(entry.uuid)
+
+        if kind == "move":
+            target = self._find_group_by_uuid(op.get("group_id"))
+            if not target:
+                raise LookupError(f"Group not found: {op.get('group_id')}")
+
+        element = entry._element
+        parent = element.getparent()
+        position = parent.index(element)
+
+        def revert_remove():
+            parent.insert(min(position, len(parent)), element)
+            self._index.add_entry(entry)
+
+        undo.append(revert_remove)
+        if kind == "move":
+            self._kp.move_entry(entry, target)
+        else:
+            self._discard_entry(entry)
+        return str(entry.uuid)
+
+    def _rollback(self, undo: list[Callable[[], None]]) -> None:
+        """Revert a failed batch, newest operation first.
+
+        Should an undo step fail, the remaining ones still run and the
+        indexes are rebuilt from the tree before BatchRollbackError is
+        raised, so they never describe a state the tree is not in.
+        """
+        self._binaries_released = False
+        errors = []
+        for revert in reversed(undo):
+            try:
+                revert()
+            except Exception as e:
+                logger.exception("Reverting a batch operation failed")
+                errors.append(e)
+        if errors:
+            self._build_indexes()
+            raise BatchRollbackError(f"Rollback failed: {errors[0]}")
+
+    def _add_entry(
+        self,
+        group_id: str | None,
+        title: str,
+        username: str = "",
+        password: str = "",
+        url: str = "",
+        notes: str = "",
+        tags: list[str] | None = None,
+        custom_fields: dict[str, str] | None = None,
+    ) -> KPEntry:
+        group = self._find_group_by_uuid(group_id)
+        if not group:
+            group = self._kp.root_group
+
+        # Build the entry directly instead of PyKeePass.add_entry(): KeePass
+        # allows duplicate titles, and pykeepass's duplicate check is an
+        # XPath scan per insert that makes bulk creates quadratic.
+        entry = KPEntry(
+            title=title,
+            username=username,
+            password=password,
+            url=url,
+            notes=notes,
+            tags=tags,
+            kp=self._kp,
+        )
+        group.append(entry)
+
+        if custom_fields:
+            for key, value in custom_fields.items():
+                entry.set_custom_property(key, value)
+
+        self._index.add_entry(entry)
+        return entry
+
+    def _apply_entry_updates(self, entry: KPEntry, updates: dict[str, Any]) -> None:
+        if "title" in updates and updates["title"] is not None:
+            entry.title = updates["title"]
+        if "username" in updates and updates["username"] is not None:
+            entry.username = updates["username"]
+        if "password" in updates and updates["password"] is not None:
+            entry.password = updates["password"]
+        if "url" in updates and updates["url"] is not None:
+            entry.url = updates["url"]
+        if "notes" in updates and updates["notes"] is not None:
+            entry.notes = updates["notes"]
+        if "tags" in updates and updates["tags"] is not None:
+            entry.tags = updates["tags"]
+        if "expiry_time" in updates and updates["expiry_time"] is not None:
+            expiry = updates["expiry_time"]
+            entry.expiry_time = expiry if expiry.tzinfo else expiry.replace(tzinfo=timezone.utc)
+            entry.expires = updates.get("expires", True)
+        elif "expires" in updates and updates["expires"] is not None:
+            entry.expires = updates["expires"]
+
+        if "custom_fields" in updates and updates["custom_fields"]:
+            for key, value in updates["custom_fields"].items():
+                entry.set_custom_property(key, value)
+        entry.touch(modify=True)
+
+    def _collect_binaries(self) -> list[dict]:
+        """Drop binaries that no entry or history item references any more.
+
+        Runs after a mutation released references. Binary ids are pool
+        positions, so references above a removed binary are renumbered and
+        their entries re-read; the journal cannot express that and is
+        suspended until the next checkpoint. Returns change records for the
+        renumbered entries.
+        """
+        if not self._binaries_released:
+            return []
+        self._binaries_released = False
+        pool_size = file_handler.pool_size(self._kp)
+        if not pool_size:
+            return []
+        references = []
+        for binary in self._kp.tree.getroot().iter("Binary"):
+            value = binary.find("Value")
+            if binary.getparent().tag == "Entry" and value is not None and value.get("Ref", "").isdigit():
+                references.append(value)
+        used = {int(value.get("Ref")) for value in references}
+        unused = [binary_id for binary_id in range(pool_size) if binary_id not in used]
+        if not unused:
+            return []
+
+        file_handler.remove_binaries(self._kp, unused)
+        self._binaries.removed(unused)
+        renumbered = set()
+        for value in references:
+            old = int(value.get("Ref"))
+            new = old - bisect.bisect_left(unused, old)
+            if new != old:
+                value.set("Ref", str(new))
+                entry = value.getparent().getparent()
+                if entry.getparent().tag == "History":
+                    entry = entry.getparent().getparent()
+                renumbered.add(element_uuid(entry))
+        renumbered = [uid for uid in renumbered if uid in self._index.entries]
+        self._entries_changed(renumbered)
+        self._journal.suspend()
+        logger.info("Removed %d unreferenced binaries", len(unused))
+        return [self._entry_change("update", uid, ["attachments"]) for uid in renumbered]
+
+    def _discard_entry(self, entry: KPEntry) -> None:
+        """Move entry to the recycle bin if there is one, else delete it"""
+        recycle_bin = self._recycle_bin()
+        if recycle_bin:
+            self._kp.move_entry(entry, recycle_bin)
+        else:
+            if entry._element.find(".//Binary") is not None:
+                self._binaries_released = True
+            self._kp.delete_entry(entry)
+            self._index.remove_entry(entry)
+
+    def _recycle_bin(self) -> KPGroup | None:
+        meta = self._kp.tree.getroot().find("Meta")
+        if meta is None or meta.findtext("RecycleBinEnabled", "True") != "True":
+            return None
+        text = meta.findtext("RecycleBinUUID")
+        if not text:
+            return None
         try:
-            uid = uuid.UUID(entry_id)
-            entries = self._kp.find_entries(uuid=uid, first=True)
-            return entries
-        except (ValueError, Exception):
+            return self._index.get_group(uuid.UUID(bytes=base64.b64decode(text)))
+        except ValueError:
             return None
 
-    def _find_group_by_uuid(self, group_id: str) -> KPGroup | None:
-        try:
-            uid = uuid.UUID(group_id)
-            groups = self._kp.find_groups(uuid=uid, first=True)
-            return groups
-        except (ValueError, Exception):
+    def _group_records(self, group_id: str | None) -> Iterable[EntryRecord]:
+        """All records, or those directly in a group (none for an unknown group)"""
+        if not group_id:
+            return self._snapshot.entries.values()
+        group = self._find_group_by_uuid(group_id)
+        return self._snapshot.in_group(group._element) if group else []
+
+    def _search_records(self, query: str, limit: int | None) -> list[EntryRecord]:
+        records = self._snapshot.entries
+        if not query.strip():
+            return list(itertools.islice(records.values(), limit))
+        return [records[uid] for uid in self._search.search(query, limit)]
+
+    def _sorted_entries(self, group_id: str | None, key: str) -> list[tuple[str, str, EntryRecord]]:
+        """(sort value, id, entry) triples in ascending order, cached until the next mutation"""
+        group = None
+        if group_id:
+            group = self._find_group_by_uuid(group_id)
+            if not group:
+                return []
+        cache_key = (str(group.uuid) if group else None, key)
+        keyed = self._sorted_cache.get(cache_key)
+        cache_requests.inc(cache="sorted_entries", result="miss" if keyed is None else "hit")
+        if keyed is None:
+            records = self._snapshot.in_group(group._element) if group else self._snapshot.entries.values()
+            keyed = sorted(
+                ((projection.sort_value(r, key), r.id, r) for r in records),
+                key=lambda item: item[:2],
+            )
+            self._sorted_cache[cache_key] = keyed
+        return keyed
+
+    @_reading
+    def _audit_report(self, report: Callable[..., Any], *args: Any) -> Any:
+        self._ensure_open()
+        return report(*args)
+
+    @_reading
+    def _health_report(self) -> dict:
+        self._ensure_open()
+        now = utcnow()
+        expired = self._expiry.count_until(now)
+        soon = self._expiry.count_until(now + timedelta(days=config.EXPIRY_WARNING_DAYS))
+        return self._audit.health(expired=expired, expiring=soon - expired)
+
+    def _expiry_item(self, entry_id: uuid.UUID) -> dict:
+        return projection.project_entry(
+            self._snapshot.entries[entry_id], ("id", "title", "username", "group_id", "expiry_time")
+        )
+
+    @_reading
+    def _next_expiry(self) -> datetime | None:
+        """Next expiry time the scheduler has yet to announce"""
+        if not self.is_open or self._expiry_announced is None:
             return None
+        return self._expiry.next_after(self._expiry_announced)
+
+    @_writing
+    def _announce_expired(self, now: datetime) -> None:
+        """Publish an ``expire`` change for entries that expired since the last call"""
+        if not self.is_open or self._expiry_announced is None:
+            return
+        expired = self._expiry.between(self._expiry_announced, now)
+        self._expiry_announced = now
+        if expired:
+            self._publish([self._entry_change("expire", uid, ["expiry_time"]) for _, uid in expired])
+
+    def _score_in_background(self) -> None:
+        """Score pending passwords in a background thread, unless a run is under way"""
+        if not self._audit.scoring.locked():
+            threading.Thread(target=self._warm_audit, name="vaultix-audit", daemon=True).start()
+
+    def _warm_audit(self) -> None:
+        """Score pending passwords (of a freshly opened vault) in the background"""
+        try:
+            self.score_passwords()
+        except RuntimeError:
+            pass  # closed again before scoring started
+        except Exception:
+            logger.exception("Scoring passwords failed")
+
+    def _build_indexes(self) -> None:
+        self._index.build(self._kp)
+        self._snapshot.build(self._kp, self._index.entries.values())
+        records = self._snapshot.entries.values()
+        self._search.build(records)
+        self._groups.build(self._kp)
+        self._sorted_cache.clear()
+        self._entry_json.clear()
+        self._binaries.reset(self._kp)
+        recycle_bin = self._recycle_bin()
+        recycle_bin_id = recycle_bin.uuid if recycle_bin else None
+        self._audit.build(records, recycle_bin_id)
+        # Entries already expired at open time are listed, not announced
+        self._expiry.build(records, recycle_bin_id)
+        self._expiry_announced = utcnow()
+        self._expiry_scheduler.reschedule()
+        self._advance_revision(None)
 
-    def _entry_to_dict(self, entry: KPEntry) -> dict:
-        custom_fields = {}
-        for key, value in (entry.custom_properties or {}).items():
-            protected = key in (entry._element.findall('.//String[Key="{}"]'.format(key)) or [])
-            custom_fields[key] = {"value": value or "", "protected": False}
+    def _entries_changed(self, entry_ids: Iterable[uuid.UUID]) -> None:
+        """Re-read entries that were added, changed or removed into the
+        snapshot, then refresh the indexes built on it"""
+        self._sorted_cache.clear()
+        changes = self._snapshot.update((uid, self._index.entries.get(uid)) for uid in entry_ids)
+        self._entry_json.invalidate(uid for uid, _ in changes)
+        placements = []
+        for uid, record in changes:
+            if record is None:
+                self._search.remove(uid)
+                placements.append((uid, None))
+            else:
+                self._search.add(record)
+                placements.append((uid, record.group_uuid))
+        self._groups.sync_entries(placements)
+        self._audit.update(changes)
+        self._expiry.update(changes)
+        self._expiry_scheduler.reschedule()
+
+    def _publish(self, records: list[dict]) -> None:
+        """Append the records of an applied mutation to the change log"""
+        self._advance_revision(records)
 
-        attachments = []
-        for att in entry.attachments or []:
-            attachments.append({
-                "id": str(att.id),
-                "filename": att.filename,
-                "size": len(att.data) if att.data else 0,
-            })
+    def _advance_revision(self, records: list[dict] | None) -> None:
+        """Move to a new revision, and the change log with it.
 
+        Every revision change goes through here, so ``since(revision)``
+        always answers for the current revision. ``records`` are the
+        changes it brings, possibly none; None starts the log over, which
+        sends older cursors to a full resync (open, close).
+        """
+        self._revision = next(_revisions)
+        if records is None:
+            self._changes.reset(self._revision)
+        else:
+            self._changes.record(self._revision, records)
+
+    def _entry_change(self, op: str, entry_id: uuid.UUID, fields: Iterable[str] = ()) -> dict:
+        """Change record for an entry; an entry no longer in the tree is a delete"""
+        record = self._snapshot.get(entry_id)
         return {
-            "id": str(entry.uuid),
-            "title": entry.title or "",
-            "username": entry.username or "",
-            "password": entry.password or "",
-            "url": entry.url or "",
-            "notes": entry.notes or "",
-            "icon": entry.icon or 0,
-            "tags": list(entry.tags or []),
-            "group_id": str(entry.group.uuid) if entry.group else "",
-            "custom_fields": custom_fields,
-            "attachments": attachments,
-            "created": entry.ctime.isoformat() if entry.ctime else "",
-            "modified": entry.mtime.isoformat() if entry.mtime else "",
-            "expiry_time": entry.expiry_time.isoformat() if entry.expiry_time else None,
+            "op": op if record else "delete",
+            "type": "entry",
+            "id": str(entry_id),
+            "group_id": (record.group_id or None) if record else None,
+            "fields": sorted(fields) if record else [],
         }
 
-    def _group_to_dict(self, group: KPGroup) -> dict:
+    def _group_change(self, op: str, group_id: uuid.UUID, fields: Iterable[str] = ()) -> dict:
+        node = self._groups.node_dict(group_id)
+        return {
+            "op": op,
+            "type": "group",
+            "id": str(group_id),
+            "group_id": node["parent_id"] if node else None,
+            "fields": sorted(fields),
+        }
+
+    def _batch_change(self, op: dict[str, Any], entry_id: uuid.UUID) -> dict:
+        kind = op.get("op")
+        if kind == "update":
+            return self._entry_change("update", entry_id, _changed_fields(op.get("fields") or {}))
+        if kind in ("move", "delete"):
+            return self._entry_change("move", entry_id, ["group_id"])
+        return self._entry_change("create", entry_id)
+
+    def _write(self, path: str | None = None) -> None:
+        """Checkpoint right away; the caller holds the write lock"""
+        self._saver.run_exclusive(lambda: self._prepare_write(path))
+
+    def _prepare_write(self, path: str | None = None) -> Callable[[], None]:
+        """Checkpoint, under the lock: copy the vault, and return the step that
+        saves it atomically (to ``path``) and starts the next journal"""
+        self._ensure_open()
+        path = path or self._path
+        kp = self._kp
+        copy = self._journal.prepare_checkpoint(kp, path)
+
+        def write() -> None:
+            with kdbx_operation_duration.time(operation="save"):
+                self._journal.finish_checkpoint(copy, path, kp.password, kp.keyfile)
+
+        return write
+
+    def _journal_entries(self, entry_ids: Iterable[uuid.UUID]) -> None:
+        """Journal the current state of entries (deleted if no longer indexed)"""
+        ops = []
+        for uid in dict.fromkeys(entry_ids):
+            entry = self._index.entries.get(uid)
+            ops.append(entry_state(str(uid), entry._element if entry else None))
+        self._journal_write(ops)
+
+    def _journal_write(self, ops: list[dict]) -> None:
+        try:
+            with kdbx_operation_duration.time(operation="journal"):
+                self._journal.append(ops)
+        except OSError:
+            # The change is still applied in memory; save it the slow way
+            logger.exception("Appending to the journal failed, saving the vault instead")
+            self._saver.flush_soon()
+
+    def _mark_dirty(self) -> None:
+        self._saver.mark_dirty()
+        journal = self._journal
+        if journal.enabled and (not journal.active or journal.size >= config.JOURNAL_CHECKPOINT_BYTES):
+            # Nothing journals this change yet, or the journal is due for folding
+            self._saver.flush_soon()
+
+    def _ensure_open(self) -> None:
+        if not self._kp:
+            raise RuntimeError("No database open")
+
+    def _find_entry_by_uuid(self, entry_id: str) -> KPEntry | None:
+        entry = self._index.get_entry(entry_id)
+        kdbx_lookups.inc(kind="entry", result="hit" if entry else "miss")
+        return entry
+
+    def _find_record(self, entry_id: str) -> EntryRecord | None:
+        uid = parse_uuid(entry_id)
+        record = self._snapshot.get(uid) if uid else None
+        kdbx_lookups.inc(kind="entry", result="hit" if record else "miss")
+        return record
+
+    def _find_group_by_uuid(self, group_id: str) -> KPGroup | None:
+        group = self._index.get_group(group_id)
+        kdbx_lookups.inc(kind="group", result="hit" if group else "miss")
+        return group
+
+    def _entry_to_dict(self, record: EntryRecord) -> dict:
+        entry = self._entry_fields(record)
+        entry["password_reuse"] = self._audit.reuse(record.uuid)
+        return entry
+
+    def _entry_json_bytes(self, record: EntryRecord) -> bytes:
+        """The entry's listable fields (no secrets) serialized, from the cache"""
+        listed = self._entry_json.get(record)
+        if listed is None:
+            listed = dumps(projection.project_entry(record, projection.LIST_FIELDS))
+            self._entry_json.put(record, listed)
+        return listed
+
+    def _entry_fields(self, record: EntryRecord) -> dict:
+        """Everything of an entry's API dict that only changes when the entry does"""
         return {
-            "id": str(group.uuid),
-            "name": group.name or "",
-            "icon": group.icon or 0,
-            "parent_id": str(group.parentgroup.uuid) if group.parentgroup else None,
-            "children": [],
-            "entry_count": len(group.entries or []),
+            "id": record.id,
+            "title": record.title,
+            "username": record.username,
+            "password": record.password,
+            "url": record.url,
+            "notes": record.notes,
+            "icon": record.icon,
+            "tags": list(record.tags),
+            "group_id": record.group_id,
+            "custom_fields": {
+                key: {"value": value, "protected": protected}
+                for key, value, protected in record.custom_fields
+            },
+            "attachments": [
+                self._binaries.describe(position, binary_id, filename)
+                for position, (binary_id, filename) in enumerate(record.attachments)
+            ],
+            "created": record.created.isoformat() if record.created else "",
+            "modified": record.modified.isoformat() if record.modified else "",
+            "expiry_time": record.expiry_time.isoformat() if record.expiry_time else None,
         }
 
-    def _build_group_tree(self, group: KPGroup) -> list[dict]:
-        """Recursively build group tree from root's direct children"""
-        result = []
-        for child in group.subgroups or []:
-            item = self._group_to_dict(child)
-            item["children"] = self._build_group_tree(child)
-            result.append(item)
-        return result
+
+def _restore_element(element: _Element, backup: _Element) -> None:
+    """Give ``element`` the attributes, text and children of ``backup``"""
+    element.attrib.clear()
+    element.attrib.update(backup.attrib)
+    element.text = backup.text
+    element[:] = list(backup)
+
+
+def _unlock(path: str, password: str, keyfile: str | None) -> tuple[PyKeePass, float]:
+    """Open a vault in two timed steps: key derivation, then decryption and XML parsing.
+
+    The file is read once; the first pass parses only the header and runs
+    the KDF, the second reuses the derived key. Returns the vault and the
+    seconds the KDF took.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    started = time.perf_counter()
+    with kdbx_operation_duration.time(operation="kdf"):
+        header = PyKeePass(io.BytesIO(data), password=password, keyfile=keyfile, decrypt=False)
+    kdf_seconds = round(time.perf_counter() - started, 3)
+    with kdbx_operation_duration.time(operation="decrypt"):
+        kp = PyKeePass(
+            io.BytesIO(data), password=password, keyfile=keyfile, transformed_key=header.transformed_key
+        )
+    kp.filename = path
+    return kp, kdf_seconds
+
+
+def _blank_database(path: str, password: str, keyfile: str | None = None) -> PyKeePass:
+    """pykeepass's empty template database, to be saved under ``path``"""
+    kp = PyKeePass(BLANK_DATABASE_LOCATION, BLANK_DATABASE_PASSWORD, transformed_key=_blank_key())
+    kp.filename = path
+    kp.password = password
+    kp.keyfile = keyfile
+    return kp
+
+
+@functools.lru_cache(maxsize=1)
+def _blank_key() -> bytes:
+    # The template's own KDF (pykeepass defaults) runs once per process
+    return PyKeePass(BLANK_DATABASE_LOCATION, BLANK_DATABASE_PASSWORD, decrypt=False).transformed_key
+
+
+def _changed_fields(updates: dict[str, Any]) -> list[str]:
+    """Names of the fields an update sets (custom fields by key, never values)"""
+    fields = [k for k, v in updates.items() if v is not None and k != "custom_fields"]
+    fields += [f"custom_fields.{key}" for key in updates.get("custom_fields") or {}]
+    return fields
+
+
+def _sort_key(item: tuple[str, str, EntryRecord]) -> tuple[str, str]:
+    return item[0], item[1]
+
+
+def _sort_position(position: Any) -> tuple[str, str]:
+    """A decoded listing cursor as a (sort value, id) key"""
+    if not (isinstance(position, list) and len(position) == 2 and all(isinstance(v, str) for v in position)):
+        raise ValueError("Invalid cursor")
+    return position[0], position[1]
+
+
+def _attachment_position(attachment_id: str) -> int | None:
+    """An attachment id is its position in the entry's list; pool ids are
+    shared by every attachment with the same content"""
+    return int(attachment_id) if attachment_id.isdigit() else None
 
 
 # Singleton instance
@@ -0,0 +1,95 @@
+"""Secret-free entry projections and cursors for paginated listings"""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any
+
+from backend.core.kdbx.snapshot import EntryRecord
+
+# Fields a listing may return. Passwords, notes and custom field values can
+# hold secrets and are only ever returned by get_entry().
+LIST_FIELDS = (
+    "id",
+    "title",
+    "username",
+    "url",
+    "icon",
+    "tags",
+    "group_id",
+    "created",
+    "modified",
+    "expiry_time",
+)
+SUMMARY_FIELDS = ("id", "title", "username", "url", "icon", "modified")
+
+SORT_KEYS = ("title", "username", "url", "created", "modified")
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Held as datetimes on the record, listed and sorted as ISO strings
+_TIME_FIELDS = ("created", "modified", "expiry_time")
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...]:
+    """Parse a ``fields=`` parameter; ``summary`` (or nothing) is the list view set"""
+    if not fields or fields == "summary":
+        return SUMMARY_FIELDS
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown or non-listable fields: {', '.join(unknown)}")
+    return requested if "id" in requested else ("id",) + requested
+
+
+def parse_sort(sort: str | None) -> tuple[str, bool]:
+    """Parse ``title`` / ``-modified`` into (key, descending)"""
+    sort = sort or "title"
+    descending = sort.startswith("-")
+    key = sort.lstrip("-")
+    if key not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {key}")
+    return key, descending
+
+
+def clamp_limit(limit: int | None) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(position: Any) -> str:
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def project_entry(record: EntryRecord, fields: tuple[str, ...]) -> dict:
+    """Build the requested listing fields from a snapshot record"""
+    values: dict[str, Any] = {}
+    for field in fields:
+        if field in _TIME_FIELDS:
+            stamp = getattr(record, field)
+            values[field] = stamp.isoformat() if stamp else (None if field == "expiry_time" else "")
+        elif field == "tags":
+            values[field] = [t for t in record.tags if t]
+        else:
+            values[field] = getattr(record, field)
+    return values
+
+
+def sort_value(record: EntryRecord, key: str) -> str:
+    """Sortable string for an entry; timestamps sort as ISO strings"""
+    if key in _TIME_FIELDS:
+        stamp = getattr(record, key)
+        return stamp.isoformat() if stamp else ""
+    return getattr(record, key).casefold()
@@ -0,0 +1,81 @@
+"""Listable entry JSON cached per entry, and assembly of list responses from it"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Iterable
+
+import orjson
+
+from backend.app import config
+from backend.core.kdbx.snapshot import EntryRecord
+from backend.core.metrics import cache_requests
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value)
+
+
+def json_array(items: Iterable[bytes]) -> bytes:
+    """A JSON array of already serialized values"""
+    return b"[" + b",".join(items) + b"]"
+
+
+class EntryJsonCache:
+    """Serialized secret-free entry listings by UUID and modification time (LRU-bounded).
+
+    Moves do not touch the modification time, so the database also drops
+    an entry here on every mutation of it.
+    """
+
+    def __init__(self, capacity: int = config.ENTRY_JSON_CACHE_SIZE):
+        self.capacity = max(0, capacity)
+        self._fragments: OrderedDict[uuid.UUID, tuple[datetime | None, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, record: EntryRecord) -> bytes | None:
+        with self._lock:
+            cached = self._fragments.get(record.uuid)
+            if cached is not None and cached[0] == record.modified:
+                self._fragments.move_to_end(record.uuid)
+                fragment = cached[1]
+            else:
+                fragment = None
+        cache_requests.inc(cache="entry_json", result="miss" if fragment is None else "hit")
+        return fragment
+
+    def put(self, record: EntryRecord, fragment: bytes) -> None:
+        if not self.capacity:
+            return
+        with self._lock:
+            old = self._fragments.pop(record.uuid, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._fragments[record.uuid] = (record.modified, fragment)
+            self._bytes += len(fragment)
+            while len(self._fragments) > self.capacity:
+                _, (_, dropped) = self._fragments.popitem(last=False)
+                self._bytes -= len(dropped)
+
+    def invalidate(self, entry_ids: Iterable[uuid.UUID]) -> None:
+        with self._lock:
+            for entry_id in entry_ids:
+                old = self._fragments.pop(entry_id, None)
+                if old is not None:
+                    self._bytes -= len(old[1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+            self._bytes = 0
@@ -0,0 +1,280 @@
+"""Several open vaults per process, with LRU / idle-timeout eviction"""
+
+from __future__ import annotations
+
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from backend.app import config
+from backend.core.kdbx.parser import KdbxDatabase, db
+from backend.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION = "default"
+
+
+class VaultSession:
+    """One KdbxDatabase plus the bookkeeping the manager evicts by"""
+
+    def __init__(self, session_id: str, database: KdbxDatabase):
+        self.session_id = session_id
+        self.db = database
+        self.opened_at: datetime | None = None
+        self.last_used = time.monotonic()
+        self.requests = 0
+        self.memory = 0
+        self.evicted: str | None = None
+
+    def touch(self) -> None:
+        self.last_used = time.monotonic()
+        self.requests += 1
+
+    def stats(self) -> dict:
+        status = self.db.save_status()
+        return {
+            "session_id": self.session_id,
+            "path": self.db.path,
+            "is_open": self.db.is_open,
+            "opened_at": self.opened_at.isoformat() if self.opened_at else None,
+            "idle_seconds": round(time.monotonic() - self.last_used, 1),
+            "requests": self.requests,
+            "memory_bytes": self.memory,
+            "dirty": status["dirty"],
+            "last_saved": status["last_saved"],
+            "evicted": self.evicted,
+        }
+
+
+class SessionManager:
+    """Keeps up to ``max_sessions`` vaults decrypted at once.
+
+    Sessions are kept in LRU order. A vault is closed (pending changes are
+    flushed first, then the tree, indexes and credentials are dropped) when
+    it has been idle for ``idle_timeout`` seconds, when opening another
+    vault would exceed ``max_sessions``, or while the estimated memory of
+    all open vaults is above ``memory_budget``; an ``idle_timeout`` of 0
+    disables idle eviction. The session id survives eviction, so the
+    client sees "no database open" and can reopen it.
+
+    The ``default`` session wraps the module-level ``db`` and is used by
+    requests that do not name a session.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = config.MAX_SESSIONS,
+        idle_timeout: float = config.SESSION_IDLE_TIMEOUT,
+        memory_budget: int = int(config.SESSION_MEMORY_BUDGET_MB * 1024 * 1024),
+    ):
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = idle_timeout
+        self.memory_budget = memory_budget
+        self._sessions: OrderedDict[str, VaultSession] = OrderedDict()
+        self._sessions[DEFAULT_SESSION] = VaultSession(DEFAULT_SESSION, db)
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._reaper: threading.Thread | None = None
+
+    def get(self, session_id: str | None) -> VaultSession | None:
+        """Look up a session and mark it as used"""
+        with self._lock:
+            session = self._sessions.get(session_id or DEFAULT_SESSION)
+            if session is not None:
+                session.touch()
+                self._sessions.move_to_end(session.session_id)
+            return session
+
+    def open(
+        self, session_id: str | None, path: str, password: str, keyfile: str | None = None
+    ) -> tuple[str, dict]:
+        """Open a vault into a session, creating the session if needed"""
+        session = self._session_for(session_id)
+        try:
+            info = session.db.open(path, password, keyfile)
+        except BaseException:
+            self._discard_closed(session)
+            raise
+        self._opened(session)
+        return session.session_id, info
+
+    def create(
+        self,
+        session_id: str | None,
+        path: str,
+        password: str,
+        name: str,
+        kdf_settings: dict | None = None,
+    ) -> tuple[str, dict]:
+        """Create a vault into a session, creating the session if needed"""
+        session = self._session_for(session_id)
+        try:
+            info = session.db.create(path, password, name, kdf_settings)
+        except BaseException:
+            self._discard_closed(session)
+            raise
+        self._opened(session)
+        return session.session_id, info
+
+    def close(self, session_id: str | None) -> bool:
+        """Close a session's vault and forget the session"""
+        session_id = session_id or DEFAULT_SESSION
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return False
+            if session_id != DEFAULT_SESSION:
+                del self._sessions[session_id]
+        session.db.close()
+        session.memory = 0
+        return True
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._reaper = None
+            self._cond.notify_all()
+        for session in sessions:
+            try:
+                session.db.close()
+            except Exception:
+                logger.exception("Closing session %s failed", session.session_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            if session.db.is_open:
+                session.memory = session.db.memory_estimate()
+        return {
+            "max_sessions": self.max_sessions,
+            "idle_timeout": self.idle_timeout,
+            "memory_budget": self.memory_budget,
+            "memory_used": sum(s.memory for s in sessions if s.db.is_open),
+            "sessions": [s.stats() for s in sessions],
+        }
+
+    def open_count(self) -> int:
+        """Number of sessions with a decrypted vault"""
+        with self._lock:
+            return sum(1 for s in self._sessions.values() if s.db.is_open)
+
+    def configure(
+        self,
+        max_sessions: int | None = None,
+        idle_timeout: float | None = None,
+        memory_budget_mb: float | None = None,
+    ) -> dict:
+        with self._lock:
+            if max_sessions is not None:
+                self.max_sessions = max(1, max_sessions)
+            if idle_timeout is not None:
+                self.idle_timeout = max(0.0, idle_timeout)
+            if memory_budget_mb is not None:
+                self.memory_budget = int(max(0.0, memory_budget_mb) * 1024 * 1024)
+            self._cond.notify_all()
+        self._enforce_limits(keep=None)
+        return self.stats()
+
+    def evict_idle(self) -> list[str]:
+        """Close every open session that has been idle past the timeout"""
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                s for s in self._sessions.values()
+                if s.db.is_open and self.idle_timeout and now - s.last_used >= self.idle_timeout
+            ]
+        for session in idle:
+            self._evict(session, "idle")
+        return [s.session_id for s in idle]
+
+    # ==========================================
+    # Internals
+    # ==========================================
+
+    def _session_for(self, session_id: str | None) -> VaultSession:
+        with self._lock:
+            session_id = session_id or DEFAULT_SESSION
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = VaultSession(session_id, KdbxDatabase())
+                self._sessions[session_id] = session
+            session.touch()
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def _discard_closed(self, session: VaultSession) -> None:
+        """Forget a session whose open or create failed and left no vault open"""
+        with self._lock:
+            if (
+                session.session_id != DEFAULT_SESSION
+                and not session.db.is_open
+                and self._sessions.get(session.session_id) is session
+            ):
+                del self._sessions[session.session_id]
+
+    def _opened(self, session: VaultSession) -> None:
+        session.opened_at = datetime.now()
+        session.evicted = None
+        session.memory = session.db.memory_estimate()
+        self._enforce_limits(keep=session)
+        self._ensure_reaper()
+
+    def _enforce_limits(self, keep: VaultSession | None) -> None:
+        """Evict least recently used vaults until count and memory fit"""
+        while True:
+            with self._lock:
+                open_sessions = [s for s in self._sessions.values() if s.db.is_open]
+                used = sum(s.memory for s in open_sessions)
+                over = len(open_sessions) > self.max_sessions or used > self.memory_budget
+                victims = [s for s in open_sessions if s is not keep]
+                if not over or not victims:
+                    return
+                victim = victims[0]
+            if not self._evict(victim, "memory" if used > self.memory_budget else "lru"):
+                return
+
+    def _evict(self, session: VaultSession, reason: str) -> bool:
+        logger.info("Closing vault session %s (%s)", session.session_id, reason)
+        try:
+            session.db.close()
+        except Exception:
+            # The pending changes could not be written; keep the vault open
+            # rather than losing them.
+            logger.exception("Evicting session %s failed", session.session_id)
+            return False
+        session.memory = 0
+        session.evicted = reason
+        return True
+
+    def _ensure_reaper(self) -> None:
+        with self._lock:
+            if self._reaper is None or not self._reaper.is_alive():
+                self._reaper = threading.Thread(
+                    target=self._reap, name="vaultix-session-reaper", daemon=True
+                )
+                self._reaper.start()
+
+    def _reap(self) -> None:
+        me = threading.current_thread()
+        while True:
+            with self._lock:
+                if self._reaper is not me:
+                    return
+                interval = min(max(self.idle_timeout / 4, 1.0), 30.0) if self.idle_timeout else 30.0
+                self._cond.wait(interval)
+                if self._reaper is not me:
+                    return
+            self.evict_idle()
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(12)
+
+
+sessions = SessionManager()
+registry.gauge("vaultix_open_sessions", "Vault sessions with a decrypted database", sessions.open_count)
@@ -0,0 +1,267 @@
+"""Read-optimized copy of the entries of an open vault.
+
+Every pykeepass property access is an XPath query against the lxml tree,
+so reading a full entry through the wrappers costs a dozen or more queries.
+The snapshot decodes each entry element once, on open and after every
+mutation that touches it, into a slotted record. Listing, search and the
+audit read the records; the tree stays the source of truth for writes and
+for saving.
+"""
+
+from __future__ import annotations
+
+import binascii
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable
+
+from lxml.etree import _Element
+from pykeepass import PyKeePass
+from pykeepass.entry import Entry as KPEntry
+from pykeepass.entry import reserved_keys
+
+from backend.core.kdbx.index import element_uuid
+
+_RESERVED_KEYS = frozenset(reserved_keys)
+_STRING_FIELDS = {"Title": "title", "UserName": "username", "Password": "password",
+                  "URL": "url", "Notes": "notes"}
+_NO_GROUP = (None, "", ())
+_KDBX4_EPOCH = datetime(1, 1, 1, tzinfo=timezone.utc)
+
+
+class EntryRecord:
+    """One entry as plain Python values.
+
+    Records are replaced, never modified, so a reader holding one sees a
+    consistent entry. Values that repeat across entries (usernames, URLs,
+    icons, tags, custom field names, group ids and paths) are interned or
+    shared between records; passwords and notes are not.
+    """
+
+    __slots__ = (
+        "uuid", "id", "title", "username", "password", "url", "notes", "icon", "tags",
+        "group_uuid", "group_id", "group_path", "custom_fields", "attachments",
+        "created", "modified", "expires", "expiry_time",
+    )
+
+    def __init__(
+        self, uuid, id, title, username, password, url, notes, icon, tags,
+        group_uuid, group_id, group_path, custom_fields, attachments,
+        created, modified, expires, expiry_time,
+    ):
+        self.uuid = uuid
+        self.id = id
+        self.title = title
+        self.username = username
+        self.password = password
+        self.url = url
+        self.notes = notes
+        self.icon = icon
+        self.tags = tags
+        self.group_uuid = group_uuid
+        self.group_id = group_id
+        self.group_path = group_path
+        self.custom_fields = custom_fields
+        self.attachments = attachments
+        self.created = created
+        self.modified = modified
+        self.expires = expires
+        self.expiry_time = expiry_time
+
+    def __repr__(self) -> str:
+        return f"<EntryRecord {self.id} {self.title!r}>"
+
+
+class VaultSnapshot:
+    """Entry records by UUID, in tree order as of the last full build.
+
+    Not thread-safe; it is updated under the database's write lock and read
+    under its read lock, like the other indexes.
+    """
+
+    def __init__(self):
+        self.entries: dict[uuid.UUID, EntryRecord] = {}
+        self._decode_time: Callable[[str], datetime] | None = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self._decode_time = None
+
+    def get(self, entry_id: uuid.UUID) -> EntryRecord | None:
+        return self.entries.get(entry_id)
+
+    def build(self, kp: PyKeePass, entries: Iterable[KPEntry]) -> None:
+        self.clear()
+        self._decode_time = time_decoder(kp)
+        groups: dict[_Element, tuple] = {}
+        for entry in entries:
+            record = entry_record(entry, self._decode_time, groups)
+            self.entries[record.uuid] = record
+
+    def update(
+        self, changes: Iterable[tuple[uuid.UUID, KPEntry | None]]
+    ) -> list[tuple[uuid.UUID, EntryRecord | None]]:
+        """Re-read entries that were added, changed, moved or removed (None).
+
+        Returns the new records, for updating the indexes built on them.
+        """
+        groups: dict[_Element, tuple] = {}
+        records = []
+        for entry_id, entry in changes:
+            if entry is None:
+                self.entries.pop(entry_id, None)
+                records.append((entry_id, None))
+            else:
+                record = entry_record(entry, self._decode_time, groups)
+                self.entries[entry_id] = record
+                records.append((entry_id, record))
+        return records
+
+    def in_group(self, group: _Element) -> list[EntryRecord]:
+        """Records of the entries directly inside a group element, in tree order"""
+        return [
+            record
+            for child in group.iterchildren("Entry")
+            if (uid := element_uuid(child)) is not None and (record := self.entries.get(uid)) is not None
+        ]
+
+
+def entry_record(
+    entry: KPEntry,
+    decode_time: Callable[[str], datetime] | None = None,
+    groups: dict[_Element, tuple] | None = None,
+) -> EntryRecord:
+    """Decode an entry element in a single pass over its children.
+
+    ``groups`` caches the (uuid, id, path) of parent groups across calls,
+    so entries of one group share those values.
+    """
+    element = entry._element
+    decode_time = decode_time or time_decoder(entry._kp)
+    strings = dict.fromkeys(_STRING_FIELDS.values(), "")
+    custom_fields = []
+    attachments = []
+    uid = None
+    icon = 0
+    tags: tuple[str, ...] = ()
+    created = modified = expiry_time = None
+    expires = False
+
+    for child in element:
+        tag = child.tag
+        if tag == "String":
+            key = value = None
+            for part in child:
+                if part.tag == "Key":
+                    key = part.text
+                elif part.tag == "Value":
+                    value = part
+            text = (value.text if value is not None else None) or ""
+            field = _STRING_FIELDS.get(key)
+            if field:
+                strings[field] = text
+            elif key is not None and key not in _RESERVED_KEYS:
+                protected = value is not None and value.get("Protected") == "True"
+                custom_fields.append((sys.intern(key), text, protected))
+        elif tag == "UUID" and child.text:
+            uid = uuid.UUID(bytes=binascii.a2b_base64(child.text))
+        elif tag == "IconID":
+            icon = sys.intern(child.text) if child.text else 0
+        elif tag == "Tags":
+            if child.text:
+                tags = tuple(sys.intern(t) for t in child.text.replace(",", ";").split(";"))
+        elif tag == "Times":
+            for time in child:
+                if time.tag == "CreationTime" and time.text:
+                    created = decode_time(time.text)
+                elif time.tag == "LastModificationTime" and time.text:
+                    modified = decode_time(time.text)
+                elif time.tag == "ExpiryTime" and time.text:
+                    expiry_time = decode_time(time.text)
+                elif time.tag == "Expires":
+                    expires = time.text == "True"
+        elif tag == "Binary":
+            key = ref = None
+            for part in child:
+                if part.tag == "Key":
+                    key = part.text
+                elif part.tag == "Value":
+                    ref = part.get("Ref")
+            if ref is not None:
+                attachments.append((int(ref), key or ""))
+
+    group_uuid, group_id, group_path = _group_of(element.getparent(), groups)
+    return EntryRecord(
+        uuid=uid,
+        id=str(uid),
+        title=strings["title"],
+        username=sys.intern(strings["username"]),
+        password=strings["password"],
+        url=sys.intern(strings["url"]),
+        notes=strings["notes"],
+        icon=icon,
+        tags=tags,
+        group_uuid=group_uuid,
+        group_id=group_id,
+        group_path=group_path,
+        custom_fields=tuple(custom_fields),
+        attachments=tuple(attachments),
+        created=created,
+        modified=modified,
+        expires=expires,
+        expiry_time=expiry_time,
+    )
+
+
+def time_decoder(kp: PyKeePass) -> Callable[[str], datetime]:
+    """``kp._decode_time`` without its per-call header lookup of the version"""
+    if kp.version < (4, 0):
+        return kp._decode_time
+
+    def decode(text: str) -> datetime:
+        try:
+            seconds = int.from_bytes(binascii.a2b_base64(text), "little")
+        except binascii.Error:
+            return kp._decode_time(text)
+        return _KDBX4_EPOCH + timedelta(seconds=seconds)
+
+    return decode
+
+
+def record_expiry(record: EntryRecord) -> datetime | None:
+    """Expiry time of an entry, or None if it does not expire"""
+    return record.expiry_time if record.expires else None
+
+
+def _group_of(parent: _Element | None, groups: dict[_Element, tuple] | None) -> tuple:
+    """(uuid, id string, path of names below the root) of an entry's group"""
+    if parent is None or parent.tag != "Group":
+        return _NO_GROUP
+    if groups is not None and parent in groups:
+        return groups[parent]
+    group_uuid = element_uuid(parent)
+    names = []
+    group = parent
+    while True:
+        above = group.getparent()
+        if above is None or above.tag != "Group":
+            break
+        names.append(sys.intern(_child_text(group, "Name")))
+        group = above
+    names.reverse()
+    info = (group_uuid, sys.intern(str(group_uuid)) if group_uuid else "", tuple(names))
+    if groups is not None:
+        groups[parent] = info
+    return info
+
+
+def _child_text(element: _Element, tag: str) -> str:
+    # Lazily: find() scans every child, slow on groups with many entries
+    for child in element:
+        if child.tag == tag:
+            return child.text or ""
+    return ""
@@ -0,0 +1,176 @@
+"""Materialized group tree with direct and recursive entry counts"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Iterable
+
+from lxml.etree import _Element
+from pykeepass import PyKeePass
+
+from backend.core.kdbx.index import element_uuid
+from backend.core.metrics import cache_requests
+
+
+class _GroupNode:
+    def __init__(self, uid: uuid.UUID, name: str, icon: str | int, parent: _GroupNode | None):
+        self.uid = uid
+        self.name = name
+        self.icon = icon
+        self.parent = parent
+        self.children: list[_GroupNode] = []
+        self.entries = 0
+        self.total = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "id": str(self.uid),
+            "name": self.name,
+            "icon": self.icon,
+            "parent_id": str(self.parent.uid) if self.parent else None,
+            "children": [],
+            "entry_count": self.entries,
+            "total_entry_count": self.total,
+        }
+
+
+class GroupTree:
+    """The group hierarchy and its entry counts, kept in sync incrementally.
+
+    Built with one walk over the tree at open time. Entry mutations report
+    the entries they touched to ``sync_entries``, which moves counts
+    between groups by comparing each entry's current group with the one it
+    was counted in; group mutations call ``add_group``/``rename``/
+    ``remove_group``. ``render`` returns the nested listing and caches it
+    until the next change, so callers must treat it as read-only.
+    """
+
+    def __init__(self):
+        self._nodes: dict[uuid.UUID, _GroupNode] = {}
+        self._root: _GroupNode | None = None
+        self._membership: dict[uuid.UUID, uuid.UUID] = {}
+        self._rendered: list[dict] | None = None
+
+    def clear(self) -> None:
+        self._nodes.clear()
+        self._root = None
+        self._membership.clear()
+        self._rendered = None
+
+    def build(self, kp: PyKeePass) -> None:
+        self.clear()
+        root = kp.tree.getroot().find("Root")
+        if root is None:
+            return
+        order: list[_GroupNode] = []
+        for element in root.iter("Group"):
+            uid = element_uuid(element)
+            if uid is None:
+                continue
+            parent = element.getparent()
+            parent_node = self._nodes.get(element_uuid(parent)) if parent.tag == "Group" else None
+            node = self._new_node(uid, element, parent_node)
+            for entry in element.iterchildren("Entry"):
+                entry_uid = element_uuid(entry)
+                if entry_uid is not None:
+                    self._membership[entry_uid] = uid
+                    node.entries += 1
+            order.append(node)
+        # Pre-order walk reversed: children are summed before their parents
+        for node in reversed(order):
+            node.total += node.entries
+            if node.parent is not None:
+                node.parent.total += node.total
+
+    def render(self) -> list[dict]:
+        """Nested group listing below the root group (cached)"""
+        cache_requests.inc(cache="group_tree", result="miss" if self._rendered is None else "hit")
+        if self._rendered is None:
+            self._rendered = self._render_children(self._root) if self._root else []
+        return self._rendered
+
+    def node_dict(self, group_id: uuid.UUID) -> dict | None:
+        node = self._nodes.get(group_id)
+        return node.to_dict() if node else None
+
+    def add_group(self, element: _Element) -> None:
+        """Add a new (empty) group below its parent"""
+        uid = element_uuid(element)
+        parent = self._nodes.get(element_uuid(element.getparent()))
+        if uid is None or uid in self._nodes:
+            return
+        self._new_node(uid, element, parent)
+        self._rendered = None
+
+    def rename(self, group_id: uuid.UUID, name: str) -> None:
+        node = self._nodes.get(group_id)
+        if node is not None:
+            node.name = name
+            self._rendered = None
+
+    def remove_group(self, group_id: uuid.UUID) -> None:
+        """Drop a group and its subgroups.
+
+        Its entries must already have been removed through ``sync_entries``.
+        """
+        node = self._nodes.get(group_id)
+        if node is None:
+            return
+        self._add_to_total(node.parent, -node.total)
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self._nodes.pop(current.uid, None)
+            stack.extend(current.children)
+        self._rendered = None
+
+    def sync_entries(self, placements: Iterable[tuple[uuid.UUID, uuid.UUID | None]]) -> None:
+        """Update counts for (entry id, current group id or None if deleted) pairs"""
+        for entry_id, group_id in placements:
+            previous = self._membership.get(entry_id)
+            if previous == group_id:
+                continue
+            old = self._nodes.get(previous) if previous else None
+            new = self._nodes.get(group_id) if group_id else None
+            if old is not None:
+                old.entries -= 1
+                self._add_to_total(old, -1)
+            if new is not None:
+                new.entries += 1
+                self._add_to_total(new, 1)
+                self._membership[entry_id] = group_id
+            else:
+                self._membership.pop(entry_id, None)
+            self._rendered = None
+
+    def _new_node(self, uid: uuid.UUID, element: _Element, parent: _GroupNode | None) -> _GroupNode:
+        icon = _child_text(element, "IconID") or 0
+        node = _GroupNode(uid, _child_text(element, "Name"), icon, parent)
+        self._nodes[uid] = node
+        if parent is None:
+            if self._root is None:
+                self._root = node
+        else:
+            parent.children.append(node)
+        return node
+
+    def _add_to_total(self, node: _GroupNode | None, delta: int) -> None:
+        while node is not None:
+            node.total += delta
+            node = node.parent
+
+    def _render_children(self, node: _GroupNode) -> list[dict]:
+        result = []
+        for child in node.children:
+            item = child.to_dict()
+            item["children"] = self._render_children(child)
+            result.append(item)
+        return result
+
+
+def _child_text(element: _Element, tag: str) -> str:
+    for child in element.iterchildren(tag):
+        return child.text or ""
+    return ""
@@ -0,0 +1,246 @@
+"""Write-behind saving: coalesce many mutations into one KDBX save"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable
+
+from backend.core.kdbx.locking import RWLock
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindSaver:
+    """Tracks unsaved changes and flushes them from a background thread.
+
+    ``prepare`` copies what is to be saved and returns the step that
+    writes it. ``lock`` is the database reader/writer lock: mutations call
+    ``mark_dirty`` while holding the write lock, and ``prepare`` runs under
+    a background read lock, so a save never observes a half-applied
+    mutation and the dirty state is cleared only for the changes that were
+    actually copied. The write runs without the lock; reads and mutations
+    go on meanwhile. Saves never overlap.
+
+    With ``enabled=False`` every ``mark_dirty`` flushes synchronously, which
+    is the old save-on-every-mutation behaviour.
+    """
+
+    def __init__(
+        self,
+        prepare: Callable[[], Callable[[], None]],
+        lock: RWLock,
+        enabled: bool = True,
+        debounce: float = 2.0,
+        max_dirty_age: float = 10.0,
+    ):
+        self._prepare = prepare
+        self._lock = lock
+        self._save_mutex = threading.Lock()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+        self.enabled = enabled
+        self.debounce = debounce
+        self.max_dirty_age = max_dirty_age
+
+        self._generation = 0
+        self._saved_generation = 0
+        self._dirty_since: float | None = None
+        self._dirty_since_wall: datetime | None = None
+        self._last_change: float | None = None
+        self._retry_at = 0.0
+        self._urgent = False
+        self._last_saved: datetime | None = None
+        self._last_error: str | None = None
+
+    @property
+    def dirty(self) -> bool:
+        return self._generation != self._saved_generation
+
+    @property
+    def pending_changes(self) -> int:
+        return self._generation - self._saved_generation
+
+    def configure(
+        self,
+        enabled: bool | None = None,
+        debounce: float | None = None,
+        max_dirty_age: float | None = None,
+    ) -> None:
+        with self._cond:
+            if enabled is not None:
+                self.enabled = enabled
+            if debounce is not None:
+                self.debounce = max(0.0, debounce)
+            if max_dirty_age is not None:
+                self.max_dirty_age = max(0.0, max_dirty_age)
+            self._cond.notify()
+        if enabled is False:
+            self.flush()
+
+    def mark_dirty(self) -> None:
+        """Record one mutation. Caller must hold the database write lock."""
+        with self._cond:
+            now = time.monotonic()
+            if not self.dirty:
+                self._dirty_since = now
+                self._dirty_since_wall = datetime.now()
+            self._generation += 1
+            self._last_change = now
+            enabled = self.enabled
+            if enabled:
+                self._ensure_thread()
+                self._cond.notify()
+        if not enabled:
+            self.flush()
+
+    def flush_soon(self) -> None:
+        """Have the flusher save the pending changes without waiting for the debounce"""
+        with self._cond:
+            self._urgent = True
+            if self.enabled and self.dirty:
+                self._ensure_thread()
+                self._cond.notify()
+
+    def flush(self, force: bool = False) -> bool:
+        """Save now if there are unsaved changes (or always, with ``force``).
+
+        Returns True if a save was performed. Save errors propagate to the
+        caller and leave the changes marked dirty.
+        """
+        # Read lock first, then the mutex: a writer flushing synchronously
+        # already holds the lock and must not wait on a queued flusher. A
+        # save that holds the mutex without the lock is being written; wait
+        # for it outside the lock, so mutations are not held up meanwhile.
+        urgent = False
+        while True:
+            with self._lock.read(background=True):
+                if self._save_mutex.acquire(blocking=False):
+                    try:
+                        generation = self._generation
+                        if not force and generation == self._saved_generation:
+                            self._save_mutex.release()
+                            return False
+                        with self._cond:
+                            urgent, self._urgent = self._urgent, False
+                        started, started_wall = time.monotonic(), datetime.now()
+                        write = self._prepare()
+                    except BaseException as e:
+                        self._failed(e, urgent)
+                        self._save_mutex.release()
+                        raise
+                    break
+            with self._save_mutex:
+                pass
+        try:
+            write()
+        except BaseException as e:
+            self._failed(e, urgent)
+            raise
+        finally:
+            self._save_mutex.release()
+        with self._cond:
+            self._saved_generation = generation
+            if self.dirty:
+                # Changed while being written: the rest is as old as the copy
+                self._dirty_since, self._dirty_since_wall = started, started_wall
+            else:
+                self._dirty_since = None
+                self._dirty_since_wall = None
+            self._last_saved = datetime.now()
+            self._last_error = None
+            self._retry_at = 0.0
+        return True
+
+    def run_exclusive(self, prepare: Callable[[], Callable[[], None]]) -> None:
+        """Save outside the schedule, never at the same time as a flush.
+
+        For saves under the database write lock that do not clear the dirty
+        state, such as writing the vault to a new path.
+        """
+        with self._save_mutex:
+            prepare()()
+
+    def _failed(self, error: BaseException, urgent: bool) -> None:
+        with self._cond:
+            self._last_error = str(error)
+            self._retry_at = time.monotonic() + max(self.debounce, 1.0)
+            self._urgent = self._urgent or urgent
+
+    def reset(self) -> None:
+        """Forget all pending changes without saving (database closed/reopened)"""
+        with self._cond:
+            self._saved_generation = self._generation
+            self._dirty_since = None
+            self._dirty_since_wall = None
+            self._last_change = None
+            self._retry_at = 0.0
+            self._urgent = False
+            self._last_error = None
+
+    def stop(self) -> None:
+        """Stop the background flusher; it restarts on the next mutation.
+
+        Does not join: the flusher may be waiting for the database lock that
+        the caller holds. A detached flusher finds nothing left to save and
+        exits on its next wake-up.
+        """
+        with self._cond:
+            self._thread = None
+            self._cond.notify_all()
+
+    def status(self) -> dict:
+        with self._cond:
+            due = self._due_at() if self.dirty else None
+            return {
+                "write_behind": self.enabled,
+                "debounce": self.debounce,
+                "max_dirty_age": self.max_dirty_age,
+                "dirty": self.dirty,
+                "pending_changes": self.pending_changes,
+                "dirty_since": self._dirty_since_wall.isoformat() if self._dirty_since_wall else None,
+                "next_save_in": max(0.0, due - time.monotonic()) if due is not None and self.enabled else None,
+                "last_saved": self._last_saved.isoformat() if self._last_saved else None,
+                "last_error": self._last_error,
+            }
+
+    # ==========================================
+    # Background flusher
+    # ==========================================
+
+    def _due_at(self) -> float:
+        """Monotonic time of the next flush. Caller holds ``_cond``."""
+        if self._urgent:
+            return self._retry_at
+        due = min(
+            (self._last_change or 0.0) + self.debounce,
+            (self._dirty_since or 0.0) + self.max_dirty_age,
+        )
+        return max(due, self._retry_at)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="vaultix-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        me = threading.current_thread()
+        while True:
+            with self._cond:
+                while self._thread is me and not (self.enabled and self.dirty):
+                    self._cond.wait()
+                if self._thread is not me:
+                    return
+                delay = self._due_at() - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Background save failed; will retry")
@@ -0,0 +1,65 @@
+"""Debug-only cProfile capture that follows a request into worker threads"""
+
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+# Profiles collecting the current request, when it is being profiled
+_profiles: contextvars.ContextVar[list[cProfile.Profile] | None] = contextvars.ContextVar(
+    "vaultix_profiles", default=None
+)
+# Set while a profile is enabled in this thread (cProfile allows one per thread)
+_thread = threading.local()
+
+
+@contextmanager
+def profile_request() -> Iterator[list[cProfile.Profile]]:
+    """Profile the calling thread until exit.
+
+    ``profiled`` functions called in this context from other threads (the
+    context is copied into the thread pool) add a profile of their own to
+    the yielded list; read it after the block has exited.
+    """
+    profile = cProfile.Profile()
+    profiles = [profile]
+    token = _profiles.set(profiles)
+    _thread.active = True
+    profile.enable()
+    try:
+        yield profiles
+    finally:
+        profile.disable()
+        _thread.active = False
+        _profiles.reset(token)
+
+
+def profiled(function):
+    """Run ``function`` under a profile of its own when a profiled request
+    calls it from a thread that is not being profiled yet; otherwise (the
+    normal case) it is called directly."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        profiles = _profiles.get()
+        if profiles is None or getattr(_thread, "active", False):
+            return function(*args, **kwargs)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ profiles every thread from one profile
+            return function(*args, **kwargs)
+        _thread.active = True
+        profiles.append(profile)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile.disable()
+            _thread.active = False
+
+    return wrapper
@@ -0,0 +1,285 @@
+"""In-memory inverted index for entry search.
+
+The index holds lowercased field text, so it lives in process memory only
+and is rebuilt from the decrypted vault on every open; it is never written
+to disk. Passwords and custom field values are not indexed.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+import uuid
+from typing import Iterable
+
+from backend.core.kdbx.snapshot import EntryRecord
+
+FIELD_WEIGHTS = {
+    "title": 5.0,
+    "username": 3.0,
+    "url": 3.0,
+    "tags": 2.0,
+    "group": 1.5,
+    "notes": 1.0,
+}
+FIELDS = tuple(FIELD_WEIGHTS)
+
+# Query prefixes accepted for field-scoped terms, e.g. ``user:alice``
+FIELD_ALIASES = {
+    "title": "title",
+    "user": "username",
+    "username": "username",
+    "url": "url",
+    "tag": "tags",
+    "tags": "tags",
+    "group": "group",
+    "notes": "notes",
+}
+
+# Short fields get trigram postings for substring matching. Notes can be
+# long, so they only get token/prefix postings; inside notes a term matches
+# whole words, word prefixes and phrases that start at a word boundary.
+TRIGRAM_FIELDS = ("title", "username", "url", "tags", "group")
+
+EXACT_BOOST = 3.0
+PREFIX_BOOST = 2.0
+SUBSTRING_BOOST = 1.0
+
+_TOKEN_RE = re.compile(r"\w+")
+_TERM_RE = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def parse_query(query: str) -> list[tuple[str | None, str]]:
+    """Split a query into ``(field, term)`` pairs.
+
+    ``field`` is None for unscoped terms. Unknown prefixes such as
+    ``https:`` are treated as part of the term.
+    """
+    terms = []
+    for match in _TERM_RE.finditer(query):
+        prefix, quoted, bare = match.groups()
+        term = quoted if quoted is not None else bare
+        field = FIELD_ALIASES.get(prefix.lower()) if prefix else None
+        if prefix and field is None:
+            term = f"{prefix}:{term}"
+        term = term.strip().lower()
+        if term:
+            terms.append((field, term))
+    return terms
+
+
+def entry_search_fields(record: EntryRecord) -> dict[str, str]:
+    """The searchable fields of an entry, as indexed"""
+    return {
+        "title": record.title,
+        "username": record.username,
+        "url": record.url,
+        "tags": " ".join(record.tags),
+        "group": " ".join(record.group_path),
+        "notes": record.notes,
+    }
+
+
+class SearchIndex:
+    """Token, prefix and trigram postings over entry fields.
+
+    Postings hold small ints rather than UUIDs: set operations over tens of
+    thousands of ids are much cheaper with int hashing. An entry keeps its
+    number across updates, which also gives a stable tie-break order.
+    """
+
+    def __init__(self):
+        self._numbers: dict[uuid.UUID, int] = {}
+        self._uuids: dict[int, uuid.UUID] = {}
+        self._next = 0
+        self._docs: dict[int, dict[str, str]] = {}
+        self._postings: dict[str, dict[str, set[int]]] = {f: {} for f in FIELDS}
+        self._vocab: dict[str, list[str] | None] = {f: [] for f in FIELDS}
+        self._trigrams: dict[str, dict[str, set[int]]] = {f: {} for f in TRIGRAM_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: uuid.UUID) -> bool:
+        return doc_id in self._numbers
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def build(self, records: Iterable[EntryRecord]) -> None:
+        """Index all entries from scratch, sorting each vocabulary once"""
+        self.clear()
+        for field in FIELDS:
+            self._vocab[field] = None
+        for record in records:
+            self._insert(self._number(record.uuid), entry_search_fields(record))
+        for field in FIELDS:
+            self._vocab[field] = sorted(self._postings[field])
+
+    def add(self, record: EntryRecord) -> None:
+        """Index an entry, replacing any previous version of it"""
+        number = self._number(record.uuid)
+        self._unindex(number)
+        self._insert(number, entry_search_fields(record))
+
+    def remove(self, doc_id: uuid.UUID) -> None:
+        number = self._numbers.pop(doc_id, None)
+        if number is not None:
+            self._unindex(number)
+            del self._uuids[number]
+
+    def search(self, query: str, limit: int | None = None) -> list[uuid.UUID]:
+        """Return matching entry ids, best match first.
+
+        Every term must match (AND). A term scores per field by exact token,
+        token prefix or substring match, weighted by field. Ties are broken
+        by title, then by indexing order.
+        """
+        terms = parse_query(query)
+        if not terms:
+            return []
+
+        scores: dict[int, float] | None = None
+        for field, term in terms:
+            term_scores = self._score_term(term, (field,) if field else FIELDS)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+            if not scores:
+                return []
+
+        docs = self._docs
+
+        def rank(d: int) -> tuple:
+            return (-scores[d], docs[d]["title"], d)
+
+        if limit is not None and limit < len(scores):
+            ranked = heapq.nsmallest(limit, scores, key=rank)
+        else:
+            ranked = sorted(scores, key=rank)
+        return [self._uuids[d] for d in ranked]
+
+    # ==========================================
+    # Private Helpers
+    # ==========================================
+
+    def _number(self, doc_id: uuid.UUID) -> int:
+        number = self._numbers.get(doc_id)
+        if number is None:
+            number = self._numbers[doc_id] = self._next
+            self._uuids[number] = doc_id
+            self._next += 1
+        return number
+
+    def _insert(self, number: int, fields: dict[str, str]) -> None:
+        fields = {f: (fields.get(f) or "").lower() for f in FIELDS}
+        self._docs[number] = fields
+        for field, text in fields.items():
+            postings = self._postings[field]
+            vocab = self._vocab[field]
+            for token in set(tokenize(text)):
+                ids = postings.get(token)
+                if ids is None:
+                    postings[token] = ids = set()
+                    if vocab is not None:
+                        bisect.insort(vocab, token)
+                ids.add(number)
+            if field in self._trigrams:
+                grams = self._trigrams[field]
+                for gram in trigrams(text):
+                    ids = grams.get(gram)
+                    if ids is None:
+                        grams[gram] = ids = set()
+                    ids.add(number)
+
+    def _unindex(self, number: int) -> None:
+        fields = self._docs.pop(number, None)
+        if fields is None:
+            return
+        for field, text in fields.items():
+            postings = self._postings[field]
+            vocab = self._vocab[field]
+            for token in set(tokenize(text)):
+                ids = postings.get(token)
+                if ids is None:
+                    continue
+                ids.discard(number)
+                if not ids:
+                    del postings[token]
+                    if vocab is not None:
+                        i = bisect.bisect_left(vocab, token)
+                        if i < len(vocab) and vocab[i] == token:
+                            del vocab[i]
+            if field in self._trigrams:
+                grams = self._trigrams[field]
+                for gram in trigrams(text):
+                    ids = grams.get(gram)
+                    if ids is not None:
+                        ids.discard(number)
+                        if not ids:
+                            del grams[gram]
+
+    def _score_term(self, term: str, fields: Iterable[str]) -> dict[int, float]:
+        scores: dict[int, float] = {}
+        term_tokens = tokenize(term)
+        single_token = len(term_tokens) == 1 and term_tokens[0] == term
+
+        for field in fields:
+            weight = FIELD_WEIGHTS[field]
+            field_scores: dict[int, float] = {}
+
+            if single_token:
+                for doc_id in self._postings[field].get(term, ()):
+                    field_scores[doc_id] = EXACT_BOOST
+                for doc_id in self._prefix_matches(field, term):
+                    field_scores.setdefault(doc_id, PREFIX_BOOST)
+
+            for doc_id in self._substring_matches(field, term, term_tokens):
+                field_scores.setdefault(doc_id, SUBSTRING_BOOST)
+
+            for doc_id, boost in field_scores.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * boost
+        return scores
+
+    def _prefix_matches(self, field: str, prefix: str) -> set[int]:
+        vocab = self._vocab[field]
+        if vocab is None:
+            vocab = self._vocab[field] = sorted(self._postings[field])
+        postings = self._postings[field]
+        result: set[int] = set()
+        i = bisect.bisect_left(vocab, prefix)
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            result |= postings[vocab[i]]
+            i += 1
+        return result
+
+    def _substring_matches(self, field: str, term: str, term_tokens: list[str]) -> set[int]:
+        if len(term) >= 3 and field in self._trigrams:
+            grams = self._trigrams[field]
+            candidates: set[int] | None = None
+            for gram in sorted(trigrams(term), key=lambda g: len(grams.get(g, ()))):
+                ids = grams.get(gram)
+                if not ids:
+                    return set()
+                candidates = set(ids) if candidates is None else candidates & ids
+                if not candidates:
+                    return set()
+        elif term_tokens and term_tokens[-1] != term:
+            # Without trigrams (notes, or terms under three characters) the
+            # last token of a multi-part term such as "foo.b" starts a token
+            # in the text, so its prefix postings are the candidates.
+            candidates = self._prefix_matches(field, term_tokens[-1])
+        else:
+            return set()
+
+        return {d for d in candidates if term in self._docs[d][field]}
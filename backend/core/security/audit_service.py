@@ -0,0 +1,378 @@
+"""Password health audit: cached zxcvbn scores and incrementally kept aggregates"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import multiprocessing
+import secrets
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Mapping
+
+from backend.app import config
+from backend.core.kdbx.snapshot import EntryRecord
+from backend.core.metrics import cache_requests
+from backend.core.security.breach_checker import BreachIndex, password_digest
+from backend.core.security.duplicate_detector import ReuseIndex
+from backend.core.security.strength_analyzer import WEAK_SCORE, score_batch, strength_level
+
+# Key of the strength cache's password hashes. The cache is shared by all
+# vaults, so the key lives as long as the process (vault state uses the
+# per-session keys of ReuseIndex); it never leaves it, so the hashes cannot
+# be brute-forced offline and do not match any hash computed elsewhere.
+_HASH_KEY = secrets.token_bytes(32)
+
+# Fewer passwords than this are scored in the calling thread; starting or
+# feeding the pool costs more than a few zxcvbn calls.
+INLINE_LIMIT = 32
+
+# Penalty weights of the overall health score
+WEAK_WEIGHT = 2
+DUPLICATE_WEIGHT = 3
+EXPIRED_WEIGHT = 1
+
+
+def password_key(password: str) -> bytes:
+    """Keyed hash identifying a password without storing it"""
+    return hashlib.blake2b(password.encode(), key=_HASH_KEY, digest_size=16).digest()
+
+
+class StrengthCache:
+    """zxcvbn results by password key, shared by all vaults (LRU-bounded)"""
+
+    def __init__(self, capacity: int = config.AUDIT_CACHE_SIZE):
+        self.capacity = max(1, capacity)
+        self._results: OrderedDict[bytes, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, key: bytes) -> dict | None:
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+        cache_requests.inc(cache="password_strength", result="miss" if result is None else "hit")
+        return result
+
+    def put(self, key: bytes, result: dict) -> None:
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.capacity:
+                self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+
+class ScoringPool:
+    """Runs zxcvbn in worker processes, so scoring uses every core and never
+    holds this process's GIL against the request threads.
+
+    The pool is started on first use; ``workers=0`` scores in-process.
+    """
+
+    def __init__(self, workers: int = config.AUDIT_WORKERS):
+        self.workers = max(0, workers)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def score(self, passwords: list[str]) -> list[dict]:
+        if not self.workers or len(passwords) < INLINE_LIMIT:
+            return [_compact(r) for r in score_batch(passwords)]
+        # A few chunks per worker keeps them all busy without paying the
+        # pickling round trip for every single password
+        size = max(1, min(500, math.ceil(len(passwords) / (self.workers * 4))))
+        chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+        results = []
+        try:
+            for chunk in self._pool().map(score_batch, chunks):
+                results.extend(_compact(r) for r in chunk)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start fresh next time
+            self.shutdown()
+            raise
+        return results
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Not fork: the server process has live threads and locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+
+class _EntryAudit:
+    __slots__ = ("title", "username", "group_id")
+
+    def __init__(self, title: str, username: str, group_id: str):
+        self.title = title
+        self.username = username
+        self.group_id = group_id
+
+
+class AuditIndex:
+    """Per-vault audit state, updated with the other indexes on every mutation.
+
+    Passwords are tracked only by the session-keyed ``ReuseIndex``, whose
+    exact keys identify each distinct password here too; besides that an
+    entry keeps the fields the reports show, never its password. Scores
+    come from the shared ``StrengthCache``, so a password is scored once no
+    matter how many entries or vaults use it; ``pending_passwords`` returns
+    only the passwords whose score is not known yet. The dashboard counters
+    (strength histogram, reuse) are adjusted per changed entry, so
+    ``health`` never walks the vault. Entries in the recycle bin are not
+    audited. Has its own lock; callers only need the database lock to read
+    entries.
+    """
+
+    def __init__(self, cache: StrengthCache | None = None):
+        self._cache = cache if cache is not None else strength_cache
+        self._entries: dict[uuid.UUID, _EntryAudit] = {}
+        self._scores: dict[bytes, dict] = {}
+        self._pending: set[bytes] = set()
+        self._histogram = [0] * 5
+        self._empty = 0
+        self._reuse = ReuseIndex()
+        self._excluded: uuid.UUID | None = None
+        self._lock = threading.Lock()
+        self._scoring = threading.Lock()
+
+    @property
+    def scoring(self) -> threading.Lock:
+        """Held while pending passwords are scored, so concurrent reports
+        wait for one scoring run instead of starting their own"""
+        return self._scoring
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._scores.clear()
+            self._pending.clear()
+            self._histogram = [0] * 5
+            self._empty = 0
+            self._reuse.clear()
+            self._excluded = None
+
+    def build(self, records: Iterable[EntryRecord], recycle_bin: uuid.UUID | None) -> None:
+        self.clear()
+        with self._lock:
+            self._excluded = recycle_bin
+            for record in records:
+                self._put(record.uuid, record)
+
+    def update(self, changes: Iterable[tuple[uuid.UUID, EntryRecord | None]]) -> None:
+        """Refresh entries that were added, changed, moved or removed (None)"""
+        with self._lock:
+            for entry_id, record in changes:
+                self._put(entry_id, record)
+
+    def pending_passwords(self, entries: Mapping[uuid.UUID, EntryRecord]) -> list[tuple[bytes, str]]:
+        """(key, password) for each distinct password that still needs a score.
+
+        Reads the passwords from ``entries``; call under the database lock.
+        """
+        with self._lock:
+            work = []
+            for key in self._pending:
+                for entry_id in self._reuse.entries(key):
+                    record = entries.get(entry_id)
+                    if record is not None:
+                        work.append((key, record.password))
+                        break
+            return work
+
+    def store(self, results: Iterable[tuple[tuple[bytes, str], dict]]) -> None:
+        """Record new scores for ``pending_passwords`` items (in the shared
+        cache and for this vault)"""
+        with self._lock:
+            for (key, password), result in results:
+                self._cache.put(password_key(password), result)
+                if key in self._pending:
+                    self._set_score(key, result)
+
+    def health(self, expired: int = 0, expiring: int = 0) -> dict:
+        """Dashboard summary from the maintained counters.
+
+        Expiry is tracked by the database's expiry index, which passes in
+        the number of expired and soon expiring entries.
+        """
+        with self._lock:
+            total = len(self._entries)
+            audited = total - self._empty
+            weak = sum(self._histogram[:WEAK_SCORE])
+            pending = sum(len(self._reuse.entries(k)) for k in self._pending)
+            penalty = (
+                WEAK_WEIGHT * weak
+                + DUPLICATE_WEIGHT * self._reuse.duplicate_entries
+                + EXPIRED_WEIGHT * expired
+            )
+            worst = (WEAK_WEIGHT + DUPLICATE_WEIGHT + EXPIRED_WEIGHT) * max(total, 1)
+            return {
+                "total_entries": total,
+                "audited": audited,
+                "pending": pending,
+                "empty_passwords": self._empty,
+                "weak": weak,
+                "strong": audited - pending - weak,
+                "duplicates": {
+                    "groups": self._reuse.duplicate_groups,
+                    "entries": self._reuse.duplicate_entries,
+                    "similar_groups": self._reuse.similar_group_count,
+                },
+                "expired": expired,
+                "expiring_soon": expiring,
+                "strength": {
+                    strength_level(score).value: count for score, count in enumerate(self._histogram)
+                },
+                "security_score": round(100 * (1 - min(penalty / worst, 1.0))),
+            }
+
+    def weak(self, limit: int | None = None) -> list[dict]:
+        """Entries whose password scores below ``WEAK_SCORE``, weakest first"""
+        with self._lock:
+            found = []
+            for key, result in self._scores.items():
+                if result["score"] >= WEAK_SCORE:
+                    continue
+                for entry_id in self._reuse.entries(key):
+                    item = self._describe(entry_id)
+                    item.update(result)
+                    found.append(item)
+        found.sort(key=lambda item: (item["score"], item["title"].casefold(), item["id"]))
+        return found[:limit]
+
+    def duplicates(self) -> dict:
+        """Groups of entries sharing one password, and groups of entries
+        whose passwords differ only in case or a trailing counter"""
+        with self._lock:
+            exact = [
+                [self._describe(entry_id) for entry_id in ids]
+                for ids in self._reuse.exact_groups()
+            ]
+            similar = [
+                [self._describe(entry_id) for ids in variants for entry_id in ids]
+                for variants in self._reuse.similar_groups()
+            ]
+        return {"groups": _by_size(exact), "similar": _by_size(similar)}
+
+    def breaches(self, entries: Mapping[uuid.UUID, EntryRecord], index: BreachIndex) -> dict:
+        """Every audited entry whose password is in the breach dataset.
+
+        Each distinct password is hashed and looked up once, in file order.
+        Reads the passwords from ``entries``; call under the database lock.
+        """
+        with self._lock:
+            digests = {}
+            for key, ids in self._reuse.passwords():
+                record = entries.get(next(iter(ids)))
+                if record is not None:
+                    digests[key] = password_digest(record.password)
+            counts = index.lookup_many(digests.values())
+            found = []
+            for key, digest in digests.items():
+                if counts[digest]:
+                    for entry_id in self._reuse.entries(key):
+                        item = self._describe(entry_id)
+                        item["breach_count"] = counts[digest]
+                        found.append(item)
+        found.sort(key=lambda item: (-item["breach_count"], item["title"].casefold(), item["id"]))
+        return {"checked": len(digests), "breached": found}
+
+    def reuse(self, entry_id: uuid.UUID) -> dict:
+        """Reuse badge of one entry: other entries with the same or a similar password"""
+        with self._lock:
+            return self._reuse.count(entry_id)
+
+    # ==========================================
+    # Internals (caller holds ``_lock``)
+    # ==========================================
+
+    def _put(self, entry_id: uuid.UUID, record: EntryRecord | None) -> None:
+        if self._entries.pop(entry_id, None) is not None:
+            self._remove(entry_id)
+        if record is None:
+            return
+        if record.group_uuid is not None and record.group_uuid == self._excluded:
+            return
+        self._entries[entry_id] = _EntryAudit(record.title, record.username, record.group_id)
+        self._add(entry_id, record.password)
+
+    def _add(self, entry_id: uuid.UUID, password: str) -> None:
+        if not password:
+            self._empty += 1
+            return
+        key = self._reuse.put(entry_id, password)
+        if len(self._reuse.entries(key)) > 1:
+            result = self._scores.get(key)
+            if result is not None:
+                self._histogram[result["score"]] += 1
+            return
+        result = self._cache.get(password_key(password))
+        if result is None:
+            self._pending.add(key)
+        else:
+            self._set_score(key, result)
+
+    def _remove(self, entry_id: uuid.UUID) -> None:
+        key = self._reuse.key(entry_id)
+        if key is None:
+            self._empty -= 1
+            return
+        self._reuse.remove(entry_id)
+        result = self._scores.get(key)
+        if result is not None:
+            self._histogram[result["score"]] -= 1
+        if not self._reuse.entries(key):
+            self._scores.pop(key, None)
+            self._pending.discard(key)
+
+    def _set_score(self, key: bytes, result: dict) -> None:
+        self._pending.discard(key)
+        self._scores[key] = result
+        self._histogram[result["score"]] += len(self._reuse.entries(key))
+
+    def _describe(self, entry_id: uuid.UUID) -> dict:
+        state = self._entries[entry_id]
+        return {
+            "id": str(entry_id),
+            "title": state.title,
+            "username": state.username,
+            "group_id": state.group_id,
+        }
+
+
+def _by_size(groups: list[list[dict]]) -> list[dict]:
+    for group in groups:
+        group.sort(key=lambda item: (item["title"].casefold(), item["id"]))
+    groups.sort(key=lambda group: (-len(group), group[0]["title"].casefold()))
+    return [{"count": len(group), "entries": group} for group in groups]
+
+
+def _compact(result: dict) -> dict:
+    """Share the feedback strings between cached results from worker processes"""
+    result["strength"] = sys.intern(result["strength"])
+    result["crack_time"] = sys.intern(result["crack_time"])
+    result["warning"] = sys.intern(result["warning"])
+    result["suggestions"] = [sys.intern(s) for s in result["suggestions"]]
+    return result
+
+
+strength_cache = StrengthCache()
+scoring_pool = ScoringPool()
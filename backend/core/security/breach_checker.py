@@ -0,0 +1,178 @@
+"""Offline breach check against a local Pwned Passwords (SHA-1) dataset.
+
+Two file formats are accepted, both memory-mapped and binary-searched in
+place, so the dataset is never loaded into RAM:
+
+* the published text file ordered by hash (``SHA1HEX:COUNT`` per line),
+* a compact binary form built from it with ``build_index``::
+
+      magic   b"VXHIBP01"
+      count   uint64
+      fanout  65537 x uint64   index of the first record per 2-byte prefix
+      records count x (20-byte SHA-1 digest, uint32 occurrence count)
+
+Convert the text file once with:
+
+    python -m backend.core.security.breach_checker pwned-passwords-sha1.txt hibp.bin
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from typing import BinaryIO, Iterable
+
+from backend.app import config
+
+MAGIC = b"VXHIBP01"
+_HEADER = struct.Struct("<8sQ")
+_FANOUT_SIZE = 65537
+_FANOUT_OFFSET = _HEADER.size
+_RECORDS_OFFSET = _FANOUT_OFFSET + 8 * _FANOUT_SIZE
+_RECORD = struct.Struct("<20sI")
+
+
+def password_digest(password: str) -> bytes:
+    return hashlib.sha1(password.encode("utf-8")).digest()
+
+
+class BreachIndex:
+    """Read-only view of a Pwned Passwords dataset; lookups are thread-safe"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.compact = self._mm[:len(MAGIC)] == MAGIC
+        if self.compact:
+            _, self.count = _HEADER.unpack_from(self._mm, 0)
+            if len(self._mm) != _RECORDS_OFFSET + self.count * _RECORD.size:
+                raise ValueError(f"Truncated breach index: {path}")
+        else:
+            self.count = None
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def lookup(self, digest: bytes) -> int:
+        """Breach occurrence count of a SHA-1 digest (0 if not found)"""
+        if self.compact:
+            return self._lookup_compact(digest)
+        return self._lookup_text(digest.hex().upper().encode())
+
+    def lookup_many(self, digests: Iterable[bytes]) -> dict[bytes, int]:
+        """Counts for many digests, looked up in file order for locality"""
+        return {digest: self.lookup(digest) for digest in sorted(set(digests))}
+
+    def check_password(self, password: str) -> int:
+        return self.lookup(password_digest(password))
+
+    def _lookup_compact(self, digest: bytes) -> int:
+        prefix = int.from_bytes(digest[:2], "big")
+        lo, hi = struct.unpack_from("<2Q", self._mm, _FANOUT_OFFSET + 8 * prefix)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _RECORDS_OFFSET + mid * _RECORD.size
+            key = self._mm[offset:offset + 20]
+            if key == digest:
+                return _RECORD.unpack_from(self._mm, offset)[1]
+            if key < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return 0
+
+    def _lookup_text(self, hexdigest: bytes) -> int:
+        # Binary search over byte offsets, realigned to line starts
+        mm = self._mm
+        lo, hi = 0, len(mm)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b"\n", 0, mid) + 1
+            end = mm.find(b"\n", start)
+            if end == -1:
+                end = len(mm)
+            line = mm[start:end].strip()
+            key = line[:40].upper()
+            if key == hexdigest:
+                return _parse_count(line)
+            if key < hexdigest:
+                lo = end + 1
+            else:
+                hi = start
+        return 0
+
+
+def build_index(source: str, target: str) -> int:
+    """Convert the hash-ordered text file to the compact format; returns the record count"""
+    fanout = [0] * _FANOUT_SIZE
+    count = 0
+    previous = b""
+    with open(source, "rb") as src, open(target + ".tmp", "wb") as out:
+        out.write(b"\0" * _RECORDS_OFFSET)
+        for line in src:
+            line = line.strip()
+            if not line:
+                continue
+            digest = bytes.fromhex(line[:40].decode("ascii"))
+            if digest <= previous:
+                raise ValueError(f"Input is not ordered by hash at line {count + 1}")
+            previous = digest
+            fanout[int.from_bytes(digest[:2], "big") + 1] += 1
+            out.write(_RECORD.pack(digest, min(_parse_count(line), 0xFFFFFFFF)))
+            count += 1
+        _write_header(out, count, fanout)
+    os.replace(target + ".tmp", target)
+    return count
+
+
+def _write_header(out: BinaryIO, count: int, fanout: list[int]) -> None:
+    for i in range(1, _FANOUT_SIZE):
+        fanout[i] += fanout[i - 1]
+    out.seek(0)
+    out.write(_HEADER.pack(MAGIC, count))
+    out.write(struct.pack(f"<{_FANOUT_SIZE}Q", *fanout))
+    out.flush()
+    os.fsync(out.fileno())
+
+
+def _parse_count(line: bytes) -> int:
+    _, _, count = line.partition(b":")
+    try:
+        return int(count) if count else 1
+    except ValueError:
+        return 1
+
+
+_index: BreachIndex | None = None
+_index_lock = threading.Lock()
+
+
+def breach_index() -> BreachIndex | None:
+    """The dataset configured in VAULTIX_BREACH_DATASET, mapped on first use"""
+    global _index
+    if not config.BREACH_DATASET:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = BreachIndex(config.BREACH_DATASET)
+        return _index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Convert a hash-ordered Pwned Passwords SHA-1 text file to the compact index"
+    )
+    parser.add_argument("source")
+    parser.add_argument("target")
+    args = parser.parse_args()
+    count = build_index(args.source, args.target)
+    print(f"{count} hashes written to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
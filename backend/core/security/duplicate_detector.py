@@ -0,0 +1,144 @@
+"""Password reuse index: keyed-hash multimap with near-duplicate grouping"""
+
+from __future__ import annotations
+
+import hashlib
+import secrets
+import uuid
+from typing import Iterable
+
+# Characters stripped from the end of a password for its near-duplicate
+# key, so "Summer2023" and "summer2024!" land in the same group
+_TRAILING = "0123456789!?.#*$%&@_-+="
+
+# Normalized forms shorter than this are too common to group by
+MIN_NEAR_LENGTH = 4
+
+
+def near_form(password: str) -> str | None:
+    """Case-folded password without trailing digits/symbols, or None if too short"""
+    normalized = password.casefold().rstrip(_TRAILING)
+    return normalized if len(normalized) >= MIN_NEAR_LENGTH else None
+
+
+class ReuseIndex:
+    """Which entries share a password, and which share one up to case or a
+    trailing counter.
+
+    Passwords are reduced to BLAKE2b hashes keyed with a secret drawn each
+    time the index is cleared (i.e. per opened vault session), so the keys
+    are useless outside this session and cannot be matched against a
+    precomputed table. The exact multimap and the near-duplicate groups are
+    updated per entry, so the reuse counters and an entry's badge are O(1).
+    The exact keys also identify each distinct password for the audit.
+
+    Not thread-safe; the owner serializes access.
+    """
+
+    def __init__(self):
+        self._secret = secrets.token_bytes(32)
+        self._keys: dict[uuid.UUID, tuple[bytes, bytes | None]] = {}
+        self._exact: dict[bytes, set[uuid.UUID]] = {}
+        # near key -> exact keys with that normal form, and their entry count
+        self._near: dict[bytes, set[bytes]] = {}
+        self._near_sizes: dict[bytes, int] = {}
+        self.duplicate_groups = 0
+        self.duplicate_entries = 0
+        self.similar_group_count = 0
+
+    def clear(self) -> None:
+        self._secret = secrets.token_bytes(32)
+        self._keys.clear()
+        self._exact.clear()
+        self._near.clear()
+        self._near_sizes.clear()
+        self.duplicate_groups = 0
+        self.duplicate_entries = 0
+        self.similar_group_count = 0
+
+    def put(self, entry_id: uuid.UUID, password: str) -> bytes:
+        """Index (or re-index) an entry's non-empty password; returns its exact key"""
+        self.remove(entry_id)
+        exact = self._hash(b"=", password)
+        normalized = near_form(password)
+        near = self._hash(b"~", normalized) if normalized is not None else None
+        self._keys[entry_id] = (exact, near)
+
+        ids = self._exact.setdefault(exact, set())
+        ids.add(entry_id)
+        if len(ids) == 2:
+            self.duplicate_groups += 1
+            self.duplicate_entries += 2
+        elif len(ids) > 2:
+            self.duplicate_entries += 1
+
+        if near is not None:
+            variants = self._near.setdefault(near, set())
+            variants.add(exact)
+            if len(ids) == 1 and len(variants) == 2:
+                self.similar_group_count += 1
+            self._near_sizes[near] = self._near_sizes.get(near, 0) + 1
+        return exact
+
+    def remove(self, entry_id: uuid.UUID) -> None:
+        keys = self._keys.pop(entry_id, None)
+        if keys is None:
+            return
+        exact, near = keys
+        ids = self._exact[exact]
+        ids.discard(entry_id)
+        if len(ids) == 1:
+            self.duplicate_groups -= 1
+            self.duplicate_entries -= 2
+        elif len(ids) > 1:
+            self.duplicate_entries -= 1
+        if not ids:
+            del self._exact[exact]
+
+        if near is not None:
+            self._near_sizes[near] -= 1
+            if not ids:
+                variants = self._near[near]
+                variants.discard(exact)
+                if len(variants) == 1:
+                    self.similar_group_count -= 1
+                elif not variants:
+                    del self._near[near]
+                    del self._near_sizes[near]
+
+    def key(self, entry_id: uuid.UUID) -> bytes | None:
+        """Exact key of an entry's password, None if it has none indexed"""
+        keys = self._keys.get(entry_id)
+        return keys[0] if keys is not None else None
+
+    def entries(self, key: bytes) -> set[uuid.UUID]:
+        """Entry ids using the password with this exact key (do not modify)"""
+        return self._exact.get(key) or set()
+
+    def passwords(self) -> Iterable[tuple[bytes, set[uuid.UUID]]]:
+        """(exact key, entry ids) per distinct password"""
+        return self._exact.items()
+
+    def count(self, entry_id: uuid.UUID) -> dict:
+        """How many other entries use the same password, or a near variant of it"""
+        keys = self._keys.get(entry_id)
+        if keys is None:
+            return {"reused": 0, "similar": 0}
+        exact, near = keys
+        same = len(self._exact[exact])
+        similar = self._near_sizes[near] - same if near is not None else 0
+        return {"reused": same - 1, "similar": similar}
+
+    def exact_groups(self) -> list[set[uuid.UUID]]:
+        """Entry ids per password used by more than one entry"""
+        return [ids for ids in self._exact.values() if len(ids) > 1]
+
+    def similar_groups(self) -> list[list[set[uuid.UUID]]]:
+        """Per near-duplicate group, the entry ids of each distinct password in it"""
+        return [
+            [self._exact[exact] for exact in variants]
+            for variants in self._near.values() if len(variants) > 1
+        ]
+
+    def _hash(self, domain: bytes, text: str) -> bytes:
+        return hashlib.blake2b(domain + text.encode(), key=self._secret, digest_size=16).digest()
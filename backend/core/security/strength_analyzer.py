@@ -0,0 +1,56 @@
+"""Password strength scoring with zxcvbn"""
+
+from __future__ import annotations
+
+from enum import Enum
+
+# zxcvbn's matching is superlinear in the password length; the score of a
+# longer password is already determined by its first characters.
+MAX_SCORED_LENGTH = 100
+
+# Scores below this (zxcvbn's 0-4 scale) are reported as weak
+WEAK_SCORE = 3
+
+
+class PasswordStrength(str, Enum):
+    VERY_WEAK = "very_weak"
+    WEAK = "weak"
+    MEDIUM = "medium"
+    STRONG = "strong"
+    VERY_STRONG = "very_strong"
+
+
+_LEVELS = (
+    PasswordStrength.VERY_WEAK,
+    PasswordStrength.WEAK,
+    PasswordStrength.MEDIUM,
+    PasswordStrength.STRONG,
+    PasswordStrength.VERY_STRONG,
+)
+
+
+def strength_level(score: int) -> PasswordStrength:
+    """Map a zxcvbn score (0-4) to a strength level"""
+    return _LEVELS[max(0, min(score, len(_LEVELS) - 1))]
+
+
+def score_password(password: str) -> dict:
+    """Score one password; the result holds no part of the password"""
+    # Imported on first use: zxcvbn's frequency lists take ~30 ms to load,
+    # and with a scoring pool only the worker processes need them
+    from zxcvbn import zxcvbn
+
+    result = zxcvbn(password[:MAX_SCORED_LENGTH])
+    return {
+        "score": result["score"],
+        "strength": strength_level(result["score"]).value,
+        "guesses_log10": round(float(result["guesses_log10"]), 2),
+        "crack_time": result["crack_times_display"]["offline_slow_hashing_1e4_per_second"],
+        "warning": result["feedback"].get("warning") or "",
+        "suggestions": list(result["feedback"].get("suggestions") or []),
+    }
+
+
+def score_batch(passwords: list[str]) -> list[dict]:
+    """Score a chunk of passwords (the unit of work sent to a pool process)"""
+    return [score_password(p) for p in passwords]
@@ -0,0 +1,71 @@
+"""Shared fixtures: small vaults with a cheap KDF in a temporary directory"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from datetime import datetime, timezone
+
+# Before the backend reads its configuration: no scoring processes or
+# background audits in tests
+os.environ.setdefault("VAULTIX_AUDIT_WORKERS", "0")
+os.environ.setdefault("VAULTIX_AUDIT_ON_OPEN", "0")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from backend.core.kdbx.parser import KdbxDatabase  # noqa: E402
+from backend.core.kdbx.snapshot import EntryRecord  # noqa: E402
+
+PASSWORD = "test-password"
+# The smallest Argon2 settings kdf.validate accepts, so creating and
+# opening a vault takes milliseconds
+FAST_KDF = {"algorithm": "argon2id", "iterations": 1, "memory_kib": 8 * 1024, "parallelism": 1}
+
+
+def open_database(**options) -> KdbxDatabase:
+    return KdbxDatabase(audit_on_open=False, **options)
+
+
+def make_record(title: str = "", group_uuid: uuid.UUID | None = None, **fields) -> EntryRecord:
+    """An entry record as the snapshot builds it, for testing indexes on their own"""
+    uid = fields.pop("uuid", None) or uuid.uuid4()
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    values = {
+        "username": "", "password": "", "url": "", "notes": "", "icon": "0", "tags": (),
+        "group_path": (), "custom_fields": (), "attachments": (),
+        "created": now, "modified": now, "expires": False, "expiry_time": None,
+    }
+    values.update(fields)
+    return EntryRecord(
+        uuid=uid, id=str(uid), title=title, group_uuid=group_uuid,
+        group_id=str(group_uuid) if group_uuid else "", **values,
+    )
+
+
+@pytest.fixture
+def vault_path(tmp_path):
+    return str(tmp_path / "test.kdbx")
+
+
+@pytest.fixture
+def db(vault_path):
+    database = open_database()
+    database.create(vault_path, PASSWORD, kdf_settings=FAST_KDF)
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def client(vault_path):
+    """API client with a fresh vault open in its own session"""
+    from backend.app.main import app
+
+    with TestClient(app) as test_client:
+        created = test_client.post("/api/database/create", json={
+            "path": vault_path, "password": PASSWORD, "new_session": True, "kdf": FAST_KDF,
+        })
+        assert created.status_code == 200, created.text
+        test_client.headers["X-Vault-Session"] = created.json()["session_id"]
+        yield test_client
+        test_client.post("/api/database/close")
@@ -0,0 +1,100 @@
+"""Attachment upload, download and removal through the API"""
+
+from __future__ import annotations
+
+import threading
+
+from backend.api.attachments import _content_disposition
+from backend.core.attachments.spool import EncryptedSpool
+
+
+def _entry(client) -> str:
+    response = client.post("/api/entries", json={"title": "files", "group_id": ""})
+    assert response.status_code in (200, 201), response.text
+    return response.json()["id"]
+
+
+def _upload(client, entry_id: str, filename: str, data: bytes) -> dict:
+    response = client.post(f"/api/attachments/{entry_id}", files={"file": (filename, data)})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_identical_attachments_on_one_entry_keep_their_own_ids(client):
+    entry_id = _entry(client)
+    first = _upload(client, entry_id, "a.txt", b"same content")
+    second = _upload(client, entry_id, "b.txt", b"same content")
+    assert second["deduplicated"]
+    assert first["id"] != second["id"]
+    assert [a["filename"] for a in client.get(f"/api/attachments/{entry_id}").json()] == ["a.txt", "b.txt"]
+
+    download = client.get(f"/api/attachments/{entry_id}/{second['id']}")
+    assert download.content == b"same content"
+    assert "b.txt" in download.headers["content-disposition"]
+
+    assert client.delete(f"/api/attachments/{entry_id}/{first['id']}").status_code == 200
+    remaining = client.get(f"/api/attachments/{entry_id}").json()
+    assert [(a["id"], a["filename"]) for a in remaining] == [("0", "b.txt")]
+    assert client.get(f"/api/attachments/{entry_id}/0").content == b"same content"
+
+
+def test_unknown_attachment_ids_are_not_found(client):
+    entry_id = _entry(client)
+    _upload(client, entry_id, "a.txt", b"data")
+    for attachment_id in ("1", "-1", "x"):
+        assert client.get(f"/api/attachments/{entry_id}/{attachment_id}").status_code == 404
+        assert client.delete(f"/api/attachments/{entry_id}/{attachment_id}").status_code == 404
+
+
+def test_only_a_listed_etag_answers_not_modified(client):
+    entry_id = _entry(client)
+    attachment = _upload(client, entry_id, "a.txt", b"data")
+    url = f"/api/attachments/{entry_id}/{attachment['id']}"
+    etag = client.get(url).headers["etag"]
+    partial = etag[:-3] + '"'
+
+    for header in (etag, f'"other", W/{etag}', "*"):
+        assert client.get(url, headers={"If-None-Match": header}).status_code == 304
+    for header in (partial, f'{etag[:-1]}-gzip"', f'"v{etag}"', etag[1:-1]):
+        assert client.get(url, headers={"If-None-Match": header}).status_code == 200
+
+
+def test_content_disposition_escapes_the_filename():
+    header = _content_disposition('Bericht "Q1"; März\r\n€.pdf')
+    assert header == (
+        "attachment; filename=\"Bericht _Q1_; M_rz___.pdf\"; "
+        "filename*=UTF-8''Bericht%20%22Q1%22%3B%20M%C3%A4rz%0D%0A%E2%82%AC.pdf"
+    )
+
+
+def test_non_latin_filenames_download(client):
+    entry_id = _entry(client)
+    attachment = _upload(client, entry_id, "отчёт.txt", b"data")
+    response = client.get(f"/api/attachments/{entry_id}/{attachment['id']}")
+    assert response.status_code == 200
+    assert response.headers["content-disposition"].endswith("filename*=UTF-8''%D0%BE%D1%82%D1%87%D1%91%D1%82.txt")
+
+
+def test_binary_metadata_survives_concurrent_readers(db):
+    entry = db.create_entry("files", "")
+    for i in range(20):
+        with EncryptedSpool() as spool:
+            spool.write(b"payload %d" % i)
+            db.add_attachment(entry["id"], f"{i}.txt", spool)
+    binaries, errors = db._binaries, []
+
+    def reader():
+        try:
+            for _ in range(300):
+                binaries.invalidate()
+                for binary_id in range(20):
+                    binaries.describe(0, binary_id, "x.txt")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
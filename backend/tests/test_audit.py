@@ -0,0 +1,55 @@
+"""Password health audit"""
+
+from __future__ import annotations
+
+import time
+
+from backend.core.security.audit_service import AuditIndex
+
+
+def _wait_for(condition, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_health_does_not_wait_for_scoring(db):
+    for i in range(3):
+        db.create_entry(f"entry{i}", "", password=f"weak{i}")
+    db.create_entry("shared", "", password="weak0")
+
+    with db._audit.scoring:
+        # A scoring run is under way; the dashboard is served regardless
+        report = db.audit_health()
+    assert report["pending"] == 4
+    assert report["duplicates"]["groups"] == 1
+
+    assert _wait_for(lambda: db.audit_health()["pending"] == 0)
+    report = db.audit_health()
+    assert report["weak"] == 4
+    assert report["strong"] == 0
+
+
+def test_incremental_audit_matches_a_rebuild(db):
+    ids = [db.create_entry(f"entry{i}", "", password=p)["id"] for i, p in enumerate(
+        ["shared", "shared", "shared", "Summer2023", "summer2024", "", "battery staple"]
+    )]
+    db.score_passwords()
+    db.update_entry(ids[0], {"password": "correct horse"})
+    db.update_entry(ids[5], {"password": "shared"})
+    db.delete_entry(ids[1])
+    db.score_passwords()
+
+    report = db.audit_health()
+    assert report["duplicates"] == {"groups": 1, "entries": 2, "similar_groups": 1}
+    assert report["empty_passwords"] == 0
+    duplicates = db.audit_duplicates()["groups"]
+    assert [sorted(e["id"] for e in group["entries"]) for group in duplicates] == [sorted([ids[2], ids[5]])]
+
+    rebuilt = AuditIndex()
+    rebuilt.build(db._snapshot.entries.values(), None)
+    assert rebuilt.health() == db._audit.health()
+    assert rebuilt.weak() == db._audit.weak()
@@ -0,0 +1,79 @@
+"""Transactional batches: all operations apply or the tree is left as it was"""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from backend.core.kdbx.parser import BatchRollbackError
+from backend.tests.conftest import PASSWORD, open_database
+
+
+def _title_in_tree(db, entry_id: str) -> str:
+    return db._find_entry_by_uuid(entry_id).title
+
+
+def test_batch_applies_all_operations(db):
+    entry = db.create_entry("one", group_id="")
+    result = db.apply_batch([
+        {"op": "create", "group_id": "", "fields": {"title": "two"}},
+        {"op": "update", "id": entry["id"], "fields": {"title": "renamed"}},
+    ])
+    assert result["success"] and result["applied"] == 2
+    assert sorted(e["title"] for e in db.list_entries()) == ["renamed", "two"]
+
+
+def test_failed_batch_rolls_back_repeated_updates_of_one_entry(db, vault_path):
+    entry = db.create_entry("orig", group_id="", password="secret")
+    created = db.create_entry("other", group_id="")
+    result = db.apply_batch([
+        {"op": "update", "id": entry["id"], "fields": {"title": "a"}},
+        {"op": "update", "id": entry["id"], "fields": {"title": "b", "password": "changed"}},
+        {"op": "move", "id": created["id"], "group_id": str(db._kp.root_group.uuid)},
+        {"op": "delete", "id": entry["id"]},
+        {"op": "delete", "id": str(uuid.uuid4())},
+    ])
+
+    assert not result["success"]
+    assert [r["status"] for r in result["results"]] == ["rolled_back"] * 4 + ["error"]
+    assert _title_in_tree(db, entry["id"]) == "orig"
+    assert db.get_entry(entry["id"])["title"] == "orig"
+    assert db.get_entry(entry["id"])["password"] == "secret"
+    assert db.check_index()["ok"]
+
+    db.save()
+    db.close()
+    reopened = open_database()
+    reopened.open(vault_path, PASSWORD)
+    try:
+        assert sorted(e["title"] for e in reopened.list_entries()) == ["orig", "other"]
+    finally:
+        reopened.close()
+
+
+def test_failed_batch_removes_created_entries(db):
+    db.create_entry("kept", group_id="")
+    result = db.apply_batch([
+        {"op": "create", "group_id": "", "fields": {"title": "new"}},
+        {"op": "update", "id": str(uuid.uuid4()), "fields": {"title": "x"}},
+    ])
+    assert not result["success"]
+    assert [e["title"] for e in db.list_entries()] == ["kept"]
+    assert db.check_index()["ok"]
+
+
+def test_failing_undo_step_rebuilds_indexes_and_raises(db):
+    entry = db.create_entry("orig", group_id="")
+    element = db._find_entry_by_uuid(entry["id"])._element
+
+    def broken():
+        raise RuntimeError("boom")
+
+    def detach():
+        element.getparent().remove(element)
+
+    with pytest.raises(BatchRollbackError):
+        db._rollback([detach, broken])
+    assert db.get_entry(entry["id"]) is None
+    assert db.check_index()["ok"]
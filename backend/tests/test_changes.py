@@ -0,0 +1,44 @@
+"""Change log cursors across mutations, saves and KDF changes"""
+
+from __future__ import annotations
+
+from backend.tests.conftest import FAST_KDF, PASSWORD, open_database
+
+
+def _assert_current(db) -> None:
+    assert db.change_log.since(db.revision) == {"revision": db.revision, "resync": False, "changes": []}
+
+
+def test_mutations_are_served_from_an_earlier_cursor(db):
+    cursor = db.revision
+    entry = db.create_entry("entry", "")
+    db.update_entry(entry["id"], {"title": "renamed"})
+    changes = db.change_log.since(cursor)
+    assert not changes["resync"]
+    assert [(c["op"], c["id"]) for c in changes["changes"]] == [("create", entry["id"]), ("update", entry["id"])]
+    _assert_current(db)
+
+
+def test_save_as_keeps_cursors_valid(db, tmp_path):
+    cursor = db.revision
+    db.save_as(str(tmp_path / "copy.kdbx"))
+    _assert_current(db)
+    assert db.change_log.since(cursor)["resync"] is False
+
+
+def test_kdf_retune_keeps_cursors_valid(db):
+    cursor = db.revision
+    db.retune_kdf(FAST_KDF)
+    _assert_current(db)
+    assert db.change_log.since(cursor)["resync"] is False
+
+
+def test_reopening_with_a_journal_replay_starts_a_current_log(db, vault_path):
+    db.save()
+    db.create_entry("journaled", "")
+    reopened = open_database()
+    reopened.open(vault_path, PASSWORD)
+    try:
+        _assert_current(reopened)
+    finally:
+        reopened.close()
@@ -0,0 +1,65 @@
+"""Entry routes: listings never carry secrets, GET /entries/{id} does"""
+
+from __future__ import annotations
+
+from backend.core.kdbx import projection
+
+SECRET_FIELDS = ("password", "notes", "custom_fields")
+
+
+def _create(client, **fields):
+    response = client.post("/api/entries/", json={"group_id": "", **fields})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_list_and_search_leave_out_secrets(client):
+    entry = _create(client, title="GitHub", username="octo", password="hunter2",
+                    notes="recovery codes", custom_fields={"pin": "1234"})
+
+    listed = client.get("/api/entries/").json()
+    found = client.get("/api/entries/search", params={"q": "github"}).json()
+    for items in (listed, found):
+        assert [item["id"] for item in items] == [entry["id"]]
+        assert not any(field in items[0] for field in SECRET_FIELDS)
+        assert "hunter2" not in str(items) and "1234" not in str(items)
+    assert listed[0]["username"] == "octo" and listed[0]["group_id"] == entry["group_id"]
+
+    full = client.get(f"/api/entries/{entry['id']}").json()
+    assert full["password"] == "hunter2"
+    assert full["custom_fields"]["pin"]["value"] == "1234"
+
+
+def test_listing_reflects_updates(client):
+    entry = _create(client, title="before")
+    assert client.get("/api/entries/").json()[0]["title"] == "before"
+    client.put(f"/api/entries/{entry['id']}", json={"title": "after"})
+    assert client.get("/api/entries/").json()[0]["title"] == "after"
+
+
+def _pages(client, **params):
+    ids, cursor = [], None
+    while True:
+        page = client.get("/api/entries/", params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})}).json()
+        ids += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+
+def test_cursor_pages_cover_every_entry_once(client):
+    created = [_create(client, title=title)["id"] for title in ("b", "a", "b", "c", "b")]
+    ascending = _pages(client, sort="title")
+    descending = _pages(client, sort="-title")
+    assert sorted(ascending) == sorted(created)
+    assert descending == ascending[::-1]
+
+
+def test_malformed_cursors_are_rejected(client):
+    _create(client, title="entry")
+    for cursor in (projection.encode_cursor(-5), projection.encode_cursor("3"), "not a cursor"):
+        response = client.get("/api/entries/search", params={"q": "entry", "cursor": cursor})
+        assert response.status_code == 400
+    for cursor in (projection.encode_cursor([1]), projection.encode_cursor(7)):
+        response = client.get("/api/entries/", params={"sort": "title", "cursor": cursor})
+        assert response.status_code == 400
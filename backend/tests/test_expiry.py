@@ -0,0 +1,32 @@
+"""Sorted expiry index"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from backend.core.kdbx.expiry import ExpiryIndex
+from backend.tests.conftest import make_record
+
+
+def test_expiry_index_orders_and_excludes_the_recycle_bin():
+    now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    recycle_bin = uuid.uuid4()
+    soon = make_record("soon", expires=True, expiry_time=now + timedelta(days=1))
+    later = make_record("later", expires=True, expiry_time=now + timedelta(days=10))
+    past = make_record("past", expires=True, expiry_time=now - timedelta(days=1))
+    disabled = make_record("disabled", expires=False, expiry_time=now)
+    binned = make_record("binned", recycle_bin, expires=True, expiry_time=now)
+
+    index = ExpiryIndex()
+    index.build([soon, later, past, disabled, binned], recycle_bin)
+    assert len(index) == 3
+    assert [uid for _, uid in index.between(None, now)] == [past.uuid]
+    assert [uid for _, uid in index.between(now, now + timedelta(days=30))] == [soon.uuid, later.uuid]
+    assert index.count_until(now + timedelta(days=1)) == 2
+    assert index.next_after(now) == soon.expiry_time
+
+    moved = make_record("soon", uuid=soon.uuid, expires=True, expiry_time=now + timedelta(days=20))
+    index.update([(soon.uuid, moved), (later.uuid, None)])
+    assert [uid for _, uid in index.between(now, now + timedelta(days=30))] == [soon.uuid]
+    assert index.next_after(now) == moved.expiry_time
@@ -0,0 +1,53 @@
+"""Group tree with maintained entry counts"""
+
+from __future__ import annotations
+
+
+def _groups_by_name(groups: list[dict], found: dict | None = None) -> dict[str, dict]:
+    found = {} if found is None else found
+    for group in groups:
+        found[group["name"]] = group
+        _groups_by_name(group["children"], found)
+    return found
+
+
+def test_group_tree_counts_follow_mutations(db):
+    work = db.create_group("Work")
+    team = db.create_group("Team", work["id"])
+    db.create_entry("root entry", "")
+    db.create_entry("work entry", work["id"])
+    first = db.create_entry("team entry 1", team["id"])
+    db.create_entry("team entry 2", team["id"])
+
+    groups = _groups_by_name(db.list_groups())
+    assert (groups["Work"]["entry_count"], groups["Work"]["total_entry_count"]) == (1, 3)
+    assert (groups["Team"]["entry_count"], groups["Team"]["total_entry_count"]) == (2, 2)
+
+    db.apply_batch([{"op": "move", "id": first["id"], "group_id": work["id"]}])
+    db.update_group(team["id"], name="Squad")
+    groups = _groups_by_name(db.list_groups())
+    assert (groups["Work"]["entry_count"], groups["Work"]["total_entry_count"]) == (2, 3)
+    assert (groups["Squad"]["entry_count"], groups["Squad"]["total_entry_count"]) == (1, 1)
+    assert db.check_index()["ok"]
+
+    db.delete_group(team["id"])
+    groups = _groups_by_name(db.list_groups())
+    assert "Squad" not in groups
+    assert groups["Work"]["total_entry_count"] == 2
+    assert db.check_index()["ok"]
+
+
+def test_group_updates_without_a_change_stay_quiet(db):
+    work = db.create_group("Work")
+    db.save()
+    revision = db.revision
+
+    assert db.update_group(work["id"])["name"] == "Work"
+    assert db.update_group(work["id"], name="Work")["name"] == "Work"
+    assert db.revision == revision
+    assert not db.save_status()["dirty"]
+    assert db.change_log.since(revision)["changes"] == []
+
+    db.update_group(work["id"], name="Office")
+    assert db.revision > revision
+    assert [c["op"] for c in db.change_log.since(revision)["changes"]] == ["update"]
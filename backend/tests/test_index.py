@@ -0,0 +1,26 @@
+"""UUID index of entries and groups"""
+
+from __future__ import annotations
+
+import uuid
+
+from backend.core.kdbx.index import UuidIndex
+
+
+def test_uuid_index_skips_history_and_follows_group_removal(db):
+    group = db.create_group("Work")
+    entry = db.create_entry("mail", group["id"])
+    kp_entry = db._find_entry_by_uuid(entry["id"])
+    kp_entry.save_history()
+
+    index = UuidIndex()
+    index.build(db._kp)
+    assert index.get_entry(entry["id"])._element is kp_entry._element
+    assert index.get_entry(uuid.UUID(entry["id"])) is not None
+    assert index.get_entry("not-a-uuid") is None
+    assert index.entry_ids_under(index.get_group(group["id"])) == [uuid.UUID(entry["id"])]
+    assert index.verify(db._kp)["ok"]
+
+    index.remove_group(index.get_group(group["id"]))
+    assert index.get_entry(entry["id"]) is None
+    assert index.get_group(group["id"]) is None
@@ -0,0 +1,135 @@
+"""Journal records, replay and checkpoints"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+
+from lxml import etree
+
+from backend.core.kdbx.journal import NEXT_SUFFIX, journal_path
+from backend.tests.conftest import PASSWORD, open_database
+
+
+def _crash_copy(vault_path: str, directory) -> str:
+    """Copy the vault and its journal as a crash would leave them"""
+    target = str(directory / "copy.kdbx")
+    shutil.copy(vault_path, target)
+    if os.path.exists(journal_path(vault_path)):
+        shutil.copy(journal_path(vault_path), journal_path(target))
+    return target
+
+
+def _blocked_save(db):
+    """Start a save that stops after taking its copy; returns (started, release, thread)"""
+    db.configure_saving(debounce=60, max_dirty_age=60)
+    started, release = threading.Event(), threading.Event()
+    prepare = db._saver._prepare
+
+    def blocked_prepare():
+        write = prepare()
+
+        def blocked_write():
+            started.set()
+            release.wait(5)
+            write()
+
+        return blocked_write
+
+    db._saver._prepare = blocked_prepare
+    thread = threading.Thread(target=db.save)
+    thread.start()
+    assert started.wait(5)
+    return release, thread
+
+
+def test_checkpoint_leaves_the_live_tree_alone(db):
+    db.create_entry("entry", "")
+    before = etree.tostring(db._kp.tree)
+    db.save()
+    assert etree.tostring(db._kp.tree) == before
+
+
+def test_journaled_changes_replay_after_a_crash(db, vault_path, tmp_path):
+    db.save()
+    created = db.create_entry("created", "", username="alice")
+    db.update_entry(created["id"], {"title": "renamed"})
+    doomed = db.create_entry("doomed", "")
+    db.delete_entry(doomed["id"])
+    assert db.save_status()["journal"]["records"] == 4
+
+    recovered = open_database()
+    recovered.open(_crash_copy(vault_path, tmp_path), PASSWORD)
+    try:
+        entry = recovered.get_entry(created["id"])
+        assert (entry["title"], entry["username"]) == ("renamed", "alice")
+        assert recovered.get_entry(doomed["id"]) is None
+    finally:
+        recovered.close()
+
+
+def test_group_changes_replay_after_a_crash(db, vault_path, tmp_path):
+    db.save()
+    work = db.create_group("Work")
+    team = db.create_group("Team", work["id"])
+    entry = db.create_entry("entry", team["id"])
+    db.update_group(work["id"], name="Office")
+    db.apply_batch([{"op": "move", "id": entry["id"], "group_id": work["id"]}])
+    db.delete_group(team["id"])
+
+    recovered = open_database()
+    recovered.open(_crash_copy(vault_path, tmp_path), PASSWORD)
+    try:
+        assert [(g["name"], g["entry_count"], g["children"]) for g in recovered.list_groups()] == [
+            ("Office", 1, []),
+        ]
+        assert recovered.get_entry(entry["id"])["group_id"] == work["id"]
+        assert recovered.check_index()["ok"]
+    finally:
+        recovered.close()
+
+
+def test_changes_made_during_a_save_survive_a_crash(db, vault_path, tmp_path):
+    entry = db.create_entry("before", "")
+    release, thread = _blocked_save(db)
+    try:
+        db.update_entry(entry["id"], {"title": "during"})
+    finally:
+        release.set()
+        thread.join(5)
+    assert db.save_status()["journal"]["records"] == 1
+
+    recovered = open_database()
+    recovered.open(_crash_copy(vault_path, tmp_path), PASSWORD)
+    try:
+        assert recovered.get_entry(entry["id"])["title"] == "during"
+    finally:
+        recovered.close()
+
+
+def test_next_journal_is_used_after_a_crash_between_renames(db, vault_path, tmp_path):
+    entry = db.create_entry("before", "")
+    db.save()
+    with open(journal_path(vault_path), "rb") as f:
+        old_journal = f.read()
+    release, thread = _blocked_save(db)
+    try:
+        db.update_entry(entry["id"], {"title": "during"})
+    finally:
+        release.set()
+        thread.join(5)
+
+    # As if the vault was replaced but not yet the journal
+    copy = _crash_copy(vault_path, tmp_path)
+    os.replace(journal_path(copy), journal_path(copy) + NEXT_SUFFIX)
+    with open(journal_path(copy), "wb") as f:
+        f.write(old_journal)
+
+    recovered = open_database()
+    recovered.open(copy, PASSWORD)
+    try:
+        assert recovered.get_entry(entry["id"])["title"] == "during"
+        assert not os.path.exists(journal_path(copy) + NEXT_SUFFIX)
+    finally:
+        recovered.close()
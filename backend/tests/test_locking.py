@@ -0,0 +1,156 @@
+"""Reader/writer lock and concurrent database access"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+
+import pytest
+
+from backend.core.kdbx.locking import RWLock
+from backend.tests.conftest import FAST_KDF, PASSWORD, open_database
+
+
+def _run_for(seconds: float, *targets) -> None:
+    stop = threading.Event()
+    threads = [threading.Thread(target=target, args=(stop,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_write_excludes_readers_and_is_reentrant():
+    lock = RWLock()
+    with lock.write():
+        with lock.write(), lock.read():
+            pass
+        got_read = threading.Event()
+        reader = threading.Thread(target=lambda: (lock.acquire_read(), got_read.set(), lock.release_read()))
+        reader.start()
+        assert not got_read.wait(0.1)
+    assert got_read.wait(2)
+    reader.join()
+
+
+def test_upgrade_raises():
+    lock = RWLock()
+    with lock.read():
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+
+
+def test_writers_get_in_between_overlapping_readers():
+    """Readers whose read sections always overlap must not lock a writer out"""
+    lock = RWLock()
+    writes = []
+
+    def reader(stop):
+        while not stop.is_set():
+            with lock.read():
+                time.sleep(0.002)
+
+    def writer(stop):
+        while not stop.is_set():
+            with lock.write():
+                writes.append(time.monotonic())
+            time.sleep(0.005)
+
+    _run_for(1.0, reader, reader, reader, reader, writer)
+    assert len(writes) >= 20
+
+
+def test_background_read_lets_readers_pass_waiting_writers():
+    lock = RWLock()
+    lock.acquire_read(background=True)
+    writer = threading.Thread(target=lambda: (lock.acquire_write(), lock.release_write()))
+    writer.start()
+    time.sleep(0.05)
+    read = threading.Thread(target=lambda: (lock.acquire_read(), lock.release_read()))
+    read.start()
+    read.join(2)
+    assert not read.is_alive()
+    lock.release_read(background=True)
+    writer.join(2)
+    assert not writer.is_alive()
+
+
+@pytest.fixture
+def busy_db(vault_path):
+    db = open_database(write_behind=True, save_debounce=0.05, save_max_dirty_age=0.2)
+    db.create(vault_path, PASSWORD, kdf_settings=FAST_KDF)
+    ids = [db.create_entry(f"seed{i}", "", username=f"seed{i}")["id"] for i in range(200)]
+    yield db, ids
+    db.close()
+
+
+def test_concurrent_reads_never_see_half_a_mutation(busy_db):
+    """Writers change title and username together; readers check they match"""
+    db, ids = busy_db
+    torn, reads, writes = [], [0], [0]
+
+    def reader(stop):
+        rng = random.Random()
+        while not stop.is_set():
+            if rng.random() < 0.8:
+                items = [db.get_entry(rng.choice(ids))]
+            else:
+                items = db.list_entries_page(None, "title,username", "title", None, 100)["items"]
+            torn.extend(i["id"] for i in items if i["title"] != i["username"])
+            reads[0] += 1
+
+    def writer(stop):
+        rng = random.Random()
+        while not stop.is_set():
+            token = f"t{rng.getrandbits(40):x}"
+            if rng.random() < 0.5:
+                db.update_entry(rng.choice(ids), {"title": token, "username": token})
+            else:
+                db.apply_batch([
+                    {"op": "update", "id": entry_id, "fields": {"title": token, "username": token}}
+                    for entry_id in rng.sample(ids, 10)
+                ])
+            writes[0] += 1
+
+    _run_for(1.0, reader, reader, reader, writer)
+    assert torn == []
+    assert reads[0] > 100
+    # Saves run every 0.2 s at the latest; the writer must not wait behind readers
+    assert writes[0] >= 10
+
+
+def test_reads_and_writes_complete_while_a_save_is_written(busy_db):
+    db, ids = busy_db
+    db.configure_saving(debounce=60, max_dirty_age=60)
+    saving, release = threading.Event(), threading.Event()
+    prepare = db._saver._prepare
+
+    def slow_prepare():
+        write = prepare()
+
+        def slow_write():
+            saving.set()
+            release.wait(5)
+            write()
+
+        return slow_write
+
+    db._saver._prepare = slow_prepare
+    saver = threading.Thread(target=db.save)
+    saver.start()
+    try:
+        assert saving.wait(5)
+        assert db.get_entry(ids[0])["id"] == ids[0]
+        assert len(db.list_entries_page(limit=10)["items"]) == 10
+        db.update_entry(ids[0], {"title": "during save"})
+        assert saver.is_alive()
+    finally:
+        release.set()
+        saver.join(5)
+    assert not saver.is_alive()
+    # The save wrote the copy taken before the update, which is still pending
+    assert db.save_status()["pending_changes"] == 1
@@ -0,0 +1,48 @@
+"""Password reuse index"""
+
+from __future__ import annotations
+
+import uuid
+
+from backend.core.security.duplicate_detector import ReuseIndex, near_form
+
+
+def test_near_form_strips_case_and_trailing_counters():
+    assert near_form("Summer2023!") == near_form("summer2024") == "summer"
+    assert near_form("ab12") is None
+
+
+def test_counts_and_groups_follow_puts_and_removes():
+    index = ReuseIndex()
+    a, b, c, d = (uuid.uuid4() for _ in range(4))
+    index.put(a, "Summer2023")
+    index.put(b, "Summer2023")
+    index.put(c, "summer2024!")
+    index.put(d, "unrelated")
+
+    assert index.count(a) == {"reused": 1, "similar": 1}
+    assert index.count(c) == {"reused": 0, "similar": 2}
+    assert index.count(d) == {"reused": 0, "similar": 0}
+    assert index.exact_groups() == [{a, b}]
+    assert sorted(map(len, index.similar_groups()[0])) == [1, 2]
+    assert (index.duplicate_groups, index.duplicate_entries, index.similar_group_count) == (1, 2, 1)
+
+    index.put(b, "unrelated")
+    assert index.exact_groups() == [{b, d}]
+    assert index.count(a) == {"reused": 0, "similar": 1}
+
+    index.remove(c)
+    index.remove(d)
+    assert index.exact_groups() == []
+    assert index.similar_groups() == []
+    assert (index.duplicate_groups, index.duplicate_entries, index.similar_group_count) == (0, 0, 0)
+
+
+def test_keys_change_with_every_session():
+    index = ReuseIndex()
+    entry = uuid.uuid4()
+    index.put(entry, "secret")
+    first = index._keys[entry]
+    index.clear()
+    index.put(entry, "secret")
+    assert index._keys[entry] != first
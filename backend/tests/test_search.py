@@ -0,0 +1,55 @@
+"""In-memory search index"""
+
+from __future__ import annotations
+
+from backend.core.search.indexer import SearchIndex, parse_query
+from backend.tests.conftest import make_record
+
+
+def _index(*records):
+    index = SearchIndex()
+    index.build(records)
+    return index
+
+
+def test_parse_query_scopes_known_prefixes_only():
+    assert parse_query('user:alice "two words" https://x') == [
+        ("username", "alice"), (None, "two words"), (None, "https://x"),
+    ]
+
+
+def test_exact_prefix_and_substring_matches_rank_in_order():
+    exact = make_record("mail")
+    prefix = make_record("mailbox")
+    substring = make_record("gmail")
+    index = _index(substring, prefix, exact)
+    assert index.search("mail") == [exact.uuid, prefix.uuid, substring.uuid]
+    assert index.search("mail", limit=1) == [exact.uuid]
+
+
+def test_terms_must_all_match_and_fields_are_weighted():
+    in_title = make_record("bank", username="bob")
+    in_notes = make_record("other", notes="my bank login", username="bob")
+    unrelated = make_record("bank", username="carol")
+    index = _index(in_notes, in_title, unrelated)
+    assert index.search("bank bob") == [in_title.uuid, in_notes.uuid]
+    assert index.search("user:carol") == [unrelated.uuid]
+    assert index.search("notes:ban") == [in_notes.uuid]
+
+
+def test_passwords_are_not_indexed():
+    index = _index(make_record("entry", password="hunter2"))
+    assert index.search("hunter2") == []
+
+
+def test_updates_replace_the_old_version_and_removal_forgets_it():
+    record = make_record("old title")
+    index = _index(record)
+    index.add(make_record("new title", uuid=record.uuid))
+    assert index.search("old") == []
+    assert index.search("new") == [record.uuid]
+    assert len(index) == 1
+
+    index.remove(record.uuid)
+    assert index.search("new") == []
+    assert record.uuid not in index
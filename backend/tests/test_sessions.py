@@ -0,0 +1,26 @@
+"""Vault sessions"""
+
+from __future__ import annotations
+
+import pytest
+
+from backend.core.kdbx.sessions import DEFAULT_SESSION, SessionManager, sessions
+from backend.tests.conftest import PASSWORD
+
+
+def test_unknown_session_ids_allocate_nothing(client):
+    before = list(sessions._sessions)
+    response = client.get("/api/entries/", headers={"X-Vault-Session": "no-such-session"})
+    assert response.status_code == 404
+    assert list(sessions._sessions) == before
+
+
+def test_failed_opens_drop_the_session(db, vault_path, tmp_path):
+    db.save()
+    manager = SessionManager()
+    with pytest.raises(Exception):
+        manager.open("wrong-password", vault_path, "not the password")
+    with pytest.raises(FileNotFoundError):
+        manager.open("missing", str(tmp_path / "missing.kdbx"), PASSWORD)
+    assert list(manager._sessions) == [DEFAULT_SESSION]
+    assert manager.get("wrong-password") is None
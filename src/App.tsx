@@ -22,6 +22,7 @@ import { useDatabaseStore } from '@/features/database/store/databaseStore'
 import { useAutoLock } from '@/shared/hooks/useAutoLock'
 import { useAutoSave } from '@/shared/hooks/useAutoSave'
 import { initApi, entriesApi, groupsApi, databaseApi, waitForBackend } from '@/shared/utils/api'
+import { changedFields, loadEntry } from '@/features/entries/services/entryService'
 import { cn } from '@/shared/utils/cn'
 import { X, Loader2 } from 'lucide-react'
 import { Button } from '@/shared/ui/button'
@@ -31,18 +32,17 @@ import type { KdbxEntry, KdbxGroup } from '@/shared/types/kdbx.types'
 // Data loading from backend
 // ============================================
 
+// List items are secret-free: their password, notes, custom fields and
+// attachments are left empty. Load the full entry (entryService.loadEntry)
+// before showing, editing or exporting those fields.
 interface RawEntry {
   id: string
   title: string
   username: string
-  password: string
   url: string
-  notes: string
   icon: number
   tags: string[]
   group_id: string
-  custom_fields: Record<string, { value: string; protected: boolean }>
-  attachments: { id: string; filename: string; size: number }[]
   created: string
   modified: string
   expiry_time: string | null
@@ -67,23 +67,14 @@ async function loadFromBackend() {
     id: e.id,
     title: e.title,
     username: e.username,
-    password: e.password,
+    password: '',
     url: e.url,
-    notes: e.notes,
+    notes: '',
     icon: e.icon || 0,
     tags: e.tags || [],
     groupId: e.group_id,
-    customFields: Object.entries(e.custom_fields || {}).map(([name, field]) => ({
-      name,
-      value: field.value,
-      protected: field.protected,
-    })),
-    attachments: (e.attachments || []).map((a) => ({
-      id: a.id,
-      filename: a.filename,
-      size: a.size,
-      mimeType: '',
-    })),
+    customFields: [],
+    attachments: [],
     created: e.created,
     modified: e.modified,
     accessed: '',
@@ -150,7 +141,6 @@ function App() {
   const showPreviewPanel = useSettingsStore((s) => s.showPreviewPanel)
   const database = useDatabaseStore((s) => s.database)
   const selectedId = useEntriesStore((s) => s.selectedId)
-  const entries = useEntriesStore((s) => s.entries)
 
   const [view, setView] = useState<AppView>('loading')
   const [showGenerator, setShowGenerator] = useState(false)
@@ -218,6 +208,15 @@ function App() {
     setView('login')
   }, [])
 
+  // Editing needs the secrets the list leaves out
+  const handleEditEntry = useCallback(async (entryId: string) => {
+    try {
+      setEditingEntry(await loadEntry(entryId))
+    } catch (err: unknown) {
+      toast('error', err instanceof Error ? err.message : 'Eintrag konnte nicht geladen werden')
+    }
+  }, [])
+
   // Auto-lock
   useAutoLock(useCallback(() => {
     if (view === 'main') {
@@ -244,15 +243,10 @@ function App() {
           })
           toast('success', `"${data.title}" erstellt`)
         } else if (editingEntry) {
-          await entriesApi.update(editingEntry.id, {
-            title: data.title,
-            username: data.username,
-            password: data.password,
-            url: data.url,
-            notes: data.notes,
-            tags: data.tags,
-            custom_fields: Object.fromEntries(data.customFields.map((f) => [f.name, f.value])),
-          })
+          const changes = changedFields(editingEntry, data)
+          if (Object.keys(changes).length > 0) {
+            await entriesApi.update(editingEntry.id, changes)
+          }
           toast('success', `"${data.title}" gespeichert`)
         }
 
@@ -317,8 +311,7 @@ function App() {
       }
       if ((e.ctrlKey || e.metaKey) && e.key === 'e' && view === 'main' && selectedId) {
         e.preventDefault()
-        const entry = entries.find((en) => en.id === selectedId)
-        if (entry) setEditingEntry(entry)
+        handleEditEntry(selectedId)
       }
       if ((e.ctrlKey || e.metaKey) && e.key === 'l' && view === 'main') {
         e.preventDefault()
@@ -331,7 +324,7 @@ function App() {
     }
     document.addEventListener('keydown', handler)
     return () => document.removeEventListener('keydown', handler)
-  }, [view, selectedId, entries, handleLockDatabase])
+  }, [view, selectedId, handleEditEntry, handleLockDatabase])
 
   // Expose dirty state for Electron
   useEffect(() => {
@@ -392,7 +385,7 @@ function App() {
         )}>
           <EntryList
             onNewEntry={() => setEditingEntry(null)}
-            onEditEntry={(entry) => setEditingEntry(entry)}
+            onEditEntry={(entry) => handleEditEntry(entry.id)}
             onDeleteEntry={handleDeleteEntry}
           />
         </div>
@@ -400,7 +393,7 @@ function App() {
         {showPreviewPanel && (
           <main className="flex-1 min-w-0 bg-[rgb(var(--color-background))]">
             <EntryPreview
-              onEdit={(entry) => setEditingEntry(entry)}
+              onEdit={(entry) => handleEditEntry(entry.id)}
               onDelete={handleDeleteEntry}
             />
           </main>
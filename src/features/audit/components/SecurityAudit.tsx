@@ -1,10 +1,11 @@
-import { useMemo } from 'react'
+import { useEffect, useMemo, useState } from 'react'
 import {
-  X, Shield, AlertTriangle, AlertCircle, CheckCircle, Key
+  X, Shield, AlertTriangle, AlertCircle, CheckCircle, Key, Loader2
 } from 'lucide-react'
 import { Button } from '@/shared/ui/button'
 import { cn } from '@/shared/utils/cn'
 import { useEntriesStore } from '@/features/entries/store/entriesStore'
+import { auditApi, type AuditEntryRef, type AuditHealthResponse } from '@/shared/utils/api'
 import type { KdbxEntry } from '@/shared/types/kdbx.types'
 
 interface SecurityAuditProps {
@@ -17,18 +18,17 @@ interface AuditIssue {
   title: string
   description: string
   entries: KdbxEntry[]
+  count?: number
 }
 
-function estimatePasswordStrength(password: string): number {
-  if (!password) return 0
-  let score = 0
-  if (password.length >= 8) score += 1
-  if (password.length >= 12) score += 1
-  if (password.length >= 16) score += 1
-  if (/[a-z]/.test(password) && /[A-Z]/.test(password)) score += 1
-  if (/\d/.test(password)) score += 1
-  if (/[^a-zA-Z0-9]/.test(password)) score += 1
-  return Math.min(score, 5)
+interface AuditReport {
+  health: AuditHealthResponse
+  weak: AuditEntryRef[]
+  duplicates: AuditEntryRef[]
+}
+
+function issueCount(issue: AuditIssue): number {
+  return issue.count ?? issue.entries.length
 }
 
 function AuditCard({ issue, onSelectEntry }: { issue: AuditIssue; onSelectEntry?: (e: KdbxEntry) => void }) {
@@ -80,7 +80,7 @@ function AuditCard({ issue, onSelectEntry }: { issue: AuditIssue; onSelectEntry?
           issue.type === 'warning' && 'bg-yellow-100 text-yellow-700 dark:bg-yellow-900 dark:text-yellow-300',
           issue.type === 'info' && 'bg-blue-100 text-blue-700 dark:bg-blue-900 dark:text-blue-300',
         )}>
-          {issue.entries.length}
+          {issueCount(issue)}
         </span>
       </div>
     </div>
@@ -89,12 +89,32 @@ function AuditCard({ issue, onSelectEntry }: { issue: AuditIssue; onSelectEntry?
 
 export function SecurityAudit({ onClose, onSelectEntry }: SecurityAuditProps) {
   const entries = useEntriesStore((s) => s.entries)
+  const [report, setReport] = useState<AuditReport | null>(null)
+  const [error, setError] = useState<string | null>(null)
+
+  // The entry list holds no passwords; strength and reuse come from the
+  // backend audit, which scores them in the vault session
+  useEffect(() => {
+    let cancelled = false
+    Promise.all([auditApi.health(), auditApi.weak(), auditApi.duplicates()])
+      .then(([health, weak, duplicates]) => {
+        if (!cancelled) setReport({ health, weak, duplicates: duplicates.groups.flatMap((g) => g.entries) })
+      })
+      .catch((err: unknown) => {
+        if (!cancelled) setError(err instanceof Error ? err.message : 'Audit fehlgeschlagen')
+      })
+    return () => { cancelled = true }
+  }, [])
 
   const audit = useMemo(() => {
     const issues: AuditIssue[] = []
+    if (!report) return issues
+
+    const byId = new Map(entries.map((e) => [e.id, e]))
+    const resolve = (refs: AuditEntryRef[]) => refs.flatMap((ref) => byId.get(ref.id) ?? [])
 
     // Weak passwords
-    const weakPasswords = entries.filter((e) => estimatePasswordStrength(e.password) <= 2)
+    const weakPasswords = resolve(report.weak)
     if (weakPasswords.length > 0) {
       issues.push({
         type: 'critical',
@@ -105,16 +125,7 @@ export function SecurityAudit({ onClose, onSelectEntry }: SecurityAuditProps) {
     }
 
     // Duplicate passwords
-    const passwordMap = new Map<string, KdbxEntry[]>()
-    for (const entry of entries) {
-      if (!entry.password) continue
-      const existing = passwordMap.get(entry.password) || []
-      existing.push(entry)
-      passwordMap.set(entry.password, existing)
-    }
-    const duplicateEntries = Array.from(passwordMap.values())
-      .filter((group) => group.length > 1)
-      .flat()
+    const duplicateEntries = resolve(report.duplicates)
     if (duplicateEntries.length > 0) {
       issues.push({
         type: 'critical',
@@ -124,14 +135,14 @@ export function SecurityAudit({ onClose, onSelectEntry }: SecurityAuditProps) {
       })
     }
 
-    // Empty passwords
-    const emptyPasswords = entries.filter((e) => !e.password)
-    if (emptyPasswords.length > 0) {
+    // Empty passwords (the backend reports only the count)
+    if (report.health.empty_passwords > 0) {
       issues.push({
         type: 'warning',
         title: 'Leere Passwörter',
         description: 'Diese Einträge haben kein Passwort gesetzt.',
-        entries: emptyPasswords,
+        entries: [],
+        count: report.health.empty_passwords,
       })
     }
 
@@ -165,7 +176,7 @@ export function SecurityAudit({ onClose, onSelectEntry }: SecurityAuditProps) {
     }
 
     // No URL
-    const noUrl = entries.filter((e) => !e.url && e.password)
+    const noUrl = entries.filter((e) => !e.url)
     if (noUrl.length > 0) {
       issues.push({
         type: 'info',
@@ -176,15 +187,14 @@ export function SecurityAudit({ onClose, onSelectEntry }: SecurityAuditProps) {
     }
 
     return issues
-  }, [entries])
+  }, [entries, report])
 
-  const totalIssues = audit.reduce((sum, issue) => sum + issue.entries.length, 0)
-  const criticalCount = audit.filter((i) => i.type === 'critical').reduce((s, i) => s + i.entries.length, 0)
-  const warningCount = audit.filter((i) => i.type === 'warning').reduce((s, i) => s + i.entries.length, 0)
+  const totalIssues = audit.reduce((sum, issue) => sum + issueCount(issue), 0)
+  const criticalCount = audit.filter((i) => i.type === 'critical').reduce((s, i) => s + issueCount(i), 0)
+  const warningCount = audit.filter((i) => i.type === 'warning').reduce((s, i) => s + issueCount(i), 0)
 
-  const scorePercent = entries.length > 0
-    ? Math.max(0, Math.round(100 - (criticalCount * 15 + warningCount * 5)))
-    : 100
+  const scorePercent = report ? report.health.security_score : 100
+  const pending = report?.health.pending ?? 0
 
   const scoreColor = scorePercent >= 80 ? 'text-green-500' : scorePercent >= 50 ? 'text-yellow-500' : 'text-red-500'
 
@@ -233,10 +243,17 @@ export function SecurityAudit({ onClose, onSelectEntry }: SecurityAuditProps) {
             <div>
               <h3 className="text-sm font-semibold">Sicherheitsbewertung</h3>
               <p className="text-xs text-[rgb(var(--color-foreground-muted))] mt-1">
-                {totalIssues === 0
+                {!report
+                  ? 'Audit wird geladen...'
+                  : totalIssues === 0
                   ? 'Ausgezeichnet! Keine Probleme gefunden.'
                   : `${totalIssues} Problem${totalIssues !== 1 ? 'e' : ''} in ${entries.length} Einträgen gefunden.`}
               </p>
+              {pending > 0 && (
+                <p className="text-xs text-[rgb(var(--color-foreground-muted))] mt-1">
+                  {pending} Passw{pending !== 1 ? 'örter werden' : 'ort wird'} noch bewertet.
+                </p>
+              )}
               <div className="flex gap-4 mt-2">
                 {criticalCount > 0 && (
                   <span className="flex items-center gap-1 text-xs text-red-500">
@@ -255,7 +272,16 @@ export function SecurityAudit({ onClose, onSelectEntry }: SecurityAuditProps) {
 
         {/* Issues */}
         <div className="flex-1 overflow-y-auto p-6 space-y-3">
-          {audit.length === 0 ? (
+          {error ? (
+            <div className="text-center py-8">
+              <AlertCircle className="h-12 w-12 mx-auto text-red-500 mb-3" />
+              <p className="text-sm text-[rgb(var(--color-foreground-muted))]">{error}</p>
+            </div>
+          ) : !report ? (
+            <div className="flex justify-center py-8">
+              <Loader2 className="h-8 w-8 animate-spin text-[rgb(var(--color-foreground-muted))]" />
+            </div>
+          ) : audit.length === 0 ? (
             <div className="text-center py-8">
               <CheckCircle className="h-12 w-12 mx-auto text-green-500 mb-3" />
               <p className="font-medium">Alles sicher!</p>
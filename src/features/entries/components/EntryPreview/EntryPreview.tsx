@@ -1,12 +1,14 @@
+import { useEffect, useState } from 'react'
 import {
   Globe, User, Key, Link, FileText, Tag, Clock,
-  Edit, Trash2, Copy, Paperclip, Download
+  Edit, Trash2, Copy, Paperclip, Download, Loader2
 } from 'lucide-react'
 import { Button } from '@/shared/ui/button'
 import { ProtectedField } from '@/shared/components/ProtectedField'
 import { CopyableField } from '@/shared/components/CopyableField'
 import { useEntriesStore } from '@/features/entries/store/entriesStore'
 import { attachmentsApi } from '@/shared/utils/api'
+import { loadEntry } from '@/features/entries/services/entryService'
 import { toast } from '@/shared/components/Toast'
 import type { KdbxEntry } from '@/shared/types/kdbx.types'
 
@@ -208,6 +210,21 @@ export function EntryPreview({ onEdit, onDelete }: EntryPreviewProps) {
   const entries = useEntriesStore((s) => s.entries)
   const selectedId = useEntriesStore((s) => s.selectedId)
   const selectedEntry = entries.find((e) => e.id === selectedId)
+  const [loaded, setLoaded] = useState<KdbxEntry | null>(null)
+
+  // The entry list holds no secrets; load the full entry on selection and
+  // again whenever a reload of the list shows it changed
+  const modified = selectedEntry?.modified
+  useEffect(() => {
+    if (!selectedId) return
+    let cancelled = false
+    loadEntry(selectedId).then((full) => {
+      if (!cancelled) setLoaded(full)
+    }).catch(() => {
+      if (!cancelled) toast('error', 'Eintrag konnte nicht geladen werden')
+    })
+    return () => { cancelled = true }
+  }, [selectedId, modified])
 
   if (!selectedEntry) {
     return (
@@ -219,9 +236,17 @@ export function EntryPreview({ onEdit, onDelete }: EntryPreviewProps) {
     )
   }
 
+  if (loaded?.id !== selectedEntry.id) {
+    return (
+      <div className="flex items-center justify-center h-full text-[rgb(var(--color-foreground-muted))]">
+        <Loader2 className="h-6 w-6 animate-spin" />
+      </div>
+    )
+  }
+
   return (
     <div className="h-full overflow-y-auto p-6">
-      <EntryDetail entry={selectedEntry} onEdit={onEdit} onDelete={onDelete} />
+      <EntryDetail entry={loaded} onEdit={onEdit} onDelete={onDelete} />
     </div>
   )
 }
@@ -0,0 +1,68 @@
+import { entriesApi, type EntryResponse, type EntryUpdateRequest } from '@/shared/utils/api'
+import type { EntryFormData } from '@/features/entries/components/EntryEditor/EntryEditor'
+import type { KdbxEntry } from '@/shared/types/kdbx.types'
+
+// The entry list carries no secrets (password, notes, custom fields,
+// attachments). Anything that shows, edits or exports them loads the
+// full entry from GET /api/entries/{id} first.
+
+const LOAD_CONCURRENCY = 8
+
+export function toKdbxEntry(e: EntryResponse): KdbxEntry {
+  return {
+    id: e.id,
+    title: e.title,
+    username: e.username,
+    password: e.password,
+    url: e.url,
+    notes: e.notes,
+    icon: e.icon || 0,
+    tags: e.tags || [],
+    groupId: e.group_id,
+    customFields: Object.entries(e.custom_fields || {}).map(([name, field]) => ({
+      name,
+      value: field.value,
+      protected: field.protected,
+    })),
+    attachments: (e.attachments || []).map((a) => ({
+      id: a.id,
+      filename: a.filename,
+      size: a.size,
+      mimeType: '',
+    })),
+    created: e.created,
+    modified: e.modified,
+    accessed: '',
+    expiryTime: e.expiry_time || null,
+    isExpired: false,
+  }
+}
+
+export async function loadEntry(id: string): Promise<KdbxEntry> {
+  return toKdbxEntry(await entriesApi.get(id))
+}
+
+export async function loadEntries(ids: string[]): Promise<KdbxEntry[]> {
+  const loaded: KdbxEntry[] = []
+  for (let i = 0; i < ids.length; i += LOAD_CONCURRENCY) {
+    loaded.push(...await Promise.all(ids.slice(i, i + LOAD_CONCURRENCY).map(loadEntry)))
+  }
+  return loaded
+}
+
+// Only the fields the user changed, so an update never overwrites a
+// value the editor did not show
+export function changedFields(entry: KdbxEntry, data: EntryFormData): EntryUpdateRequest {
+  const changes: EntryUpdateRequest = {}
+  if (data.title !== entry.title) changes.title = data.title
+  if (data.username !== entry.username) changes.username = data.username
+  if (data.password !== entry.password) changes.password = data.password
+  if (data.url !== entry.url) changes.url = data.url
+  if (data.notes !== entry.notes) changes.notes = data.notes
+  if (data.tags.join('\n') !== entry.tags.join('\n')) changes.tags = data.tags
+  const fields = (list: KdbxEntry['customFields']) => JSON.stringify(list.map((f) => [f.name, f.value]))
+  if (fields(data.customFields) !== fields(entry.customFields)) {
+    changes.custom_fields = Object.fromEntries(data.customFields.map((f) => [f.name, f.value]))
+  }
+  return changes
+}
@@ -4,6 +4,7 @@ import { Button } from '@/shared/ui/button'
 import { cn } from '@/shared/utils/cn'
 import { entriesApi, groupsApi } from '@/shared/utils/api'
 import { useEntriesStore } from '@/features/entries/store/entriesStore'
+import { loadEntries } from '@/features/entries/services/entryService'
 
 interface ImportExportDialogProps {
   onClose: () => void
@@ -136,9 +137,12 @@ export function ImportExportDialog({ onClose, onDataChanged }: ImportExportDialo
       let mimeType: string
       let filename: string
 
+      // The list holds no secrets; export the full entries
+      const full = await loadEntries(entries.map((e) => e.id))
+
       if (format === 'csv') {
         const headers = ['title', 'username', 'password', 'url', 'notes', 'tags']
-        const rows = entries.map((e) => [
+        const rows = full.map((e) => [
           `"${e.title.replace(/"/g, '""')}"`,
           `"${e.username.replace(/"/g, '""')}"`,
           `"${e.password.replace(/"/g, '""')}"`,
@@ -150,7 +154,7 @@ export function ImportExportDialog({ onClose, onDataChanged }: ImportExportDialo
         mimeType = 'text/csv'
         filename = 'vaultix-export.csv'
       } else {
-        const data = entries.map((e) => ({
+        const data = full.map((e) => ({
           title: e.title,
           username: e.username,
           password: e.password,
@@ -172,7 +176,7 @@ export function ImportExportDialog({ onClose, onDataChanged }: ImportExportDialo
       a.click()
       URL.revokeObjectURL(url)
 
-      setSuccess(`${entries.length} Einträge exportiert als ${format.toUpperCase()}`)
+      setSuccess(`${full.length} Einträge exportiert als ${format.toUpperCase()}`)
     } catch (err: unknown) {
       setError(err instanceof Error ? err.message : 'Export fehlgeschlagen')
     } finally {
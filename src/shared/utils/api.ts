@@ -72,7 +72,7 @@ export const databaseApi = {
 export const entriesApi = {
   list: (groupId?: string) => {
     const params = groupId ? `?group_id=${groupId}` : ''
-    return request<EntryResponse[]>(`/api/entries/${params}`)
+    return request<EntrySummaryResponse[]>(`/api/entries/${params}`)
   },
 
   get: (id: string) =>
@@ -142,6 +142,21 @@ export const generatorApi = {
     }),
 }
 
+// ============================================
+// Audit API
+// ============================================
+
+export const auditApi = {
+  health: () =>
+    request<AuditHealthResponse>('/api/audit/health'),
+
+  weak: () =>
+    request<AuditEntryRef[]>('/api/audit/weak'),
+
+  duplicates: () =>
+    request<{ groups: AuditGroup[]; similar: AuditGroup[] }>('/api/audit/duplicates'),
+}
+
 // ============================================
 // Attachments API
 // ============================================
@@ -185,7 +200,7 @@ interface DatabaseResponse {
   group_count: number
 }
 
-interface EntryResponse {
+export interface EntryResponse {
   id: string
   title: string
   username: string
@@ -202,6 +217,9 @@ interface EntryResponse {
   expiry_time: string | null
 }
 
+// Listings carry no secrets (password, notes, custom field values)
+type EntrySummaryResponse = Omit<EntryResponse, 'password' | 'notes' | 'custom_fields' | 'attachments'>
+
 interface EntryCreateRequest {
   title: string
   username?: string
@@ -213,7 +231,7 @@ interface EntryCreateRequest {
   tags?: string[]
 }
 
-interface EntryUpdateRequest {
+export interface EntryUpdateRequest {
   title?: string
   username?: string
   password?: string
@@ -223,6 +241,31 @@ interface EntryUpdateRequest {
   tags?: string[]
 }
 
+export interface AuditEntryRef {
+  id: string
+  title: string
+  username: string
+  group_id: string
+}
+
+interface AuditGroup {
+  count: number
+  entries: AuditEntryRef[]
+}
+
+export interface AuditHealthResponse {
+  total_entries: number
+  audited: number
+  pending: number
+  empty_passwords: number
+  weak: number
+  strong: number
+  duplicates: { groups: number; entries: number; similar_groups: number }
+  expired: number
+  expiring_soon: number
+  security_score: number
+}
+
 interface GroupResponse {
   id: string
   name: string